@@ -6,6 +6,16 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timezone, timedelta
 import os
 from config import Config
+from utils.admission import face_admission
+from utils.verification_jobs import verification_jobs
+from utils.vote_counters import counter_folder
+from utils.vote_ingestion import vote_ingestion
+from utils.idempotency import idempotency
+from utils.rate_limit import rate_limiter
+from utils.ballot_catalogue import ballot_catalogue
+from utils.results_stream import results_publisher
+from utils.election_status import election_scheduler
+from utils.cnn_face_recognition import face_recognition_system
 
 # Import models
 from models import User
@@ -18,6 +28,16 @@ app.config.from_object(Config)
 # Initialize extensions
 db.init_app(app)
 jwt = JWTManager(app)
+face_admission.init_app(app)
+verification_jobs.init_app(app)
+counter_folder.init_app(app)
+vote_ingestion.init_app(app)
+idempotency.init_app(app)
+rate_limiter.init_app(app)
+ballot_catalogue.init_app(app)
+results_publisher.init_app(app)
+election_scheduler.init_app(app)
+face_recognition_system.init_app(app)
 CORS(app, origins=["http://localhost:3000", "http://127.0.0.1:3000"])
 
 
@@ -114,6 +134,42 @@ def create_tables():
         db.create_all()
         print("Database tables created successfully!")
 
+@app.cli.command('create-indexes')
+def create_indexes():
+    """Create model indexes missing from tables that already exist"""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    print("Indexes created successfully!")
+
+@app.cli.command('add-columns')
+def add_columns():
+    """Add model columns missing from tables that already exist"""
+    inspector = db.inspect(db.engine)
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=db.engine.dialect)
+                    connection.execute(db.text(
+                        f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+                    ))
+                    print(f"Added {table.name}.{column.name}")
+    print("Columns added successfully!")
+
+@app.cli.command('rebuild-tallies')
+def rebuild_tallies():
+    """Recount every election's tally from the votes table"""
+    from models import Election
+    from utils.tally import rebuild_tally
+    for election in Election.query.all():
+        votes = rebuild_tally(election.id)
+        print(f"Election {election.id}: {votes} votes tallied")
+    db.session.commit()
+
 def seed_database():
     """Seed database with initial data"""
     from seed_data import seed_database
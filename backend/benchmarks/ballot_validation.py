@@ -0,0 +1,125 @@
+"""
+Benchmark ballot validation and vote insertion against ballot size
+
+Casts ballots of 5 to 30 offices two ways on a scratch SQLite file:
+- per-vote: the original cast path, two lookup queries per entry, one ORM
+  add per vote and a candidate get plus read-modify-write per vote
+- in-memory: the current path, validating against the cached ballot
+  catalogue and writing every vote with one bulk insert plus SQL-side
+  counter and tally increments
+
+Prints milliseconds and SQL statements per ballot for each size.
+
+Usage (from the backend directory):
+    python -m benchmarks.ballot_validation --ballots 200
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from extensions import db
+from models import Office, Candidate, Vote
+from routes.voting import validate_ballot
+from utils.ballot_catalogue import ballot_catalogue
+from utils.tally import increment_tally
+from utils.vote_counters import increment_vote_counters
+
+from benchmarks.database import create_app, seed_users, seed_election, count_queries
+
+OFFICE_COUNTS = (5, 10, 20, 30)
+
+
+def random_ballot(rng, offices):
+    return [{'officeId': office_id, 'candidateId': rng.choice(candidate_ids)}
+            for office_id, candidate_ids in offices]
+
+
+def cast_per_vote(user_id, election_id, votes_data):
+    """The cast path before in-memory validation"""
+    votes_to_add = []
+    for vote_data in votes_data:
+        office_id = vote_data.get('officeId')
+        candidate_id = vote_data.get('candidateId')
+
+        office = Office.query.filter_by(id=office_id, election_id=election_id).first()
+        if not office:
+            raise ValueError(f'Invalid office ID: {office_id}')
+
+        candidate = Candidate.query.filter_by(id=candidate_id, office_id=office_id).first()
+        if not candidate:
+            raise ValueError(f'Invalid candidate ID: {candidate_id}')
+
+        votes_to_add.append(Vote(user_id=user_id, election_id=election_id,
+                                 office_id=office_id, candidate_id=candidate_id))
+
+    for vote in votes_to_add:
+        db.session.add(vote)
+
+    for vote_data in votes_data:
+        candidate = db.session.get(Candidate, vote_data.get('candidateId'))
+        candidate.votes_count += 1
+
+    db.session.commit()
+
+
+def cast_in_memory(user_id, election_id, votes_data):
+    """The current cast path from routes.voting.cast_votes"""
+    ballot, error = validate_ballot(ballot_catalogue.get(election_id), votes_data)
+    if error:
+        raise ValueError(error)
+
+    db.session.execute(db.insert(Vote), [
+        {'user_id': user_id, 'election_id': election_id,
+         'office_id': office_id, 'candidate_id': candidate_id}
+        for office_id, candidate_id in ballot
+    ])
+    increment_vote_counters(election_id, [candidate_id for _, candidate_id in ballot])
+    increment_tally(election_id, ballot)
+    db.session.commit()
+
+
+def benchmark(cast, election_id, ballots, user_ids):
+    counter = {}
+    with count_queries(counter):
+        start = time.perf_counter()
+        for user_id, votes_data in zip(user_ids, ballots):
+            cast(user_id, election_id, votes_data)
+        elapsed = time.perf_counter() - start
+    return elapsed * 1000 / len(ballots), counter['queries'] / len(ballots)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--ballots', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app(os.path.join(directory, 'bench.db'))
+        with app.app_context():
+            users = seed_users(2 * args.ballots * len(OFFICE_COUNTS))
+
+            print(f"{args.ballots} ballots per size\n")
+            print(f"{'offices':>7} {'per-vote ms':>12} {'queries':>8} "
+                  f"{'in-memory ms':>13} {'queries':>8} {'speedup':>8}")
+
+            for offices in OFFICE_COUNTS:
+                results = []
+                for cast in (cast_per_vote, cast_in_memory):
+                    election_id, structure = seed_election(offices)
+                    ballot_catalogue.get(election_id)  # warm, as in steady state
+                    ballots = [random_ballot(rng, structure) for _ in range(args.ballots)]
+                    voters, users = users[:args.ballots], users[args.ballots:]
+                    results.append(benchmark(cast, election_id, ballots, voters))
+                    db.session.remove()
+
+                (old_ms, old_queries), (new_ms, new_queries) = results
+                print(f"{offices:>7} {old_ms:12.2f} {old_queries:8.1f} "
+                      f"{new_ms:13.2f} {new_queries:8.1f} {old_ms / new_ms:8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark the selectable CNN backbones on the same data
+
+Trains every architecture in ARCHITECTURES on one dataset and prints a
+table of parameter count, saved model size, single-image CPU latency and
+held-out test accuracy. Models are written to a temporary directory, so
+the served model is never touched.
+
+The dataset is every registered face in the application database, or with
+--synthetic a generated set of separable classes for a quick dry run.
+
+Usage (from the backend directory):
+    python -m benchmarks.cnn_architectures --epochs 20
+    python -m benchmarks.cnn_architectures --synthetic 10 --epochs 5
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+# Latency is measured on the CPU, as deployed
+os.environ.setdefault('CUDA_VISIBLE_DEVICES', '-1')
+
+from utils.cnn_face_recognition import ARCHITECTURES, CNNFaceRecognition
+
+
+def synthetic_dataset(num_classes, per_class=30, seed=0):
+    """Face-sized crops where each class is an ellipse at its own position and colour"""
+    rng = np.random.default_rng(seed)
+    samples = []
+    for label in range(num_classes):
+        center = (int(rng.integers(40, 88)), int(rng.integers(40, 88)))
+        colour = tuple(int(c) for c in rng.integers(60, 255, 3))
+        for _ in range(per_class):
+            image = rng.integers(0, 80, (128, 128, 3), dtype=np.uint8)
+            jitter = tuple(int(v) for v in rng.integers(-4, 5, 2))
+            cv2.ellipse(image, (center[0] + jitter[0], center[1] + jitter[1]), (24, 32), 0, 0, 360, colour, -1)
+            samples.append({'user_id': label, 'face_data': image})
+    return samples
+
+
+def database_dataset():
+    """Every registered face, loaded the same way the /train route does"""
+    from app import app
+    from models.face_data import FaceData
+    from routes.face_recognition import face_sample
+
+    with app.app_context():
+        return [face_sample(record) for record in FaceData.query.all()]
+
+
+def cpu_latency_ms(model, runs=50):
+    """Median single-image inference time in milliseconds"""
+    batch = np.random.default_rng(0).random((1, 128, 128, 3), dtype=np.float32)
+    for _ in range(5):
+        model(batch, training=False)
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        model(batch, training=False)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def benchmark(architecture, samples, epochs, batch_size, directory):
+    system = CNNFaceRecognition(
+        model_path=os.path.join(directory, f'{architecture}.h5'),
+        encoder_path=os.path.join(directory, f'{architecture}_encoder.pkl'),
+        metadata_path=os.path.join(directory, f'{architecture}_metadata.json')
+    )
+    history, _ = system.train_model(samples, epochs=epochs, batch_size=batch_size,
+                                    workers=1, architecture=architecture)
+    if history is None:
+        raise RuntimeError(f"Training the {architecture} model failed")
+
+    return {
+        'architecture': architecture,
+        'parameters': system.metadata['parameters'],
+        'size_mb': os.path.getsize(system.model_path) / (1024 * 1024),
+        'latency_ms': cpu_latency_ms(system.model),
+        'accuracy': system.metadata['test_accuracy']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--synthetic', type=int, metavar='CLASSES',
+                        help='use a generated dataset with this many classes')
+    parser.add_argument('--epochs', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+
+    samples = synthetic_dataset(args.synthetic) if args.synthetic else database_dataset()
+    classes = len({sample['user_id'] for sample in samples})
+    print(f"{len(samples)} samples, {classes} classes, {args.epochs} epochs\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        rows = [benchmark(architecture, samples, args.epochs, args.batch_size, directory)
+                for architecture in ARCHITECTURES]
+
+    print('| Architecture | Parameters | Model size (MB) | CPU latency (ms) | Test accuracy |')
+    print('|---|---:|---:|---:|---:|')
+    for row in rows:
+        print(f"| {row['architecture']} | {row['parameters']:,} | {row['size_mb']:.1f} "
+              f"| {row['latency_ms']:.1f} | {row['accuracy']:.3f} |")
+
+
+if __name__ == '__main__':
+    main()
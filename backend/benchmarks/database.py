@@ -0,0 +1,77 @@
+"""
+Shared setup for database benchmarks
+
+Builds a bare Flask app bound to the models on a scratch SQLite file (app.py
+would pull in TensorFlow), seeds synthetic users and elections, and counts
+the SQL statements a block of code issues.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from flask import Flask
+from sqlalchemy import event
+
+from extensions import db
+from models import User, Election, Office, Candidate
+
+
+def create_app(path, **config):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': 30}}
+    app.config.update(config)
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def seed_users(count, start=1):
+    """Insert `count` students with IDs from `start`; returns their IDs"""
+    ids = list(range(start, start + count))
+    db.session.execute(db.insert(User), [
+        {'id': i, 'name': f'Student {i}', 'student_id': f'FUO/BENCH/{i:07d}',
+         'email': f'student{i}@fuo.edu.ng', 'phone': '08000000000',
+         'department': 'Computer Science', 'level': '300', 'password_hash': 'x'}
+        for i in ids
+    ])
+    db.session.commit()
+    return ids
+
+
+def seed_election(offices, candidates_per_office=4, title='Benchmark Election'):
+    """
+    Active election with the given number of offices
+
+    Returns:
+        Tuple of (election ID, list of (office ID, [candidate IDs]))
+    """
+    now = datetime.utcnow()
+    election = Election(title=title, description=title,
+                        start_date=now - timedelta(days=1), end_date=now + timedelta(days=1))
+    for o in range(offices):
+        office = Office(title=f'Office {o}', description=f'Office {o}')
+        office.candidates = [
+            Candidate(name=f'Candidate {o}.{c}', department='CSC', level='400',
+                      matric_no=f'M{o}{c}', manifesto='-')
+            for c in range(candidates_per_office)
+        ]
+        election.offices.append(office)
+    db.session.add(election)
+    db.session.commit()
+    return election.id, [(office.id, [c.id for c in office.candidates]) for office in election.offices]
+
+
+@contextmanager
+def count_queries(counter):
+    """Add the number of SQL statements executed inside the block to counter['queries']"""
+    def before_execute(*args):
+        counter['queries'] = counter.get('queries', 0) + 1
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_execute)
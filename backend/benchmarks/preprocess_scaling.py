@@ -0,0 +1,104 @@
+"""
+Benchmark dataset preprocessing scaling with worker count
+
+Generates a synthetic dataset, then times face cropping serially and across
+process pools of increasing size, printing a table of throughput and
+speedup. Only needs OpenCV, NumPy and Pillow (no TensorFlow).
+
+Usage (from the backend directory):
+    python -m benchmarks.preprocess_scaling --images 2000 --source raw
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from io import BytesIO
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from utils import face_preprocessing
+
+IMG_SIZE = (128, 128)
+
+
+def synthetic_face(rng, size):
+    """Noisy image with a face-like ellipse, JPEG encoded"""
+    height, width = size
+    image = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    center = (width // 2 + int(rng.integers(-40, 40)), height // 2 + int(rng.integers(-40, 40)))
+    cv2.ellipse(image, center, (width // 6, height // 4), 0, 0, 360, (200, 170, 150), -1)
+    buffer = BytesIO()
+    Image.fromarray(image).save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def build_samples(count, source, directory, seed=0):
+    """
+    (image_path, image_data) samples as prepare_dataset hands them to workers
+
+    'crops' writes stored 128x128 PNG crops and passes their paths; 'raw'
+    passes raw 640x480 JPEG bytes that must be decoded and face-detected.
+    """
+    rng = np.random.default_rng(seed)
+    samples = []
+    for i in range(count):
+        raw = synthetic_face(rng, (480, 640))
+        if source == 'raw':
+            samples.append((None, raw))
+            continue
+        crop, _ = face_preprocessing.crop_face(face_preprocessing.decode_image(raw), IMG_SIZE)
+        path = os.path.join(directory, f'{i}.png')
+        Image.fromarray(crop).save(path, format='PNG')
+        samples.append((path, None))
+    return samples
+
+
+def time_serial(samples):
+    start = time.perf_counter()
+    for sample in samples:
+        face_preprocessing.sample_crop_uint8(sample, IMG_SIZE)
+    return time.perf_counter() - start
+
+
+def time_parallel(samples, workers, chunk_size):
+    start = time.perf_counter()
+    face_preprocessing.crop_parallel(samples, IMG_SIZE, workers, chunk_size)
+    return time.perf_counter() - start
+
+
+def worker_counts(maximum):
+    counts = []
+    workers = 1
+    while workers < maximum:
+        counts.append(workers)
+        workers *= 2
+    counts.append(maximum)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--images', type=int, default=1000)
+    parser.add_argument('--source', choices=('raw', 'crops'), default='raw')
+    parser.add_argument('--chunk-size', type=int, default=32)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        samples = build_samples(args.images, args.source, directory)
+
+        serial = time_serial(samples)
+        print(f"{args.images} {args.source} images, chunk size {args.chunk_size}\n")
+        print(f"{'workers':>8} {'seconds':>9} {'images/s':>10} {'speedup':>8}")
+        print(f"{'serial':>8} {serial:9.2f} {args.images / serial:10.1f} {1.0:8.2f}")
+
+        for workers in worker_counts(args.max_workers):
+            elapsed = time_parallel(samples, workers, args.chunk_size)
+            print(f"{workers:>8} {elapsed:9.2f} {args.images / elapsed:10.1f} {serial / elapsed:8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark election results: per-candidate COUNTs vs GROUP BY vs the tally
+
+Seeds a scratch SQLite file with one election and a million votes, then
+times the three ways results have been computed: the original COUNT query
+per office and per candidate, count_votes' single GROUP BY over Vote, and
+load_tally's read of the materialised VoteTally rows. Prints the median
+time and the number of queries for each.
+
+Usage (from the backend directory):
+    python -m benchmarks.tally_results --votes 1000000 --offices 10 --candidates 5
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from extensions import db
+from models import Vote
+from utils.tally import count_votes, load_tally, rebuild_tally
+
+from benchmarks.database import create_app, seed_users, seed_election, count_queries
+
+CHUNK = 50000
+
+
+def seed_votes(election_id, structure, votes):
+    """One ballot per voter across every office until `votes` rows exist"""
+    voters = -(-votes // len(structure))
+    user_ids = seed_users(voters)
+    rows = []
+    for i, user_id in enumerate(user_ids):
+        for o, (office_id, candidate_ids) in enumerate(structure):
+            if len(rows) >= CHUNK:
+                db.session.execute(db.insert(Vote), rows)
+                rows = []
+            rows.append({'user_id': user_id, 'election_id': election_id, 'office_id': office_id,
+                         'candidate_id': candidate_ids[(i + o) % len(candidate_ids)]})
+    db.session.execute(db.insert(Vote), rows)
+    db.session.commit()
+    return voters * len(structure)
+
+
+def count_per_candidate(election_id, structure):
+    """Results as the original route computed them: one COUNT per office and per candidate"""
+    results = {}
+    for office_id, candidate_ids in structure:
+        results[office_id] = {
+            'totalVotes': Vote.query.filter_by(election_id=election_id, office_id=office_id).count(),
+            'candidates': {
+                candidate_id: Vote.query.filter_by(election_id=election_id, office_id=office_id,
+                                                   candidate_id=candidate_id).count()
+                for candidate_id in candidate_ids
+            }
+        }
+    return results
+
+
+def measure(method, repeat):
+    """Median milliseconds and queries per call of method()"""
+    times = []
+    counter = {}
+    for _ in range(repeat):
+        with count_queries(counter):
+            start = time.perf_counter()
+            method()
+            times.append((time.perf_counter() - start) * 1000)
+        db.session.rollback()
+    return statistics.median(times), counter['queries'] // repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--votes', type=int, default=1000000)
+    parser.add_argument('--offices', type=int, default=10)
+    parser.add_argument('--candidates', type=int, default=5, help='candidates per office')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app(os.path.join(directory, 'bench.db'))
+        with app.app_context():
+            election_id, structure = seed_election(args.offices, args.candidates)
+            votes = seed_votes(election_id, structure, args.votes)
+            rebuild_tally(election_id)
+            db.session.commit()
+
+            expected = count_votes(election_id)
+            assert load_tally(election_id) == expected
+            per_candidate = count_per_candidate(election_id, structure)
+            assert sum(office['totalVotes'] for office in per_candidate.values()) == votes
+
+            rows = [
+                ('COUNT per office/candidate',
+                 *measure(lambda: count_per_candidate(election_id, structure), args.repeat)),
+                ('GROUP BY over Vote', *measure(lambda: count_votes(election_id), args.repeat)),
+                ('VoteTally read', *measure(lambda: load_tally(election_id), args.repeat)),
+            ]
+            db.session.remove()
+
+    print(f"{votes} votes, {args.offices} offices of {args.candidates} candidates, "
+          f"median of {args.repeat} runs\n")
+    print(f"{'method':<28} {'ms':>10} {'queries':>8} {'speedup':>8}")
+    baseline = rows[0][1]
+    for name, elapsed, queries in rows:
+        print(f"{name:<28} {elapsed:10.2f} {queries:8d} {baseline / elapsed:8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark face upload parsing for base64 JSON, multipart and raw bodies
+
+Sends the same JPEG through a Flask test client in each format to a view
+that reads it with get_face_image_data and turns it into image bytes, as
+extract_face_artifacts does. Prints the request body size, median time
+spent parsing inside the view and the peak memory it allocated (measured
+with tracemalloc).
+
+Usage (from the backend directory):
+    python -m benchmarks.upload_parsing --width 1280 --height 960 --requests 200
+"""
+
+import argparse
+import base64
+import json
+import statistics
+import time
+import tracemalloc
+from io import BytesIO
+
+import numpy as np
+from flask import Flask, jsonify
+
+from benchmarks.preprocess_scaling import synthetic_face
+from routes.face_recognition import get_face_image_data
+
+
+def image_bytes(face_data):
+    """Image bytes from get_face_image_data's result, as extract_face_artifacts decodes it"""
+    if isinstance(face_data, str):
+        raw = face_data.split(',')[1] if face_data.startswith('data:image') else face_data
+        return base64.b64decode(raw)
+    return bytes(face_data)
+
+
+def create_app(measurements):
+    app = Flask(__name__)
+
+    @app.route('/upload', methods=['POST'])
+    def upload():
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+
+        data = image_bytes(get_face_image_data())
+
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        measurements.append((elapsed, peak - baseline))
+        return jsonify({'bytes': len(data)})
+
+    return app
+
+
+def request_formats(jpeg):
+    """(name, body, content type) for every supported upload format"""
+    encoded = 'data:image/jpeg;base64,' + base64.b64encode(jpeg).decode('ascii')
+    boundary = 'benchmarkboundary'
+    multipart = (
+        f'--{boundary}\r\n'
+        'Content-Disposition: form-data; name="face_data"; filename="face.jpg"\r\n'
+        'Content-Type: image/jpeg\r\n\r\n'
+    ).encode() + jpeg + f'\r\n--{boundary}--\r\n'.encode()
+
+    return [
+        ('base64 JSON', json.dumps({'face_data': encoded}).encode(), 'application/json'),
+        ('multipart', multipart, f'multipart/form-data; boundary={boundary}'),
+        ('raw', jpeg, 'image/jpeg'),
+    ]
+
+
+def benchmark(client, measurements, body, content_type, requests, size):
+    measurements.clear()
+    for _ in range(requests):
+        response = client.post('/upload', data=BytesIO(body), content_type=content_type)
+        assert response.get_json()['bytes'] == size
+    return (statistics.median(m[0] for m in measurements) * 1000,
+            max(m[1] for m in measurements) / 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    jpeg = synthetic_face(np.random.default_rng(0), (args.height, args.width))
+    measurements = []
+    client = create_app(measurements).test_client()
+
+    print(f"{args.width}x{args.height} JPEG, {len(jpeg) / 1024:.0f} KB, {args.requests} requests\n")
+    print(f"{'format':<12} {'body KB':>8} {'parse ms':>9} {'peak KB':>8}")
+
+    tracemalloc.start()
+    try:
+        for name, body, content_type in request_formats(jpeg):
+            parse_ms, peak_kb = benchmark(client, measurements, body, content_type,
+                                          args.requests, len(jpeg))
+            print(f"{name:<12} {len(body) / 1024:8.0f} {parse_ms:9.3f} {peak_kb:8.0f}")
+    finally:
+        tracemalloc.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark group-commit vote ingestion against direct commits
+
+Concurrent voter threads cast ballots on a scratch SQLite file, either
+committing each ballot themselves (the direct cast path) or through
+VoteIngestionQueue with a range of group sizes and flush intervals. Prints
+ballots per second and the p50/p95 latency from submission to durable
+commit for every configuration, with a bar for throughput.
+
+Usage (from the backend directory):
+    python -m benchmarks.vote_ingestion --voters 32 --ballots 2000
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from extensions import db
+from models import Vote
+from utils.tally import increment_tally
+from utils.vote_counters import increment_vote_counters
+from utils.vote_ingestion import VoteIngestionQueue
+
+from benchmarks.database import create_app, seed_users, seed_election
+
+GROUP_SIZES = (1, 16, 64, 256)
+FLUSH_INTERVALS_MS = (2, 20, 50)
+
+
+def cast_direct(app, user_id, election_id, ballot):
+    """One transaction per ballot, as cast_votes does without group commit"""
+    with app.app_context():
+        try:
+            db.session.execute(db.insert(Vote), [
+                {'user_id': user_id, 'election_id': election_id,
+                 'office_id': office_id, 'candidate_id': candidate_id}
+                for office_id, candidate_id in ballot
+            ])
+            increment_vote_counters(election_id, [candidate_id for _, candidate_id in ballot])
+            increment_tally(election_id, ballot)
+            db.session.commit()
+        finally:
+            db.session.remove()
+
+
+def run(cast, user_ids, voters):
+    """
+    Cast one ballot per user ID from `voters` threads
+
+    Returns:
+        Tuple of (ballots per second, list of per-ballot latencies in ms)
+    """
+    latencies = []
+    lock = threading.Lock()
+    chunks = [user_ids[i::voters] for i in range(voters)]
+
+    def voter(chunk):
+        for user_id in chunk:
+            start = time.perf_counter()
+            cast(user_id)
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=voter, args=(chunk,)) for chunk in chunks]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(user_ids) / (time.perf_counter() - start), latencies
+
+
+def percentile(values, fraction):
+    return statistics.quantiles(values, n=100)[int(fraction * 100) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--voters', type=int, default=32, help='concurrent voter threads')
+    parser.add_argument('--ballots', type=int, default=2000, help='ballots per configuration')
+    parser.add_argument('--offices', type=int, default=5)
+    args = parser.parse_args()
+
+    configs = [('direct', None, None)] + [
+        (f'group {size} / {wait} ms', size, wait)
+        for size in GROUP_SIZES for wait in FLUSH_INTERVALS_MS
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app(os.path.join(directory, 'bench.db'), VOTE_GROUP_RESULT_TIMEOUT=60.0)
+        with app.app_context():
+            users = seed_users(args.ballots * len(configs))
+            election_id, structure = seed_election(args.offices)
+            db.session.remove()
+        ballot = [(office_id, candidate_ids[0]) for office_id, candidate_ids in structure]
+
+        rows = []
+        for name, size, wait in configs:
+            voters_users, users = users[:args.ballots], users[args.ballots:]
+            if size is None:
+                def cast(user_id):
+                    cast_direct(app, user_id, election_id, ballot)
+            else:
+                app.config.update(VOTE_GROUP_COMMIT=True, VOTE_GROUP_MAX_BALLOTS=size,
+                                  VOTE_GROUP_MAX_WAIT_MS=wait)
+                queue = VoteIngestionQueue(app)
+
+                def cast(user_id, queue=queue):
+                    result = queue.cast(user_id, election_id, ballot)
+                    if not result['success']:
+                        raise RuntimeError(result['error'] or 'ballot still pending')
+            rate, latencies = run(cast, voters_users, args.voters)
+            rows.append((name, rate, percentile(latencies, 0.5), percentile(latencies, 0.95)))
+
+    print(f"{args.ballots} ballots of {args.offices} votes per configuration, "
+          f"{args.voters} concurrent voters\n")
+    print(f"{'configuration':<18} {'ballots/s':>10} {'p50 ms':>8} {'p95 ms':>8}")
+    fastest = max(row[1] for row in rows)
+    for name, rate, p50, p95 in rows:
+        bar = '#' * max(1, round(40 * rate / fastest))
+        print(f"{name:<18} {rate:10.1f} {p50:8.1f} {p95:8.1f}  {bar}")
+
+
+if __name__ == '__main__':
+    main()
@@ -20,10 +20,12 @@ class Config:
     
     # Face recognition configuration
     FACE_RECOGNITION_THRESHOLD = 0.6
+    FACE_MIN_CONFIDENCE_THRESHOLD = 0.5  # Lowest threshold calibration may apply
     FACE_DETECTION_MODEL = 'cnn'  # or 'hog', 'cnn' for better accuracy
     
     # CNN Model configuration
     CNN_MODEL_PATH = 'models/trained/face_recognition_cnn.h5'
+    CNN_ARCHITECTURE = os.environ.get('CNN_ARCHITECTURE') or 'standard'  # standard, gap or separable
     FACE_DATASET_PATH = 'datasets/faces'
     TRAINING_SPLIT = 0.7  # 70% for training, 30% for testing
     
@@ -33,10 +35,63 @@ class Config:
     EPOCHS = 50
     LEARNING_RATE = 0.001
     
+    # Face pipeline admission control
+    FACE_MAX_INFLIGHT = int(os.environ.get('FACE_MAX_INFLIGHT', 4))  # Concurrent face inferences
+    FACE_MAX_QUEUE = int(os.environ.get('FACE_MAX_QUEUE', 8))  # Requests waiting for a slot
+    FACE_QUEUE_TIMEOUT = 2.0  # Seconds a queued request waits before 503
+    FACE_RETRY_AFTER = 2  # Retry-After seconds on 503
+    
+    # Asynchronous face verification
+    FACE_ASYNC_WORKERS = int(os.environ.get('FACE_ASYNC_WORKERS', 2))  # Background inference threads
+    FACE_ASYNC_MAX_PENDING = 32  # Queued jobs before 503
+    FACE_ASYNC_MAX_RESULTS = 1000  # Results kept in memory
+    FACE_ASYNC_RESULT_TTL = 300  # Seconds results are kept
+    
+    # Vote counters
+    VOTE_COUNTER_SHARDS = int(os.environ.get('VOTE_COUNTER_SHARDS', 1))  # >1 shards hot candidate counters
+    VOTE_COUNTER_FOLD_INTERVAL = 5.0  # Seconds between folding shards into candidate totals
+    
+    # Group-commit vote ingestion
+    VOTE_GROUP_COMMIT = os.environ.get('VOTE_GROUP_COMMIT', 'false').lower() == 'true'
+    VOTE_GROUP_MAX_BALLOTS = 64  # Ballots committed together at most
+    VOTE_GROUP_MAX_WAIT_MS = 20  # Longest a ballot waits for its group to fill
+    VOTE_GROUP_RESULT_TIMEOUT = 10.0  # Seconds a request waits for its group commit
+    
+    # Idempotency keys for retried POST/PUT requests
+    IDEMPOTENCY_MAX_KEYS = 10000  # Stored responses, oldest evicted first
+    IDEMPOTENCY_TTL = 86400  # Seconds a stored response is replayed
+    IDEMPOTENCY_STORAGE = os.environ.get('IDEMPOTENCY_STORAGE')  # SQLite file shared by workers; defaults to the temp dir
+    
+    # Ballot catalogue cache (elections, offices, candidates)
+    BALLOT_CATALOGUE_TTL = 30  # Seconds before re-reading edits made by other workers
+    
+    # Live results streaming (Server-Sent Events)
+    RESULTS_STREAM_INTERVAL = 1.0  # Seconds between delta messages at most
+    RESULTS_STREAM_SYNC_INTERVAL = 10.0  # Seconds between re-reads catching other workers' votes
+    RESULTS_STREAM_MAX_SUBSCRIBERS = 500  # Open streams per process
+    RESULTS_STREAM_KEEPALIVE = 15.0  # Seconds between keepalive comments
+    
+    # HTTP caching
+    COMPLETED_ELECTION_MAX_AGE = 3600  # Seconds clients may reuse frozen final results
+    
+    # Election lifecycle
+    ELECTION_STATUS_INTERVAL = 60.0  # Longest scheduler sleep between lifecycle passes (0 disables)
+    # Seconds after close before final results are frozen; must outlast
+    # VOTE_GROUP_RESULT_TIMEOUT plus one flush so group-committed ballots land first
+    ELECTION_FINALIZE_DELAY = 15.0
+    
     # Security configuration
     MAX_LOGIN_ATTEMPTS = 5
     LOCKOUT_DURATION = timedelta(minutes=30)
     
+    # Rate limiting (per client IP and per account, as 'hits/seconds')
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_STORAGE = os.environ.get('RATE_LIMIT_STORAGE')  # SQLite file shared by workers; defaults to the temp dir
+    RATE_LIMITS = {
+        'login': {'ip': '30/60', 'account': '10/300'},
+        'face': {'ip': '30/60', 'account': '10/60'}
+    }
+    
     # File upload configuration
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = 'uploads'
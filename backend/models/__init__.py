@@ -4,3 +4,6 @@ from .office import Office
 from .candidate import Candidate
 from .vote import Vote
 from .face_data import FaceData
+from .counter_shard import CandidateCounterShard
+from .vote_tally import VoteTally
+from .results_snapshot import ResultsSnapshot
@@ -1,4 +1,5 @@
 from extensions import db
+from models.serialization import serialize
 from datetime import datetime
 
 class Candidate(db.Model):
@@ -10,24 +11,31 @@ class Candidate(db.Model):
     manifesto = db.Column(db.Text, nullable=False)
     photo = db.Column(db.String(255))  # URL or path to photo
     votes_count = db.Column(db.Integer, default=0)
-    office_id = db.Column(db.Integer, db.ForeignKey('office.id'), nullable=False)
+    office_id = db.Column(db.Integer, db.ForeignKey('office.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     votes = db.relationship('Vote', backref='candidate', lazy=True)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'department': self.department,
-            'level': self.level,
-            'matricNo': self.matric_no,
-            'manifesto': self.manifesto,
-            'photo': self.photo,
-            'votes': self.votes_count,
-            'officeId': self.office_id,
-            'createdAt': self.created_at.isoformat(),
-            'updatedAt': self.updated_at.isoformat()
-        }
+    # Keys per serialisation profile; None selects every field
+    PROFILES = {
+        'summary': ('id', 'name', 'photo', 'officeId'),
+        'ballot': ('id', 'name', 'department', 'level', 'matricNo', 'photo', 'officeId'),
+        'full': None
+    }
+    
+    def to_dict(self, profile='full', fields=None):
+        return serialize({
+            'id': lambda: self.id,
+            'name': lambda: self.name,
+            'department': lambda: self.department,
+            'level': lambda: self.level,
+            'matricNo': lambda: self.matric_no,
+            'manifesto': lambda: self.manifesto,
+            'photo': lambda: self.photo,
+            'votes': lambda: self.votes_count,
+            'officeId': lambda: self.office_id,
+            'createdAt': lambda: self.created_at.isoformat(),
+            'updatedAt': lambda: self.updated_at.isoformat()
+        }, self.PROFILES, profile, fields)
@@ -0,0 +1,16 @@
+from extensions import db
+
+class CandidateCounterShard(db.Model):
+    """
+    Sharded vote counter rows for very hot candidates
+
+    When sharding is enabled each cast increments one of several rows per
+    candidate instead of the single Candidate.votes_count row, spreading
+    write contention. Shards are periodically folded back into
+    Candidate.votes_count.
+    """
+    __tablename__ = 'candidate_counter_shard'
+    
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidate.id', ondelete='CASCADE'), primary_key=True)
+    shard = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
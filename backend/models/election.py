@@ -1,15 +1,22 @@
 from extensions import db
+from models.serialization import serialize
 from datetime import datetime, timezone
 
+def as_utc(value):
+    """Timezone-aware UTC datetime; dates round-trip through the database as naive UTC"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
 class Election(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
-    start_date = db.Column(db.DateTime, nullable=False)
-    end_date = db.Column(db.DateTime, nullable=False)
+    start_date = db.Column(db.DateTime, nullable=False, index=True)
+    end_date = db.Column(db.DateTime, nullable=False, index=True)
     status = db.Column(db.String(20), default='upcoming')  # upcoming, active, completed
     total_voters = db.Column(db.Integer, default=0)
     voted_count = db.Column(db.Integer, default=0)
+    # False/NULL until the tally holds every vote (elections predating VoteTally)
+    tally_initialized = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -17,28 +24,39 @@ class Election(db.Model):
     offices = db.relationship('Office', backref='election', lazy=True, cascade='all, delete-orphan')
     votes = db.relationship('Vote', backref='election', lazy=True)
     
-    def update_status(self):
-        now = datetime.now(timezone.utc)
+    @staticmethod
+    def derive_status(start_date, end_date, now=None):
+        """Status implied by the election window at `now` (default: current time)"""
+        now = as_utc(now or datetime.now(timezone.utc))
 
-        if now < self.start_date:
-            self.status = 'upcoming'
-        elif now > self.end_date:
-            self.status = 'completed'
-        else:
-            self.status = 'active'
+        if now < as_utc(start_date):
+            return 'upcoming'
+        if now > as_utc(end_date):
+            return 'completed'
+        return 'active'
+    
+    def update_status(self):
+        self.status = self.derive_status(self.start_date, self.end_date)
+    
+    # Keys per serialisation profile; None selects every field
+    PROFILES = {
+        'summary': ('id', 'title', 'startDate', 'endDate', 'status', 'totalVoters', 'votedCount'),
+        'ballot': ('id', 'title', 'description', 'startDate', 'endDate', 'status', 'offices'),
+        'full': None
+    }
     
-    def to_dict(self):
-        self.update_status()
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'startDate': self.start_date.isoformat(),
-            'endDate': self.end_date.isoformat(),
-            'status': self.status,
-            'totalVoters': self.total_voters,
-            'votedCount': self.voted_count,
-            'offices': [office.to_dict() for office in self.offices],
-            'createdAt': self.created_at.isoformat(),
-            'updatedAt': self.updated_at.isoformat()
-        }
+    def to_dict(self, profile='full', fields=None):
+        # Status is derived, not stored, so serialising never dirties the session
+        return serialize({
+            'id': lambda: self.id,
+            'title': lambda: self.title,
+            'description': lambda: self.description,
+            'startDate': lambda: self.start_date.isoformat(),
+            'endDate': lambda: self.end_date.isoformat(),
+            'status': lambda: self.derive_status(self.start_date, self.end_date),
+            'totalVoters': lambda: self.total_voters,
+            'votedCount': lambda: self.voted_count,
+            'offices': lambda: [office.to_dict(profile) for office in self.offices],
+            'createdAt': lambda: self.created_at.isoformat(),
+            'updatedAt': lambda: self.updated_at.isoformat()
+        }, self.PROFILES, profile, fields)
@@ -13,7 +13,7 @@ class FaceData(db.Model):
     __tablename__ = 'face_data'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     
     # Face encoding data
     face_encoding = db.Column(db.Text, nullable=False)  # JSON string of face encoding
@@ -32,6 +32,7 @@ class FaceData(db.Model):
     
     # CNN model data
     cnn_features = db.Column(db.Text)  # JSON string of CNN extracted features
+    cnn_features_version = db.Column(db.String(32))  # Model version that produced cnn_features
     confidence_score = db.Column(db.Float, default=0.0)
     
     # Timestamps
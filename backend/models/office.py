@@ -1,4 +1,5 @@
 from extensions import db
+from models.serialization import serialize
 from datetime import datetime
 
 class Office(db.Model):
@@ -6,7 +7,7 @@ class Office(db.Model):
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=False)
     max_votes = db.Column(db.Integer, default=1)
-    election_id = db.Column(db.Integer, db.ForeignKey('election.id'), nullable=False)
+    election_id = db.Column(db.Integer, db.ForeignKey('election.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -14,14 +15,21 @@ class Office(db.Model):
     candidates = db.relationship('Candidate', backref='office', lazy=True, cascade='all, delete-orphan')
     votes = db.relationship('Vote', backref='office', lazy=True)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'maxVotes': self.max_votes,
-            'electionId': self.election_id,
-            'candidates': [candidate.to_dict() for candidate in self.candidates],
-            'createdAt': self.created_at.isoformat(),
-            'updatedAt': self.updated_at.isoformat()
-        }
+    # Keys per serialisation profile; None selects every field
+    PROFILES = {
+        'summary': ('id', 'title', 'maxVotes', 'electionId'),
+        'ballot': ('id', 'title', 'description', 'maxVotes', 'electionId', 'candidates'),
+        'full': None
+    }
+    
+    def to_dict(self, profile='full', fields=None):
+        return serialize({
+            'id': lambda: self.id,
+            'title': lambda: self.title,
+            'description': lambda: self.description,
+            'maxVotes': lambda: self.max_votes,
+            'electionId': lambda: self.election_id,
+            'candidates': lambda: [candidate.to_dict(profile) for candidate in self.candidates],
+            'createdAt': lambda: self.created_at.isoformat(),
+            'updatedAt': lambda: self.updated_at.isoformat()
+        }, self.PROFILES, profile, fields)
@@ -0,0 +1,17 @@
+from extensions import db
+from datetime import datetime
+
+class ResultsSnapshot(db.Model):
+    """
+    Final results of a completed election, frozen once and never updated
+
+    `payload` is the serialised results response body, so serving it needs
+    no aggregation or serialisation work.
+    """
+    __tablename__ = 'results_snapshot'
+    
+    election_id = db.Column(db.Integer, db.ForeignKey('election.id', ondelete='CASCADE'), primary_key=True)
+    payload = db.Column(db.Text, nullable=False)
+    etag = db.Column(db.String(64), nullable=False)
+    total_votes = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
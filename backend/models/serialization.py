@@ -0,0 +1,45 @@
+"""
+Serialisation profiles shared by Election, Office and Candidate
+
+Each model describes its fields as lazily evaluated callables, so fields
+that are not selected (in particular relationships) are never touched and
+never trigger lazy loads.
+"""
+
+PROFILES = ('summary', 'ballot', 'full')
+
+
+def parse_fields(value):
+    """Set of field names from a comma-separated ?fields= value, or None"""
+    if not value:
+        return None
+    fields = {field.strip() for field in value.split(',') if field.strip()}
+    return fields or None
+
+
+def serialize(serializers, profile_fields, profile='full', fields=None):
+    """
+    Dictionary of the selected fields
+
+    Args:
+        serializers: Ordered mapping of output key to a zero-argument callable
+        profile_fields: Mapping of profile name to its keys; None means all keys
+        profile: One of PROFILES
+        fields: Optional set of keys overriding the profile's selection
+
+    Raises:
+        ValueError: for an unknown profile
+    """
+    if profile not in profile_fields:
+        raise ValueError(f"Unknown profile: {profile}")
+
+    if fields:
+        selected = fields
+    else:
+        selected = profile_fields[profile]
+
+    return {
+        key: value()
+        for key, value in serializers.items()
+        if selected is None or key in selected
+    }
@@ -6,6 +6,12 @@ from extensions import db
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta, timezone
 
+
+def _utcnow():
+    # Dates are stored as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class User(db.Model):
     """
     Enhanced User model for FUO Voting System with facial recognition
@@ -57,21 +63,25 @@ class User(db.Model):
     
     def is_locked(self):
         """Check if account is locked due to failed login attempts"""
-        if self.locked_until and self.locked_until > datetime.now(timezone.utc):
+        if self.locked_until and self.locked_until > _utcnow():
             return True
         return False
     
-    def increment_login_attempts(self):
+    def increment_login_attempts(self, max_attempts=5, lockout=timedelta(minutes=30)):
         """Increment failed login attempts"""
-        self.login_attempts += 1
-        if self.login_attempts >= 5:  # Lock after 5 failed attempts
-            self.locked_until = datetime.now(timezone.utc) + timedelta(minutes=30)
+        # A lapsed lock starts a fresh count instead of re-locking on one miss
+        if self.locked_until and self.locked_until <= _utcnow():
+            self.login_attempts = 0
+            self.locked_until = None
+        self.login_attempts = (self.login_attempts or 0) + 1
+        if self.login_attempts >= max_attempts:  # Lock after max_attempts failed attempts
+            self.locked_until = _utcnow() + lockout
     
     def reset_login_attempts(self):
         """Reset login attempts after successful login"""
         self.login_attempts = 0
         self.locked_until = None
-        self.last_login = datetime.now(timezone.utc)
+        self.last_login = _utcnow()
     
     def can_vote_in_election(self, election_id):
         """Check if user can vote in specific election"""
@@ -9,8 +9,13 @@ class Vote(db.Model):
     candidate_id = db.Column(db.Integer, db.ForeignKey('candidate.id'), nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     
-    # Ensure one vote per user per office per election
-    __table_args__ = (db.UniqueConstraint('user_id', 'election_id', 'office_id'),)
+    __table_args__ = (
+        # Ensure one vote per user per office per election; also serves
+        # lookups by user_id and by (user_id, election_id)
+        db.UniqueConstraint('user_id', 'election_id', 'office_id'),
+        # Results counting and tally rebuilds
+        db.Index('ix_vote_election_office_candidate', 'election_id', 'office_id', 'candidate_id'),
+    )
     
     def to_dict(self):
         return {
@@ -0,0 +1,15 @@
+from extensions import db
+
+class VoteTally(db.Model):
+    """
+    Materialised vote totals per office and candidate
+
+    Incremented in the same transaction as every cast, so results can be
+    read from a handful of rows instead of counting Vote.
+    """
+    __tablename__ = 'vote_tally'
+    
+    office_id = db.Column(db.Integer, db.ForeignKey('office.id', ondelete='CASCADE'), primary_key=True)
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidate.id', ondelete='CASCADE'), primary_key=True)
+    election_id = db.Column(db.Integer, db.ForeignKey('election.id', ondelete='CASCADE'), nullable=False, index=True)
+    votes = db.Column(db.Integer, nullable=False, default=0)
@@ -6,6 +6,9 @@ from models.office import Office
 from models.candidate import Candidate
 from models.vote import Vote
 from extensions import db
+from utils.ballot_catalogue import ballot_catalogue
+from utils.election_status import election_scheduler
+from utils.results_snapshot import results_snapshots
 from datetime import datetime
 
 admin_bp = Blueprint('admin', __name__)
@@ -35,6 +38,8 @@ def create_election():
         
         db.session.add(election)
         db.session.commit()
+        ballot_catalogue.bump()
+        election_scheduler.reschedule()
         
         return jsonify({
             'success': True,
@@ -68,7 +73,12 @@ def update_election(election_id):
         
         election.status = data.get('status', election.status)
         
+        # Edited elections are re-finalised when they next complete
+        results_snapshots.drop(election_id)
+        
         db.session.commit()
+        ballot_catalogue.bump()
+        election_scheduler.reschedule()
         
         return jsonify({
             'success': True,
@@ -90,8 +100,11 @@ def delete_election(election_id):
         if not election:
             return jsonify({'success': False, 'error': 'Election not found'}), 404
         
+        results_snapshots.drop(election_id)
         db.session.delete(election)
         db.session.commit()
+        ballot_catalogue.bump()
+        election_scheduler.reschedule()
         
         return jsonify({'success': True, 'message': 'Election deleted successfully'})
         
@@ -119,8 +132,11 @@ def create_office(election_id):
             election_id=election_id
         )
         
+        results_snapshots.drop(election_id)
         db.session.add(office)
         db.session.commit()
+        ballot_catalogue.bump()
+        election_scheduler.reschedule()
         
         return jsonify({
             'success': True,
@@ -154,8 +170,11 @@ def create_candidate(office_id):
             office_id=office_id
         )
         
+        results_snapshots.drop(office.election_id)
         db.session.add(candidate)
         db.session.commit()
+        ballot_catalogue.bump()
+        election_scheduler.reschedule()
         
         return jsonify({
             'success': True,
@@ -1,12 +1,22 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from models.user import User
 from extensions import db
+from utils.pagination import page_params, split_page
+from utils.rate_limit import rate_limiter
+from datetime import timedelta
 import json
 
 auth_bp = Blueprint('auth', __name__)
 
+def login_account():
+    """Email the login request is for, keying the per-account rate limit"""
+    data = request.get_json(silent=True) or {}
+    email = data.get('email')
+    return email if isinstance(email, str) and email else None
+
 @auth_bp.route('/login', methods=['POST'])
+@rate_limiter.limit('login', account=login_account)
 def login():
     try:
         data = request.get_json()
@@ -18,7 +28,15 @@ def login():
         
         user = User.query.filter_by(email=email).first()
         
+        # Refuse locked accounts before spending a password hash on them,
+        # with the same response as an unknown email so a lock reveals nothing
+        if user and user.is_locked():
+            return jsonify({'success': False, 'error': 'Invalid credentials'}), 401
+        
         if user and user.check_password(password):
+            user.reset_login_attempts()
+            db.session.commit()
+            
             access_token = create_access_token(identity=str(user.id))
             return jsonify({
                 'success': True,
@@ -26,9 +44,16 @@ def login():
                 'token': access_token
             }), 200
         else:
+            if user:
+                user.increment_login_attempts(
+                    current_app.config.get('MAX_LOGIN_ATTEMPTS', 5),
+                    current_app.config.get('LOCKOUT_DURATION', timedelta(minutes=30))
+                )
+                db.session.commit()
             return jsonify({'success': False, 'error': 'Invalid credentials'}), 401
             
     except Exception as e:
+        db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @auth_bp.route('/register', methods=['POST'])
@@ -109,15 +134,28 @@ def get_profile():
         if not user:
             return jsonify({'success': False, 'error': 'User not found'}), 404
         
-        # Get user's voting history
+        try:
+            limit, after = page_params()
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        # Get user's voting history, a page at a time when ?limit= is given
         from models.vote import Vote
-        votes = Vote.query.filter_by(user_id=user_id).all()
-        voting_history = [vote.to_dict() for vote in votes]
+        votes = Vote.query.filter_by(user_id=user_id).order_by(Vote.id)
+        if after is not None:
+            votes = votes.filter(Vote.id > after)
+        if limit is not None:
+            votes = votes.limit(limit + 1)
+        votes, next_cursor = split_page(votes.all(), limit, lambda vote: vote.id)
         
         user_data = user.to_dict()
-        user_data['votedOffices'] = voting_history
+        user_data['votedOffices'] = [vote.to_dict() for vote in votes]
+        
+        response = {'success': True, 'user': user_data}
+        if limit is not None:
+            response['nextCursor'] = next_cursor
         
-        return jsonify({'success': True, 'user': user_data})
+        return jsonify(response)
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
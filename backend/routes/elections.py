@@ -1,31 +1,83 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.election import Election
+from models.serialization import PROFILES, parse_fields
 from models.office import Office
 from models.candidate import Candidate
-from models.vote import Vote
 from models.user import User
 from extensions import db
+from utils.ballot_catalogue import ballot_catalogue, election_payload, load_live_counters
+from utils.tally import build_results, get_tally
+from utils.results_stream import results_publisher, StreamFull
+from utils.http_cache import listing_etag, election_etag, completed_max_age, not_modified, with_etag
+from utils.results_snapshot import results_snapshots
+from utils.pagination import page_params, split_page
+from sqlalchemy.orm import selectinload
 from datetime import datetime, timezone
 
 elections_bp = Blueprint('elections', __name__)
 
+def list_elections(scope, query):
+    """
+    Serialise an election listing
+
+    Query parameters:
+        profile: summary, ballot or full (default full)
+        fields: comma-separated keys overriding the profile's selection
+        limit, cursor: keyset pagination by election ID; the response then
+            includes 'nextCursor' (None on the last page)
+
+    Offices and candidates are eager loaded only when the selection needs
+    them, so every listing costs a constant number of queries.
+    """
+    profile = request.args.get('profile', 'full')
+    if profile not in PROFILES:
+        return jsonify({'success': False, 'error': f'Profile must be one of: {", ".join(PROFILES)}'}), 400
+    
+    fields = parse_fields(request.args.get('fields'))
+    
+    try:
+        limit, after = page_params()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    # The query string changes the payload, so it is part of the version
+    etag = listing_etag((scope, request.query_string))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    # Eager load exactly what the selected fields will serialise
+    election_keys = fields or Election.PROFILES[profile]
+    office_keys = Office.PROFILES[profile]
+    if election_keys is None or 'offices' in election_keys:
+        if office_keys is None or 'candidates' in office_keys:
+            query = query.options(selectinload(Election.offices).selectinload(Office.candidates))
+        else:
+            query = query.options(selectinload(Election.offices))
+    
+    query = query.order_by(Election.id)
+    if after is not None:
+        query = query.filter(Election.id > after)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    
+    elections, next_cursor = split_page(query.all(), limit, lambda election: election.id)
+    
+    payload = {
+        'success': True,
+        'elections': [election.to_dict(profile, fields) for election in elections]
+    }
+    if limit is not None:
+        payload['nextCursor'] = next_cursor
+    
+    return with_etag(jsonify(payload), etag)
+
 @elections_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_elections():
     try:
-        elections = Election.query.all()
-        
-        # Update election statuses
-        for election in elections:
-            election.update_status()
-        
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'elections': [election.to_dict() for election in elections]
-        })
+        return list_elections('all', Election.query)
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -34,18 +86,25 @@ def get_elections():
 @jwt_required()
 def get_election(election_id):
     try:
-        election = Election.query.get(election_id)
-        
-        if not election:
+        etag, _ = election_etag('election', election_id)
+        if not etag:
             return jsonify({'success': False, 'error': 'Election not found'}), 404
         
-        election.update_status()
-        db.session.commit()
+        # Live counters can still move after the close (late commits, shard
+        # folds), so clients revalidate; only frozen snapshots get a max-age
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        catalogue = ballot_catalogue.get(election_id)
         
-        return jsonify({
+        if not catalogue:
+            return jsonify({'success': False, 'error': 'Election not found'}), 404
+        
+        return with_etag(jsonify({
             'success': True,
-            'election': election.to_dict()
-        })
+            'election': election_payload(catalogue, load_live_counters(election_id))
+        }), etag)
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -55,20 +114,10 @@ def get_election(election_id):
 def get_active_elections():
     try:
         now = datetime.now(timezone.utc)
-        elections = Election.query.filter(
+        return list_elections('active', Election.query.filter(
             Election.start_date <= now,
             Election.end_date > now
-        ).all()
-        
-        for election in elections:
-            election.status = 'active'
-        
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'elections': [election.to_dict() for election in elections]
-        })
+        ))
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -78,17 +127,7 @@ def get_active_elections():
 def get_upcoming_elections():
     try:
         now = datetime.now(timezone.utc)
-        elections = Election.query.filter(Election.start_date > now).all()
-        
-        for election in elections:
-            election.status = 'upcoming'
-        
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'elections': [election.to_dict() for election in elections]
-        })
+        return list_elections('upcoming', Election.query.filter(Election.start_date > now))
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -98,60 +137,89 @@ def get_upcoming_elections():
 def get_completed_elections():
     try:
         now = datetime.now(timezone.utc)
-        elections = Election.query.filter(Election.end_date <= now).all()
-        
-        for election in elections:
-            election.status = 'completed'
-        
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'elections': [election.to_dict() for election in elections]
-        })
+        return list_elections('completed', Election.query.filter(Election.end_date <= now))
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def snapshot_response(snapshot):
+    """Full or 304 response for a frozen results snapshot"""
+    max_age = completed_max_age('completed')
+    cached = not_modified(snapshot['etag'], max_age)
+    if cached:
+        return cached
+    
+    response = current_app.response_class(snapshot['body'], mimetype='application/json')
+    return with_etag(response, snapshot['etag'], max_age)
+
 @elections_bp.route('/<int:election_id>/results', methods=['GET'])
 @jwt_required()
 def get_election_results(election_id):
     try:
-        election = Election.query.get(election_id)
+        # Completed elections are served from their frozen final results
+        snapshot = results_snapshots.cached(election_id)
+        if snapshot:
+            return snapshot_response(snapshot)
+        
+        etag, status = election_etag('results', election_id)
+        if not etag:
+            return jsonify({'success': False, 'error': 'Election not found'}), 404
+        
+        if status == 'completed':
+            snapshot = results_snapshots.get(election_id)
+            if snapshot:
+                return snapshot_response(snapshot)
+        
+        # Not finalised yet, so results can still change
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        catalogue = ballot_catalogue.get(election_id)
         
-        if not election:
+        if not catalogue:
             return jsonify({'success': False, 'error': 'Election not found'}), 404
         
-        # Calculate results for each office
-        results = {}
-        for office in election.offices:
-            office_results = {
-                'totalVotes': Vote.query.filter_by(election_id=election_id, office_id=office.id).count(),
-                'candidates': []
-            }
-            
-            for candidate in office.candidates:
-                vote_count = Vote.query.filter_by(
-                    election_id=election_id,
-                    office_id=office.id,
-                    candidate_id=candidate.id
-                ).count()
-                
-                candidate_result = candidate.to_dict()
-                candidate_result['votes'] = vote_count
-                candidate_result['percentage'] = (vote_count / office_results['totalVotes'] * 100) if office_results['totalVotes'] > 0 else 0
-                
-                office_results['candidates'].append(candidate_result)
-            
-            # Sort candidates by vote count
-            office_results['candidates'].sort(key=lambda x: x['votes'], reverse=True)
-            results[office.title] = office_results
-        
-        return jsonify({
+        election = election_payload(catalogue, load_live_counters(election_id))
+        
+        # Results from the materialised tally (one query)
+        results = build_results(election, get_tally(election_id))
+        
+        return with_etag(jsonify({
             'success': True,
             'results': results,
-            'election': election.to_dict()
-        })
+            'election': election
+        }), etag)
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@elections_bp.route('/<int:election_id>/results/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_election_results(election_id):
+    """
+    Live results as Server-Sent Events
+
+    Sends a 'snapshot' event with the full tally, then 'delta' events with
+    only the changed (office, candidate) totals. EventSource cannot set
+    headers, so the access token may be passed as ?jwt=<token>.
+    """
+    try:
+        if not ballot_catalogue.get(election_id):
+            return jsonify({'success': False, 'error': 'Election not found'}), 404
+        
+        try:
+            subscriber, snapshot = results_publisher.subscribe(election_id)
+        except StreamFull:
+            return jsonify({'success': False, 'error': 'Too many live result streams, please poll instead'}), 503
+        finally:
+            db.session.remove()  # don't hold a connection for the life of the stream
+        
+        return Response(
+            results_publisher.stream(election_id, subscriber, snapshot),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -2,10 +2,11 @@
 Face Recognition API Routes for CNN-based facial authentication
 """
 
-from flask import Blueprint, current_app, request, jsonify
+from flask import Blueprint, current_app, request, jsonify, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
 import os
+import uuid
 import cv2
 import numpy as np
 from datetime import datetime, timezone
@@ -16,13 +17,22 @@ import logging
 
 from models.user import User
 from models.face_data import FaceData
-from utils.cnn_face_recognition import face_recognition_system
+from utils.cnn_face_recognition import face_recognition_system, ARCHITECTURES
+from utils.face_audit import face_audit_job
+from utils import face_evaluation
+from utils.admission import face_admission
+from utils.verification_jobs import verification_jobs, JobQueueFull
+from utils.idempotency import idempotency
+from utils.rate_limit import rate_limiter
 from extensions import db
 
 logger = logging.getLogger(__name__)
 
 face_bp = Blueprint('face', __name__)
 
+RAW_IMAGE_MIMETYPES = {'image/jpeg', 'image/png'}
+MAX_LONG_POLL_SECONDS = 30
+
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and \
@@ -52,8 +62,223 @@ def decode_base64_image(base64_string):
         current_app.logger.error(f"Error decoding base64 image: {str(e)}")
         return None
 
+def get_face_image_data():
+    """
+    Read the face image from the request
+
+    Accepts, in order of preference:
+    - multipart/form-data with the image file in the 'face_data' field
+    - a raw image/jpeg or image/png request body
+    - JSON with a base64 encoded 'face_data' string (legacy clients)
+
+    Binary uploads are passed straight to the image decoder as bytes,
+    skipping the JSON parse and base64 decode copies.
+
+    Returns:
+        Raw image bytes or a base64 string, or None if no image was sent
+    """
+    if request.mimetype == 'multipart/form-data':
+        upload = request.files.get('face_data')
+        if not upload:
+            return None
+        return upload.read() or None
+
+    if request.mimetype in RAW_IMAGE_MIMETYPES:
+        return request.get_data(cache=False) or None
+
+    data = request.get_json(silent=True)
+    if not data or 'face_data' not in data:
+        return None
+    return data['face_data']
+
+def is_async_request():
+    """Whether the client asked for asynchronous processing"""
+    if request.args.get('async', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return 'respond-async' in request.headers.get('Prefer', '')
+
+def verification_response(result):
+    """Client-facing payload for a verification result"""
+    return {
+        'success': result['success'],
+        'confidence': result['confidence'],
+        'similarity': result.get('similarity'),
+        'threshold': result.get('threshold', 0.85),
+        'message': 'Face verified successfully' if result['success'] else 'Face verification failed'
+    }
+
+def face_sample(record):
+    """
+    Training sample for a FaceData record
+
+    The face crop precomputed at registration is loaded by whoever
+    preprocesses the sample (a pool worker during training), falling back
+    to the raw stored image for records created before crops existed.
+    """
+    return {
+        'user_id': record.user_id,
+        'image_path': record.image_path,
+        'face_data': record.face_encoding
+    }
+
+def dataset_samples(dataset_path):
+    """
+    Training samples from images uploaded through /dataset/upload
+
+    The dataset is laid out as <dataset_path>/<student_id>/<image>; images
+    are passed on as raw bytes and decoded by the preprocessing workers.
+    """
+    # Student IDs such as FUO/2020/001 become nested directories
+    images = {}
+    for directory, _, filenames in os.walk(dataset_path):
+        files = [os.path.join(directory, filename) for filename in sorted(filenames) if allowed_file(filename)]
+        if files:
+            images[os.path.relpath(directory, dataset_path).replace(os.sep, '/')] = files
+    if not images:
+        return []
+
+    user_ids = dict(db.session.query(User.student_id, User.id)
+                    .filter(User.student_id.in_(list(images)))
+                    .all())
+
+    samples = []
+    for student_id, user_id in user_ids.items():
+        for path in images[student_id]:
+            with open(path, 'rb') as f:
+                samples.append({'user_id': user_id, 'face_data': f.read()})
+    return samples
+
+def mark_holdout(records, test_indices):
+    """
+    Persist a training run's split: the records held out for testing are
+    flagged is_training_data=False so calibration only evaluates faces the
+    model never trained on. The caller commits.
+    """
+    holdout_ids = [records[index].id for index in test_indices]
+    db.session.execute(
+        db.update(FaceData)
+        .where(FaceData.id.in_([record.id for record in records]))
+        .values(is_training_data=FaceData.id.notin_(holdout_ids))
+        .execution_options(synchronize_session=False)
+    )
+
+def get_replay_sample(user_id):
+    """Random sample of other users' faces replayed during incremental enrollment"""
+    records = FaceData.query.filter(FaceData.user_id != user_id) \
+        .order_by(db.func.random()) \
+        .limit(face_recognition_system.replay_sample_size) \
+        .all()
+    return [face_sample(record) for record in records]
+
+def store_face_artifacts(user_id, face_data, artifacts):
+    """
+    Create or update the user's FaceData record with precomputed artefacts
+
+    The face crop is written to a temporary file; commit_face_artifacts
+    moves it over the user's crop only once the record is committed.
+
+    Returns:
+        Tuple of (face record, staged crop) for commit_face_artifacts
+    """
+    face_record = FaceData.query.filter_by(user_id=user_id).first()
+    if not face_record:
+        face_record = FaceData(user_id=user_id)
+        db.session.add(face_record)
+
+    crop_path = os.path.join(current_app.config['UPLOAD_FOLDER'], 'faces', f"{user_id}.png")
+    staged_path = os.path.join(os.path.dirname(crop_path), f".{user_id}.{uuid.uuid4().hex}.png")
+    face_recognition_system.save_face_crop(artifacts['face_crop'], staged_path)
+
+    if isinstance(face_data, (bytes, bytearray)):
+        face_data = base64.b64encode(face_data).decode('ascii')
+
+    face_record.face_encoding = face_data
+    face_record.image_path = crop_path
+    face_record.image_hash = artifacts['image_hash']
+    face_record.image_quality_score = artifacts['quality_score']
+    face_record.face_landmarks = None
+    if artifacts['landmarks'] is not None:
+        face_record.set_face_landmarks(artifacts['landmarks'])
+    face_record.cnn_features = None
+    face_record.cnn_features_version = None
+    if artifacts['cnn_features'] is not None:
+        face_record.set_cnn_features(artifacts['cnn_features'])
+        face_record.cnn_features_version = artifacts['embedding_version']
+    face_record.updated_at = db.func.current_timestamp()
+
+    return face_record, (staged_path, crop_path)
+
+def commit_face_artifacts(staged_crop):
+    """
+    Commit the session, then move the staged face crop into place
+
+    A failed commit discards the staged file, so the user's previous crop
+    is never overwritten by one the database does not describe.
+    """
+    staged_path, crop_path = staged_crop
+    try:
+        db.session.commit()
+    except Exception:
+        if os.path.exists(staged_path):
+            os.remove(staged_path)
+        raise
+    os.replace(staged_path, crop_path)
+
+def embed_enrolled_face(artifacts):
+    """
+    Add the CNN embedding to artefacts once the face has been enrolled
+
+    Computed after enrolment so it carries the embedding version of the
+    model that now serves the user.
+    """
+    artifacts['cnn_features'], artifacts['embedding_version'] = \
+        face_recognition_system.embed_face(artifacts['face_crop'])
+    return artifacts
+
+def current_reference_features(face_record):
+    """
+    Stored CNN embedding of a user's face for the model currently served
+
+    Enrolments only retrain the classifier head and keep the embedding
+    version, so this recomputes (and saves) an embedding only after a full
+    retrain changed the backbone.
+    """
+    version = face_recognition_system.current_embedding_version()
+    if version is None or face_record.cnn_features_version == version:
+        return face_record.get_cnn_features()
+
+    face_input = face_recognition_system.load_face_input(face_record.image_path, face_record.face_encoding)
+    embedding, version = face_recognition_system.embed_face(face_input)
+    if embedding is None:
+        return None
+
+    face_record.set_cnn_features(embedding)
+    face_record.cnn_features_version = version
+    try:
+        db.session.commit()
+    except Exception as e:
+        logger.warning(f"Could not save recomputed embedding: {str(e)}")
+        db.session.rollback()
+    return embedding
+
+def verify_with_reference(app, face_record_id, face_data, user_id):
+    """
+    Verification job: look up (or recompute) the stored reference embedding,
+    then verify, so neither runs in the request thread
+    """
+    with app.app_context():
+        try:
+            face_record = db.session.get(FaceData, face_record_id)
+            reference_features = current_reference_features(face_record) if face_record else None
+        finally:
+            db.session.remove()
+    return face_recognition_system.verify_face(face_data, user_id, reference_features=reference_features)
+
 @face_bp.route('/register', methods=['POST'])
 @jwt_required()
+@idempotency.idempotent('face_register')
+@rate_limiter.limit('face', account=get_jwt_identity)
+@face_admission.limit('register')
 def register_face():
     """
     Register face data for a user
@@ -62,46 +287,47 @@ def register_face():
     {
         "face_data": "base64_encoded_image"
     }
+    or a multipart/form-data 'face_data' file, or a raw image/jpeg body
     """
     try:
         current_user_id = get_jwt_identity()
-        data = request.get_json()
+        face_data = get_face_image_data()
         
-        if not data or 'face_data' not in data:
+        if not face_data:
             return jsonify({
                 'success': False,
                 'error': 'Face data is required'
             }), 400
         
-        face_data = data['face_data']
+        # Compute all face artefacts in a single pass; the embedding is
+        # taken after enrolment
+        artifacts = face_recognition_system.extract_face_artifacts(face_data, embed=False)
+        if artifacts is None:
+            return jsonify({
+                'success': False,
+                'error': 'Failed to process image'
+            }), 400
         
-        # Register face using CNN system
-        result = face_recognition_system.register_face(face_data, current_user_id)
+        # Register face using CNN system, enrolling it into the trained model
+        result = face_recognition_system.register_face(
+            artifacts['face_crop'], current_user_id, replay_data=get_replay_sample(current_user_id)
+        )
         
         if result['success']:
-            # Save face data to database
-            existing_face_data = FaceData.query.filter_by(user_id=current_user_id).first()
-            
-            if existing_face_data:
-                existing_face_data.face_encoding = face_data
-                existing_face_data.updated_at = db.func.current_timestamp()
-            else:
-                new_face_data = FaceData(
-                    user_id=current_user_id,
-                    face_encoding=face_data
-                )
-                db.session.add(new_face_data)
-            
             # Update user's face registration status
             user = User.query.get(current_user_id)
             if user:
                 user.face_registered = True
             
-            db.session.commit()
+            # Save face data and artefacts to database
+            embed_enrolled_face(artifacts)
+            _, staged_crop = store_face_artifacts(current_user_id, face_data, artifacts)
+            commit_face_artifacts(staged_crop)
             
             return jsonify({
                 'success': True,
-                'message': 'Face registered successfully'
+                'message': 'Face registered successfully',
+                'enrolled': result.get('enrolled', False)
             })
         else:
             return jsonify({
@@ -119,6 +345,8 @@ def register_face():
 
 @face_bp.route('/verify', methods=['POST'])
 @jwt_required()
+@rate_limiter.limit('face', account=get_jwt_identity)
+@face_admission.limit('verify')
 def verify_face():
     """
     Verify face data against registered face
@@ -127,19 +355,21 @@ def verify_face():
     {
         "face_data": "base64_encoded_image"
     }
+    or a multipart/form-data 'face_data' file, or a raw image/jpeg body
+    
+    With ?async=1 (or a 'Prefer: respond-async' header) the frame is queued
+    and 202 is returned with a job id to poll at GET /verify/<job_id>.
     """
     try:
         current_user_id = get_jwt_identity()
-        data = request.get_json()
+        face_data = get_face_image_data()
         
-        if not data or 'face_data' not in data:
+        if not face_data:
             return jsonify({
                 'success': False,
                 'error': 'Face data is required'
             }), 400
         
-        face_data = data['face_data']
-        
         # Check if user has registered face data
         user_face_data = FaceData.query.filter_by(user_id=current_user_id).first()
         if not user_face_data:
@@ -148,15 +378,37 @@ def verify_face():
                 'error': 'No face data registered for this user'
             }), 400
         
-        # Verify face using CNN system
-        result = face_recognition_system.verify_face(face_data, current_user_id)
+        if is_async_request():
+            try:
+                job_id = verification_jobs.submit(
+                    current_user_id,
+                    verify_with_reference,
+                    current_app._get_current_object(), user_face_data.id, face_data, current_user_id
+                )
+            except JobQueueFull:
+                response = jsonify({
+                    'success': False,
+                    'error': 'Service busy, please retry shortly',
+                    'retryAfter': face_admission.retry_after
+                })
+                response.headers['Retry-After'] = str(face_admission.retry_after)
+                return response, 503
+            
+            response = jsonify({
+                'success': True,
+                'jobId': job_id,
+                'status': 'pending'
+            })
+            response.headers['Location'] = url_for('face.get_verification_job', job_id=job_id)
+            return response, 202
+        
+        # Verify face using CNN system against the stored embedding
+        reference_features = current_reference_features(user_face_data)
+        result = face_recognition_system.verify_face(
+            face_data, current_user_id, reference_features=reference_features
+        )
         
-        return jsonify({
-            'success': result['success'],
-            'confidence': result['confidence'],
-            'threshold': result.get('threshold', 0.85),
-            'message': 'Face verified successfully' if result['success'] else 'Face verification failed'
-        })
+        return jsonify(verification_response(result))
         
     except Exception as e:
         logger.error(f"Face verification error: {str(e)}")
@@ -165,8 +417,49 @@ def verify_face():
             'error': 'Internal server error'
         }), 500
 
+@face_bp.route('/verify/<job_id>', methods=['GET'])
+@jwt_required()
+def get_verification_job(job_id):
+    """
+    Get the result of an asynchronous verification
+    
+    Pass ?wait=<seconds> (up to 30) to long-poll until the job finishes.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        wait = min(max(request.args.get('wait', 0, type=float), 0), MAX_LONG_POLL_SECONDS)
+        
+        status, result = verification_jobs.get(job_id, current_user_id, wait=wait)
+        
+        if status is None:
+            return jsonify({
+                'success': False,
+                'error': 'Verification job not found or expired'
+            }), 404
+        
+        if status == 'pending':
+            return jsonify({
+                'success': True,
+                'jobId': job_id,
+                'status': 'pending'
+            }), 202
+        
+        response = verification_response(result)
+        response.update({'jobId': job_id, 'status': status})
+        return jsonify(response)
+        
+    except Exception as e:
+        logger.error(f"Verification job lookup error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Internal server error'
+        }), 500
+
 @face_bp.route('/update', methods=['PUT'])
 @jwt_required()
+@idempotency.idempotent('face_update')
+@rate_limiter.limit('face', account=get_jwt_identity)
+@face_admission.limit('update')
 def update_face():
     """
     Update registered face data for a user
@@ -175,37 +468,37 @@ def update_face():
     {
         "face_data": "base64_encoded_image"
     }
+    or a multipart/form-data 'face_data' file, or a raw image/jpeg body
     """
     try:
         current_user_id = get_jwt_identity()
-        data = request.get_json()
+        face_data = get_face_image_data()
         
-        if not data or 'face_data' not in data:
+        if not face_data:
             return jsonify({
                 'success': False,
                 'error': 'Face data is required'
             }), 400
         
-        face_data = data['face_data']
+        # Compute all face artefacts in a single pass; the embedding is
+        # taken after enrolment
+        artifacts = face_recognition_system.extract_face_artifacts(face_data, embed=False)
+        if artifacts is None:
+            return jsonify({
+                'success': False,
+                'error': 'Failed to process image'
+            }), 400
         
         # Register/update face using CNN system
-        result = face_recognition_system.register_face(face_data, current_user_id)
+        result = face_recognition_system.register_face(
+            artifacts['face_crop'], current_user_id, replay_data=get_replay_sample(current_user_id)
+        )
         
         if result['success']:
-            # Update face data in database
-            face_record = FaceData.query.filter_by(user_id=current_user_id).first()
-            
-            if face_record:
-                face_record.face_encoding = face_data
-                face_record.updated_at = db.func.current_timestamp()
-            else:
-                new_face_data = FaceData(
-                    user_id=current_user_id,
-                    face_encoding=face_data
-                )
-                db.session.add(new_face_data)
-            
-            db.session.commit()
+            # Update face data and artefacts in database
+            embed_enrolled_face(artifacts)
+            _, staged_crop = store_face_artifacts(current_user_id, face_data, artifacts)
+            commit_face_artifacts(staged_crop)
             
             return jsonify({
                 'success': True,
@@ -250,22 +543,23 @@ def train_model():
                 'error': 'Insufficient face data for training (minimum 2 users required)'
             }), 400
         
-        # Prepare training data
-        training_data = []
-        for record in face_data_records:
-            training_data.append({
-                'user_id': record.user_id,
-                'face_data': record.face_encoding
-            })
+        # Prepare training data from the precomputed face crops
+        training_data = [face_sample(record) for record in face_data_records]
         
         # Train the model
-        history = face_recognition_system.train_model(training_data)
+        history, test_indices = face_recognition_system.train_model(
+            training_data, architecture=current_app.config.get('CNN_ARCHITECTURE')
+        )
         
         if history is not None:
+            mark_holdout(face_data_records, test_indices)
+            db.session.commit()
+            
             return jsonify({
                 'success': True,
                 'message': 'Model trained successfully',
-                'training_samples': len(training_data)
+                'training_samples': len(training_data),
+                'holdout_samples': len(test_indices)
             })
         else:
             return jsonify({
@@ -310,6 +604,10 @@ def get_model_info():
             'image_size': face_recognition_system.img_size
         }
         
+        if model_loaded:
+            model_info['architecture'] = face_recognition_system.metadata.get('architecture')
+            model_info['parameters'] = int(face_recognition_system.model.count_params())
+        
         if model_loaded and encoder_loaded:
             model_info['num_classes'] = len(face_recognition_system.label_encoder.classes_)
         
@@ -329,7 +627,14 @@ def get_model_info():
 @jwt_required()
 def train_cnn_model():
     """
-    Train CNN model on facial recognition dataset (Admin only)
+    Train CNN model on registered faces plus the uploaded dataset (Admin only)
+    
+    Optional JSON:
+    {
+        "epochs": 50,
+        "batch_size": 32,
+        "architecture": "standard" | "gap" | "separable"
+    }
     """
     try:
         user_id = get_jwt_identity()
@@ -339,26 +644,43 @@ def train_cnn_model():
             return jsonify({'success': False, 'error': 'Admin access required'}), 403
         
         # Get training parameters
-        data = request.get_json() or {}
-        dataset_path = data.get('dataset_path', 'datasets/faces')
-        epochs = data.get('epochs', 50)
-        batch_size = data.get('batch_size', 32)
+        data = request.get_json(silent=True) or {}
+        epochs = int(data.get('epochs', 50))
+        batch_size = int(data.get('batch_size', 32))
+        architecture = data.get('architecture', current_app.config.get('CNN_ARCHITECTURE'))
         
-        if not os.path.exists(dataset_path):
-            return jsonify({'success': False, 'error': 'Dataset path not found'}), 400
+        if architecture not in ARCHITECTURES:
+            return jsonify({'success': False, 'error': f'Unknown architecture: {architecture}'}), 400
+        
+        # Registered faces first, so test indices below len(face_data_records)
+        # map back to FaceData rows
+        face_data_records = FaceData.query.all()
+        training_data = [face_sample(record) for record in face_data_records]
+        training_data.extend(dataset_samples(current_app.config.get('FACE_DATASET_PATH', 'datasets/faces')))
+        
+        if len({sample['user_id'] for sample in training_data}) < 2:
+            return jsonify({
+                'success': False,
+                'error': 'Insufficient face data for training (minimum 2 users required)'
+            }), 400
         
         # Train model
-        current_app.logger.info(f"Starting CNN model training with {epochs} epochs")
+        current_app.logger.info(f"Starting CNN model training with {epochs} epochs "
+                                f"on {len(training_data)} samples")
         
-        history = face_recognition_system.train_model(
-            dataset_path=dataset_path,
+        history, test_indices = face_recognition_system.train_model(
+            training_data,
             epochs=epochs,
-            batch_size=batch_size
+            batch_size=batch_size,
+            architecture=architecture
         )
         
         if history is None:
             return jsonify({'success': False, 'error': 'Model training failed'}), 500
         
+        mark_holdout(face_data_records, [index for index in test_indices if index < len(face_data_records)])
+        db.session.commit()
+        
         # Get final training metrics
         final_accuracy = history.history['accuracy'][-1]
         final_val_accuracy = history.history['val_accuracy'][-1]
@@ -368,14 +690,18 @@ def train_cnn_model():
         return jsonify({
             'success': True,
             'message': 'CNN model trained successfully',
-            'final_accuracy': final_accuracy,
-            'final_val_accuracy': final_val_accuracy,
+            'final_accuracy': float(final_accuracy),
+            'final_val_accuracy': float(final_val_accuracy),
             'epochs_completed': len(history.history['accuracy']),
+            'training_samples': len(training_data),
+            'holdout_samples': len(test_indices),
+            'architecture': architecture,
             'model_path': face_recognition_system.model_path
         })
         
     except Exception as e:
         current_app.logger.error(f"Error training CNN model: {str(e)}")
+        db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @face_bp.route('/model-status', methods=['GET'])
@@ -434,6 +760,121 @@ def get_model_status():
         current_app.logger.error(f"Error getting model status: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@face_bp.route('/load', methods=['GET'])
+@jwt_required()
+def get_pipeline_load():
+    """
+    Get face pipeline in-flight counts, rate limits and rejection counters (Admin only)
+    """
+    try:
+        user_id = get_jwt_identity()
+        user = User.query.get(user_id)
+        
+        if not user or not user.is_admin:
+            return jsonify({'success': False, 'error': 'Admin access required'}), 403
+        
+        load = face_admission.stats()
+        load['asyncVerification'] = verification_jobs.stats()
+        load['idempotency'] = idempotency.stats()
+        load['rateLimit'] = rate_limiter.stats()
+        
+        return jsonify({'success': True, 'load': load})
+        
+    except Exception as e:
+        current_app.logger.error(f"Error getting pipeline load: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@face_bp.route('/calibrate', methods=['POST'])
+@jwt_required()
+def calibrate_threshold():
+    """
+    Evaluate the CNN model and recommend a confidence threshold (Admin only)
+    
+    Optional JSON:
+    {
+        "target_far": 0.001,
+        "holdout_only": true,
+        "rescore": false,
+        "apply": false
+    }
+    """
+    try:
+        user_id = get_jwt_identity()
+        user = User.query.get(user_id)
+        
+        if not user or not user.is_admin:
+            return jsonify({'success': False, 'error': 'Admin access required'}), 403
+        
+        if face_recognition_system.model is None or face_recognition_system.label_encoder is None:
+            return jsonify({'success': False, 'error': 'Model not trained or loaded'}), 400
+        
+        data = request.get_json(silent=True) or {}
+        report = face_evaluation.calibrate(
+            holdout_only=data.get('holdout_only', True),
+            target_far=float(data.get('target_far', 0.001)),
+            rescore=bool(data.get('rescore', False)),
+            apply=bool(data.get('apply', False)),
+            min_threshold=current_app.config.get('FACE_MIN_CONFIDENCE_THRESHOLD', 0.5)
+        )
+        
+        return jsonify({'success': True, 'calibration': report})
+        
+    except face_evaluation.CalibrationError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error calibrating threshold: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@face_bp.route('/audit', methods=['POST'])
+@jwt_required()
+def start_face_audit():
+    """
+    Re-score every registered face against the current model (Admin only)
+
+    Runs in the background; poll GET /audit for progress and the summary.
+    """
+    try:
+        user_id = get_jwt_identity()
+        user = User.query.get(user_id)
+        
+        if not user or not user.is_admin:
+            return jsonify({'success': False, 'error': 'Admin access required'}), 403
+        
+        if face_recognition_system.model is None or face_recognition_system.label_encoder is None:
+            return jsonify({'success': False, 'error': 'Model not trained or loaded'}), 400
+        
+        if not face_audit_job.start(current_app._get_current_object()):
+            return jsonify({'success': False, 'error': 'A face audit is already running'}), 409
+        
+        return jsonify({
+            'success': True,
+            'message': 'Face audit started',
+            'audit': face_audit_job.status()
+        }), 202
+        
+    except Exception as e:
+        current_app.logger.error(f"Error starting face audit: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@face_bp.route('/audit', methods=['GET'])
+@jwt_required()
+def get_face_audit():
+    """
+    Get progress and confidence distribution of the face audit (Admin only)
+    """
+    try:
+        user_id = get_jwt_identity()
+        user = User.query.get(user_id)
+        
+        if not user or not user.is_admin:
+            return jsonify({'success': False, 'error': 'Admin access required'}), 403
+        
+        return jsonify({'success': True, 'audit': face_audit_job.status()})
+        
+    except Exception as e:
+        current_app.logger.error(f"Error getting face audit status: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @face_bp.route('/dataset/upload', methods=['POST'])
 @jwt_required()
 def upload_training_data():
@@ -1,17 +1,70 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.election import Election
-from models.office import Office
-from models.candidate import Candidate
 from models.vote import Vote
 from models.user import User
 from extensions import db
-from datetime import datetime
+from utils.vote_counters import increment_vote_counters
+from utils.tally import increment_tally
+from utils.vote_ingestion import vote_ingestion, WITHDRAWN
+from utils.idempotency import idempotency
+from utils.ballot_catalogue import ballot_catalogue, election_payload, project_payload
+from utils.results_stream import results_publisher
+from utils.pagination import page_params, split_page
+from sqlalchemy.orm import joinedload
+from datetime import datetime, timezone
 
 voting_bp = Blueprint('voting', __name__)
 
+def _as_id(value):
+    """Integer ID from JSON input, or the raw value if it is not numeric"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+def validate_ballot(catalogue, votes_data):
+    """
+    Validate a ballot entirely in memory
+
+    Every entry must name an office of the election and one of its
+    candidates, each office may appear only once (one Vote row is stored
+    per office) and no office may receive more than its max_votes.
+
+    Returns:
+        Tuple of (list of (office_id, candidate_id), error message or None)
+    """
+    if not isinstance(votes_data, list):
+        return None, 'Votes must be a list'
+    
+    ballot = []
+    selections = {}
+    for vote_data in votes_data:
+        if not isinstance(vote_data, dict):
+            return None, 'Invalid vote entry'
+        office_id = _as_id(vote_data.get('officeId'))
+        candidate_id = _as_id(vote_data.get('candidateId'))
+        
+        office = catalogue['offices'].get(office_id)
+        if not office:
+            return None, f'Invalid office ID: {office_id}'
+        
+        if candidate_id not in office['candidates']:
+            return None, f'Invalid candidate ID: {candidate_id}'
+        
+        selections[office_id] = selections.get(office_id, 0) + 1
+        if selections[office_id] > office['max_votes']:
+            return None, f'Too many votes for office ID: {office_id}'
+        if selections[office_id] > 1:
+            return None, f'Duplicate entries for office ID: {office_id}'
+        
+        ballot.append((office_id, candidate_id))
+    
+    return ballot, None
+
 @voting_bp.route('/cast', methods=['POST'])
 @jwt_required()
+@idempotency.idempotent('cast')
 def cast_votes():
     try:
         user_id = get_jwt_identity()
@@ -21,19 +74,18 @@ def cast_votes():
             return jsonify({'success': False, 'error': 'User not found'}), 404
         
         data = request.get_json()
-        election_id = data.get('electionId')
+        election_id = _as_id(data.get('electionId'))
         votes_data = data.get('votes')  # List of {officeId, candidateId}
         
         if not election_id or not votes_data:
             return jsonify({'success': False, 'error': 'Election ID and votes are required'}), 400
         
-        election = Election.query.get(election_id)
-        if not election:
+        catalogue = ballot_catalogue.get(election_id)
+        if not catalogue:
             return jsonify({'success': False, 'error': 'Election not found'}), 404
         
         # Check if election is active
-        election.update_status()
-        if election.status != 'active':
+        if Election.derive_status(catalogue['start_date'], catalogue['end_date']) != 'active':
             return jsonify({'success': False, 'error': 'Election is not active'}), 400
         
         # Check if user has already voted in this election
@@ -41,55 +93,122 @@ def cast_votes():
         if existing_vote:
             return jsonify({'success': False, 'error': 'You have already voted in this election'}), 400
         
-        # Validate and cast votes
-        votes_to_add = []
-        for vote_data in votes_data:
-            office_id = vote_data.get('officeId')
-            candidate_id = vote_data.get('candidateId')
-            
-            # Validate office belongs to election
-            office = Office.query.filter_by(id=office_id, election_id=election_id).first()
-            if not office:
-                return jsonify({'success': False, 'error': f'Invalid office ID: {office_id}'}), 400
-            
-            # Validate candidate belongs to office
-            candidate = Candidate.query.filter_by(id=candidate_id, office_id=office_id).first()
-            if not candidate:
-                return jsonify({'success': False, 'error': f'Invalid candidate ID: {candidate_id}'}), 400
+        # Validate the whole ballot in memory against the cached catalogue
+        ballot, error = validate_ballot(catalogue, votes_data)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        
+        # Group-commit mode: hand the ballot to the single vote writer and
+        # wait until the group containing it has been committed
+        if vote_ingestion.enabled:
+            db.session.rollback()  # release read locks before the writer commits
+            result = vote_ingestion.cast(user_id, election_id, ballot)
+            if result['pending']:
+                # Timed out while being committed; the ballot may still land
+                return jsonify({
+                    'success': True,
+                    'pending': True,
+                    'message': 'Ballot received and still being recorded; check your voting status shortly'
+                }), 202
+            if result['error'] == WITHDRAWN:
+                return jsonify({'success': False, 'error': result['error']}), 503
+            if not result['success']:
+                return jsonify({'success': False, 'error': result['error']}), 400
             
-            # Create vote record
-            vote = Vote(
-                user_id=user_id,
-                election_id=election_id,
-                office_id=office_id,
-                candidate_id=candidate_id
-            )
-            votes_to_add.append(vote)
-        
-        # Add all votes to database
-        for vote in votes_to_add:
-            db.session.add(vote)
-        
-        # Update candidate vote counts
-        for vote_data in votes_data:
-            candidate = Candidate.query.get(vote_data.get('candidateId'))
-            candidate.votes_count += 1
-        
-        # Update election voted count
-        election.voted_count += 1
+            return jsonify({
+                'success': True,
+                'message': 'Votes cast successfully',
+                'votesCount': len(ballot)
+            })
+        
+        # Insert all votes with a single bulk insert
+        db.session.execute(db.insert(Vote), [
+            {
+                'user_id': user_id,
+                'election_id': election_id,
+                'office_id': office_id,
+                'candidate_id': candidate_id
+            }
+            for office_id, candidate_id in ballot
+        ])
+        
+        # Atomically increment candidate and election counters in SQL
+        increment_vote_counters(
+            election_id,
+            [candidate_id for _, candidate_id in ballot],
+            shards=current_app.config.get('VOTE_COUNTER_SHARDS', 1)
+        )
+        increment_tally(election_id, ballot)
         
         db.session.commit()
+        results_publisher.notify(election_id)
         
         return jsonify({
             'success': True,
             'message': 'Votes cast successfully',
-            'votesCount': len(votes_to_add)
+            'votesCount': len(ballot)
         })
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@voting_bp.route('/bootstrap', methods=['GET'])
+@jwt_required()
+def get_voter_bootstrap():
+    """
+    Everything the ballot screen needs in one response
+
+    Returns the user summary, face enrolment state, and every active
+    election with its ballot structure and whether the user has voted in
+    it. Costs three small queries (user, active election IDs, votes cast)
+    plus a catalogue load for any election not already cached.
+    """
+    try:
+        user_id = get_jwt_identity()
+        user = User.query.get(user_id)
+        
+        if not user:
+            return jsonify({'success': False, 'error': 'User not found'}), 404
+        
+        now = datetime.now(timezone.utc).replace(tzinfo=None)  # dates are stored as naive UTC
+        # Sorted here: ORDER BY id would make SQLite scan by rowid instead
+        # of using the end_date index
+        election_ids = sorted(row[0] for row in db.session.query(Election.id)
+                              .filter(Election.start_date <= now, Election.end_date >= now)
+                              .all())
+        
+        voted = set()
+        if election_ids:
+            voted = {row[0] for row in db.session.query(Vote.election_id)
+                     .filter(Vote.user_id == user_id, Vote.election_id.in_(election_ids))
+                     .distinct()
+                     .all()}
+        
+        elections = []
+        for election_id in election_ids:
+            catalogue = ballot_catalogue.get(election_id)
+            if not catalogue:
+                continue
+            election = project_payload(election_payload(catalogue), 'ballot')
+            election['hasVoted'] = election_id in voted
+            elections.append(election)
+        
+        return jsonify({
+            'success': True,
+            'user': user.to_dict(),
+            'face': {
+                'registered': bool(user.face_registered),
+                'verificationEnabled': bool(user.face_verification_enabled),
+                'registrationDate': user.face_registration_date.isoformat() if user.face_registration_date else None,
+                'lastVerification': user.last_face_verification.isoformat() if user.last_face_verification else None
+            },
+            'elections': elections
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @voting_bp.route('/status/<int:election_id>', methods=['GET'])
 @jwt_required()
 def get_voting_status(election_id):
@@ -109,34 +228,75 @@ def get_voting_status(election_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def load_voting_history(user_id, limit=None, after=None):
+    """
+    A voter's ballots grouped by election, with offices, candidates and
+    elections joined in rather than lazy loaded
+
+    Unpaginated history takes one query; a page takes two (the page's
+    election IDs, then their votes).
+
+    Returns:
+        Tuple of (history list, next cursor or None)
+    """
+    query = Vote.query \
+        .options(joinedload(Vote.election), joinedload(Vote.office), joinedload(Vote.candidate)) \
+        .filter(Vote.user_id == user_id) \
+        .order_by(Vote.election_id, Vote.id)
+    next_cursor = None
+    
+    if limit is not None or after is not None:
+        page = db.session.query(Vote.election_id) \
+            .filter(Vote.user_id == user_id) \
+            .distinct() \
+            .order_by(Vote.election_id)
+        if after is not None:
+            page = page.filter(Vote.election_id > after)
+        if limit is not None:
+            page = page.limit(limit + 1)
+        
+        election_ids, next_cursor = split_page([row[0] for row in page.all()], limit, lambda election_id: election_id)
+        if not election_ids:
+            return [], None
+        query = query.filter(Vote.election_id.in_(election_ids))
+    
+    history = {}
+    for vote in query.all():
+        entry = history.get(vote.election_id)
+        if entry is None:
+            entry = history[vote.election_id] = {
+                'election': vote.election.to_dict('summary'),
+                'votes': []
+            }
+        
+        vote_data = vote.to_dict()
+        vote_data['office'] = vote.office.to_dict('summary')
+        vote_data['candidate'] = vote.candidate.to_dict('summary')
+        entry['votes'].append(vote_data)
+    
+    return list(history.values()), next_cursor
+
 @voting_bp.route('/history', methods=['GET'])
 @jwt_required()
 def get_voting_history():
     try:
         user_id = get_jwt_identity()
         
-        votes = Vote.query.filter_by(user_id=user_id).all()
-        
-        # Group votes by election
-        history = {}
-        for vote in votes:
-            election_id = vote.election_id
-            if election_id not in history:
-                election = Election.query.get(election_id)
-                history[election_id] = {
-                    'election': election.to_dict(),
-                    'votes': []
-                }
-            
-            vote_data = vote.to_dict()
-            vote_data['office'] = vote.office.to_dict()
-            vote_data['candidate'] = vote.candidate.to_dict()
-            history[election_id]['votes'].append(vote_data)
+        try:
+            limit, after = page_params()
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
-        return jsonify({
+        history, next_cursor = load_voting_history(user_id, limit, after)
+        
+        response = {
             'success': True,
-            'history': list(history.values())
-        })
+            'history': history
+        }
+        if limit is not None:
+            response['nextCursor'] = next_cursor
+        
+        return jsonify(response)
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -0,0 +1,63 @@
+"""
+Shared fixtures: a bare Flask app bound to the models, without the CNN stack
+
+app.py imports TensorFlow through the face recognition system, so tests build
+their own minimal app around the same db extension instead.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from extensions import db
+from models import User, Election, Office, Candidate
+
+
+def create_test_app(database_uri, **engine_options):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def make_user(index):
+    return User(
+        name=f'Student {index}',
+        student_id=f'FUO/TEST/{index:05d}',
+        email=f'student{index}@fuo.edu.ng',
+        phone='08000000000',
+        department='Computer Science',
+        level='300',
+        password_hash='x'
+    )
+
+
+def make_election(title='Test Election', offices=2, candidates=3, start=None, end=None):
+    """Election with `offices` offices of `candidates` candidates each"""
+    start = start or datetime.utcnow() - timedelta(days=1)
+    election = Election(title=title, description=title, start_date=start,
+                        end_date=end or start + timedelta(days=2))
+    for o in range(offices):
+        office = Office(title=f'Office {o}', description=f'Office {o}')
+        office.candidates = [
+            Candidate(name=f'Candidate {o}.{c}', department='CSC', level='400',
+                      matric_no=f'M{o}{c}', manifesto='-')
+            for c in range(candidates)
+        ]
+        election.offices.append(office)
+    return election
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    """App on a temporary SQLite file, shared by threads on separate connections"""
+    app = create_test_app(f'sqlite:///{tmp_path / "test.db"}',
+                          connect_args={'timeout': 30})
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
@@ -0,0 +1,67 @@
+"""
+GET /api/voting/bootstrap costs three queries once the catalogue is warm
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import JWTManager, create_access_token
+from sqlalchemy import event
+
+from extensions import db
+from models import Vote
+from routes.voting import voting_bp
+from utils.ballot_catalogue import ballot_catalogue
+from tests.conftest import make_user, make_election
+
+
+@pytest.fixture
+def app(file_app):
+    file_app.config['JWT_SECRET_KEY'] = 'test-secret-key-of-at-least-32-bytes'
+    JWTManager(file_app)
+    file_app.register_blueprint(voting_bp, url_prefix='/api/voting')
+    ballot_catalogue.bump()
+    return file_app
+
+
+def seed():
+    now = datetime.utcnow()
+    voted = make_election('Voted')
+    open_ = make_election('Open')
+    closed = make_election('Closed', start=now - timedelta(days=3), end=now - timedelta(days=2))
+    user = make_user(1)
+    db.session.add_all([voted, open_, closed, user])
+    db.session.commit()
+
+    office = voted.offices[0]
+    db.session.add(Vote(user_id=user.id, election_id=voted.id,
+                        office_id=office.id, candidate_id=office.candidates[0].id))
+    db.session.commit()
+    return user.id, voted.id, open_.id
+
+
+def test_warm_bootstrap_takes_three_queries(app):
+    with app.app_context():
+        user_id, voted_id, open_id = seed()
+        token = create_access_token(identity=str(user_id))
+        for election_id in (voted_id, open_id):
+            assert ballot_catalogue.get(election_id)
+        db.session.remove()
+
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', before_execute)
+        try:
+            response = app.test_client().get('/api/voting/bootstrap',
+                                             headers={'Authorization': f'Bearer {token}'})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_execute)
+
+    data = response.get_json()
+    assert response.status_code == 200, data
+    assert {e['id']: e['hasVoted'] for e in data['elections']} == {voted_id: True, open_id: False}
+    assert len(statements) == 3, statements
@@ -0,0 +1,82 @@
+"""
+Locked accounts are refused without a password check; lapsed locks start over
+"""
+
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+from flask_jwt_extended import JWTManager
+
+from extensions import db
+from models import User
+from routes.auth import auth_bp
+from tests.conftest import make_user
+
+PASSWORD = 'correct horse'
+
+
+@pytest.fixture
+def app(file_app):
+    file_app.config['JWT_SECRET_KEY'] = 'test-secret-key-of-at-least-32-bytes'
+    file_app.config['MAX_LOGIN_ATTEMPTS'] = 3
+    JWTManager(file_app)
+    file_app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    return file_app
+
+
+def seed(app, **fields):
+    with app.app_context():
+        user = make_user(1)
+        user.set_password(PASSWORD)
+        for name, value in fields.items():
+            setattr(user, name, value)
+        db.session.add(user)
+        db.session.commit()
+        return user.id, user.email
+
+
+def login(app, email, password):
+    return app.test_client().post('/api/auth/login', json={'email': email, 'password': password})
+
+
+def stored(app, user_id):
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        return user.login_attempts, user.locked_until
+
+
+def test_failures_lock_the_account(app):
+    user_id, email = seed(app)
+
+    for _ in range(3):
+        assert login(app, email, 'wrong').status_code == 401
+
+    attempts, locked_until = stored(app, user_id)
+    assert attempts == 3
+    assert locked_until > datetime.utcnow()
+
+
+def test_locked_account_gets_401_without_password_check(app):
+    locked_until = datetime.utcnow() + timedelta(minutes=10)
+    user_id, email = seed(app, login_attempts=3, locked_until=locked_until)
+
+    with mock.patch.object(User, 'check_password') as check_password:
+        response = login(app, email, PASSWORD)
+
+    assert response.status_code == 401
+    assert response.get_json() == {'success': False, 'error': 'Invalid credentials'}
+    check_password.assert_not_called()
+    assert stored(app, user_id) == (3, locked_until)
+
+
+def test_lapsed_lock_restarts_the_count(app):
+    user_id, email = seed(app, login_attempts=3,
+                          locked_until=datetime.utcnow() - timedelta(minutes=1))
+
+    assert login(app, email, 'wrong').status_code == 401
+    assert stored(app, user_id) == (1, None)
+
+    response = login(app, email, PASSWORD)
+    assert response.status_code == 200
+    assert stored(app, user_id) == (0, None)
@@ -0,0 +1,124 @@
+"""
+Hot queries must be answered from an index, not a table scan
+
+Builds the schema in an in-memory SQLite database, seeds a synthetic dataset
+shaped like a few years of use (mostly finished elections, many votes, one
+face record per student), runs ANALYZE and checks EXPLAIN QUERY PLAN.
+"""
+
+from datetime import datetime, timedelta
+import random
+
+import pytest
+
+from extensions import db
+from models import User, Election, Office, Candidate, Vote, FaceData
+from tests.conftest import create_test_app
+
+USERS = 2000
+PAST_ELECTIONS = 400
+OFFICES_PER_ELECTION = 4
+CANDIDATES_PER_OFFICE = 3
+
+
+def seed(now):
+    rng = random.Random(0)
+
+    db.session.execute(db.insert(User), [
+        {'id': i, 'name': f'Student {i}', 'student_id': f'FUO/SYN/{i:05d}',
+         'email': f'student{i}@fuo.edu.ng', 'phone': '08000000000',
+         'department': 'Computer Science', 'level': '300', 'password_hash': 'x'}
+        for i in range(1, USERS + 1)
+    ])
+
+    # Mostly finished elections, a few running and a few scheduled
+    windows = [(now - timedelta(days=7 * i + 2), now - timedelta(days=7 * i + 1))
+               for i in range(1, PAST_ELECTIONS + 1)]
+    windows += [(now - timedelta(hours=1), now + timedelta(days=1))] * 3
+    windows += [(now + timedelta(days=d), now + timedelta(days=d + 1)) for d in range(1, 6)]
+    db.session.execute(db.insert(Election), [
+        {'id': i, 'title': f'Election {i}', 'description': '-', 'start_date': start,
+         'end_date': end, 'status': Election.derive_status(start, end, now)}
+        for i, (start, end) in enumerate(windows, 1)
+    ])
+
+    offices, candidates = [], []
+    for election_id in range(1, len(windows) + 1):
+        for o in range(OFFICES_PER_ELECTION):
+            office_id = len(offices) + 1
+            offices.append({'id': office_id, 'title': f'Office {o}', 'description': '-',
+                            'election_id': election_id})
+            candidates += [{'id': (office_id - 1) * CANDIDATES_PER_OFFICE + c + 1, 'name': f'Candidate {c}', 'department': 'CSC',
+                            'level': '400', 'matric_no': f'M{c}', 'manifesto': '-',
+                            'office_id': office_id}
+                           for c in range(CANDIDATES_PER_OFFICE)]
+    db.session.execute(db.insert(Office), offices)
+    db.session.execute(db.insert(Candidate), candidates)
+
+    # Every student votes in a sample of the elections
+    votes = []
+    for election_id in range(1, PAST_ELECTIONS + 1, 4):
+        for user_id in rng.sample(range(1, USERS + 1), 100):
+            for o in range(OFFICES_PER_ELECTION):
+                office_id = (election_id - 1) * OFFICES_PER_ELECTION + o + 1
+                votes.append({'user_id': user_id, 'election_id': election_id, 'office_id': office_id,
+                              'candidate_id': (office_id - 1) * CANDIDATES_PER_OFFICE
+                              + rng.randrange(CANDIDATES_PER_OFFICE) + 1})
+    db.session.execute(db.insert(Vote), votes)
+
+    db.session.execute(db.insert(FaceData), [
+        {'user_id': user_id, 'face_encoding': '[]'}
+        for user_id in range(1, USERS + 1) for _ in range(2)
+    ])
+
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+
+
+@pytest.fixture(scope='module')
+def plan():
+    app = create_test_app('sqlite://')
+    now = datetime.utcnow()
+    with app.app_context():
+        seed(now)
+
+        def explain(sql, **params):
+            rows = db.session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}'),
+                                      {'now': now, **params}).all()
+            return ' | '.join(row[-1] for row in rows)
+
+        yield explain
+
+
+def assert_index(detail, *indexes):
+    """The plan searches one of the given indexes"""
+    assert any(f'USING INDEX {index}' in detail or f'USING COVERING INDEX {index}' in detail
+               for index in indexes), detail
+
+
+def test_active_election_window(plan):
+    # Either bound can drive the search; without STAT4 SQLite may pick either
+    assert_index(plan('SELECT id FROM election WHERE start_date <= :now AND end_date >= :now'),
+                 'ix_election_start_date', 'ix_election_end_date')
+
+
+def test_upcoming_elections(plan):
+    assert_index(plan('SELECT min(start_date) FROM election WHERE start_date > :now'),
+                 'ix_election_start_date')
+
+
+def test_next_close(plan):
+    assert_index(plan('SELECT min(end_date) FROM election WHERE end_date >= :now'),
+                 'ix_election_end_date')
+
+
+def test_votes_by_election_office_candidate(plan):
+    detail = plan('SELECT office_id, candidate_id, count(id) FROM vote WHERE election_id = :election_id '
+                  'GROUP BY office_id, candidate_id', election_id=5)
+    assert_index(detail, 'ix_vote_election_office_candidate')
+    assert 'TEMP B-TREE' not in detail, detail
+
+
+def test_face_data_by_user(plan):
+    assert_index(plan('SELECT * FROM face_data WHERE user_id = :user_id LIMIT 1', user_id=42),
+                 'ix_face_data_user_id')
@@ -0,0 +1,76 @@
+"""
+Sliding-window estimate, Retry-After and the shared SQLite window store
+"""
+
+import threading
+
+import pytest
+
+from utils.rate_limit import SQLiteWindowStore, window_estimate, retry_after
+
+LIMIT = 5
+WINDOW = 100.0
+NOW = 1000 * WINDOW + 25.0  # a quarter into a window
+
+
+def test_window_estimate_weights_previous_bucket():
+    assert window_estimate(10, 2, 0.0) == 12
+    assert window_estimate(10, 2, 0.8) == pytest.approx(4)
+    assert window_estimate(10, 2, 1.0) == 2
+
+
+def test_retry_after_full_current_bucket():
+    # Rest of this bucket, then until 5 * (1 - e) <= 4 in the next one
+    assert retry_after(0, 5, 0.5, LIMIT, WINDOW) == 70
+    assert window_estimate(5, 0, 0.2) == pytest.approx(LIMIT - 1)
+
+
+def test_retry_after_decaying_previous_bucket():
+    # 10 * (1 - e) + 2 <= 4 once e reaches 0.8
+    assert retry_after(10, 2, 0.25, LIMIT, WINDOW) == 55
+    assert window_estimate(10, 2, 0.8) <= LIMIT - 1
+
+
+def test_retry_after_is_at_least_one_second():
+    assert retry_after(0, 0, 0.5, LIMIT, WINDOW) == 1
+    assert retry_after(10, 0, 0.9999, LIMIT, WINDOW) == 1
+
+
+def check(key='login:ip:10.0.0.1'):
+    return [('ip', key, LIMIT, WINDOW)]
+
+
+def test_hit_blocks_at_limit_and_allows_after_retry(tmp_path):
+    store = SQLiteWindowStore(str(tmp_path / 'limits.db'))
+
+    for _ in range(LIMIT):
+        assert store.hit('login', check(), now=NOW) == (True, 0, None)
+    allowed, wait, scope = store.hit('login', check(), now=NOW)
+    assert (allowed, scope) == (False, 'ip')
+    assert wait == retry_after(0, LIMIT, 0.25, LIMIT, WINDOW)
+
+    assert store.hit('login', check(), now=NOW + wait)[0]
+    assert store.hit('login', check('login:ip:10.0.0.2'), now=NOW)[0]
+    assert store.rejections() == {'login': {'ip': 1}}
+
+
+def test_hit_shares_limit_across_connections(tmp_path):
+    path = str(tmp_path / 'limits.db')
+    stores = [SQLiteWindowStore(path, timeout=10), SQLiteWindowStore(path, timeout=10)]
+    results = []
+    start = threading.Barrier(4)
+
+    def worker(store):
+        start.wait()
+        for _ in range(LIMIT):
+            results.append(store.hit('login', check(), now=NOW)[0])
+
+    threads = [threading.Thread(target=worker, args=(store,)) for store in stores * 2]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == LIMIT
+    assert len(results) == 4 * LIMIT
+    assert stores[1].rejections() == {'login': {'ip': 3 * LIMIT}}
@@ -0,0 +1,101 @@
+"""
+Elections whose votes predate the tally table get it backfilled on first read
+"""
+
+import threading
+
+import pytest
+
+from extensions import db
+from models import Vote, Election
+from utils import tally
+from utils.tally import count_votes, get_tally, increment_tally
+from tests.conftest import make_user, make_election
+
+VOTERS = 30
+
+
+@pytest.fixture(autouse=True)
+def forget_initialized():
+    tally._initialized.clear()
+    yield
+    tally._initialized.clear()
+
+
+def seed_legacy(app, voted):
+    """Election with `voted` ballots cast without a tally, flagged uninitialised"""
+    with app.app_context():
+        election = make_election()
+        users = [make_user(i) for i in range(VOTERS)]
+        db.session.add(election)
+        db.session.add_all(users)
+        db.session.commit()
+        ballot = [(office.id, office.candidates[i % len(office.candidates)].id)
+                  for i, office in enumerate(election.offices)]
+        db.session.add_all([
+            Vote(user_id=user.id, election_id=election.id,
+                 office_id=office_id, candidate_id=candidate_id)
+            for user in users[:voted] for office_id, candidate_id in ballot
+        ])
+        election.tally_initialized = None
+        db.session.commit()
+        return election.id, [user.id for user in users[voted:]], ballot
+
+
+def test_first_read_backfills_tally(file_app):
+    election_id, _, ballot = seed_legacy(file_app, voted=10)
+
+    with file_app.app_context():
+        totals = get_tally(election_id)
+        assert sum(totals.values()) == 10 * len(ballot)
+        assert totals == count_votes(election_id)
+        assert db.session.get(Election, election_id).tally_initialized is True
+
+
+def test_backfill_races_casts(file_app):
+    election_id, user_ids, ballot = seed_legacy(file_app, voted=10)
+    errors = []
+    start = threading.Barrier(len(user_ids) + 1)
+
+    def cast(user_id):
+        with file_app.app_context():
+            try:
+                start.wait()
+                db.session.add_all([
+                    Vote(user_id=user_id, election_id=election_id,
+                         office_id=office_id, candidate_id=candidate_id)
+                    for office_id, candidate_id in ballot
+                ])
+                db.session.execute(
+                    db.update(Election).where(Election.id == election_id)
+                    .values(voted_count=Election.voted_count + 1)
+                )
+                increment_tally(election_id, ballot)
+                db.session.commit()
+            except Exception as e:
+                errors.append(e)
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+    def read():
+        with file_app.app_context():
+            try:
+                start.wait()
+                get_tally(election_id)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=cast, args=(user_id,)) for user_id in user_ids]
+    threads.append(threading.Thread(target=read))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+    with file_app.app_context():
+        assert get_tally(election_id) == count_votes(election_id)
+        assert sum(count_votes(election_id).values()) == VOTERS * len(ballot)
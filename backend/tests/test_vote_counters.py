@@ -0,0 +1,87 @@
+"""
+Concurrent casts must leave counters equal to COUNT(*) of Vote
+"""
+
+import threading
+
+import pytest
+
+from extensions import db
+from models import Vote, Election, Candidate, CandidateCounterShard
+from utils.vote_counters import increment_vote_counters, fold_counter_shards
+from tests.conftest import make_user, make_election
+
+VOTERS = 40
+
+
+def seed(app):
+    with app.app_context():
+        election = make_election()
+        users = [make_user(i) for i in range(VOTERS)]
+        db.session.add(election)
+        db.session.add_all(users)
+        db.session.commit()
+        ballot = [(office.id, office.candidates[i % len(office.candidates)].id)
+                  for i, office in enumerate(election.offices)]
+        return election.id, [user.id for user in users], ballot
+
+
+def cast_concurrently(app, election_id, user_ids, ballot, shards):
+    errors = []
+    start = threading.Barrier(len(user_ids))
+
+    def cast(user_id):
+        with app.app_context():
+            try:
+                start.wait()
+                db.session.add_all([
+                    Vote(user_id=user_id, election_id=election_id,
+                         office_id=office_id, candidate_id=candidate_id)
+                    for office_id, candidate_id in ballot
+                ])
+                increment_vote_counters(election_id, [c for _, c in ballot], shards=shards)
+                db.session.commit()
+            except Exception as e:
+                errors.append(e)
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=cast, args=(user_id,)) for user_id in user_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def vote_counts():
+    return dict(db.session.query(Vote.candidate_id, db.func.count())
+                .group_by(Vote.candidate_id).all())
+
+
+@pytest.mark.parametrize('shards', [1, 4])
+def test_counters_match_votes(file_app, shards):
+    election_id, user_ids, ballot = seed(file_app)
+
+    errors = cast_concurrently(file_app, election_id, user_ids, ballot, shards)
+    assert errors == []
+
+    with file_app.app_context():
+        expected = vote_counts()
+        assert sum(expected.values()) == VOTERS * len(ballot)
+
+        shard_sums = dict(db.session.query(CandidateCounterShard.candidate_id,
+                                           db.func.sum(CandidateCounterShard.count))
+                          .group_by(CandidateCounterShard.candidate_id).all())
+        counters = {candidate.id: candidate.votes_count + shard_sums.get(candidate.id, 0)
+                    for candidate in Candidate.query.all()}
+        assert {k: v for k, v in counters.items() if v} == expected
+        assert db.session.get(Election, election_id).voted_count == VOTERS
+
+        if shards > 1:
+            assert shard_sums
+            assert fold_counter_shards() == VOTERS * len(ballot)
+            folded = {candidate.id: candidate.votes_count
+                      for candidate in Candidate.query.all() if candidate.votes_count}
+            assert folded == expected
@@ -0,0 +1,128 @@
+"""
+Admission control and load shedding for expensive endpoints
+
+Bounds how many requests may run the face pipeline at once. Requests beyond
+the in-flight limit wait in a short bounded queue; once the queue is full,
+or a queued request waits too long, the client gets an immediate 503 with
+Retry-After instead of tying up a worker until the proxy times out.
+"""
+
+from functools import wraps
+import threading
+import logging
+
+from flask import jsonify
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionController:
+    """
+    Bounded in-flight limit with a queue-depth threshold
+
+    Configured from the Flask app via init_app:
+    - FACE_MAX_INFLIGHT: requests allowed inside the pipeline at once
+    - FACE_MAX_QUEUE: requests allowed to wait for a slot
+    - FACE_QUEUE_TIMEOUT: seconds a queued request waits before rejection
+    - FACE_RETRY_AFTER: Retry-After seconds sent with 503 responses
+    """
+
+    def __init__(self, app=None, max_inflight=4, max_queue=8, queue_timeout=2.0, retry_after=2):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._condition = threading.Condition()
+        self._inflight = 0
+        self._queued = 0
+        self._counters = {}
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_inflight = app.config.get('FACE_MAX_INFLIGHT', self.max_inflight)
+        self.max_queue = app.config.get('FACE_MAX_QUEUE', self.max_queue)
+        self.queue_timeout = app.config.get('FACE_QUEUE_TIMEOUT', self.queue_timeout)
+        self.retry_after = app.config.get('FACE_RETRY_AFTER', self.retry_after)
+
+    def _endpoint_counters(self, endpoint):
+        return self._counters.setdefault(endpoint, {'inflight': 0, 'admitted': 0, 'rejected': 0})
+
+    def acquire(self, endpoint):
+        """
+        Try to enter the pipeline
+
+        Returns:
+            True if admitted, False if the request should be shed
+        """
+        with self._condition:
+            counters = self._endpoint_counters(endpoint)
+
+            if self._inflight >= self.max_inflight:
+                if self._queued >= self.max_queue:
+                    counters['rejected'] += 1
+                    return False
+
+                self._queued += 1
+                try:
+                    admitted = self._condition.wait_for(
+                        lambda: self._inflight < self.max_inflight,
+                        timeout=self.queue_timeout
+                    )
+                finally:
+                    self._queued -= 1
+
+                if not admitted:
+                    counters['rejected'] += 1
+                    return False
+
+            self._inflight += 1
+            counters['inflight'] += 1
+            counters['admitted'] += 1
+            return True
+
+    def release(self, endpoint):
+        """Leave the pipeline and wake one queued request"""
+        with self._condition:
+            self._inflight -= 1
+            self._endpoint_counters(endpoint)['inflight'] -= 1
+            self._condition.notify()
+
+    def limit(self, endpoint):
+        """Decorator shedding load for a view once the pipeline is saturated"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.acquire(endpoint):
+                    logger.warning(f"Shedding {endpoint} request: face pipeline saturated")
+                    response = jsonify({
+                        'success': False,
+                        'error': 'Service busy, please retry shortly',
+                        'retryAfter': self.retry_after
+                    })
+                    response.status_code = 503
+                    response.headers['Retry-After'] = str(self.retry_after)
+                    return response
+
+                try:
+                    return view(*args, **kwargs)
+                finally:
+                    self.release(endpoint)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        """Current limits, occupancy and per-endpoint counters"""
+        with self._condition:
+            return {
+                'maxInflight': self.max_inflight,
+                'maxQueue': self.max_queue,
+                'inflight': self._inflight,
+                'queued': self._queued,
+                'endpoints': {endpoint: dict(counters) for endpoint, counters in self._counters.items()}
+            }
+
+
+# Global instance for the face recognition pipeline
+face_admission = AdmissionController()
@@ -0,0 +1,202 @@
+"""
+Per-process ballot catalogue cache
+
+Elections, offices and candidates only change when an admin edits them, yet
+every cast, election view and results request used to reload them. The
+catalogue for an election is loaded once, with validation sets and
+pre-serialised to_dict payloads, and kept until the admin routes bump the
+catalogue version. Entries also expire after BALLOT_CATALOGUE_TTL seconds so
+edits made through another worker process are picked up.
+
+Status, counters and updatedAt change with every vote, so they are not
+cached: status is derived from the cached dates and counters are overlaid
+from a small live read when a response needs them.
+"""
+
+import threading
+import time
+import logging
+
+from sqlalchemy.orm import selectinload
+
+from extensions import db
+from models.election import Election
+from models.office import Office
+from models.candidate import Candidate
+
+logger = logging.getLogger(__name__)
+
+
+def build_catalogue(election):
+    """
+    Catalogue entry for an election with its offices and candidates loaded
+
+    Returns:
+        Dictionary with the election window, 'offices' mapping office ID to
+        its max votes and frozenset of candidate IDs, and the serialised
+        election payload
+    """
+    payload = election.to_dict()
+    offices = {
+        office['id']: {
+            'max_votes': office['maxVotes'] or 1,
+            'candidates': frozenset(candidate['id'] for candidate in office['candidates'])
+        }
+        for office in payload['offices']
+    }
+
+    return {
+        'election_id': election.id,
+        'start_date': election.start_date,
+        'end_date': election.end_date,
+        'offices': offices,
+        'payload': payload
+    }
+
+
+def load_live_counters(election_id):
+    """
+    Current vote counters for an election
+
+    Returns:
+        Tuple of (voted_count, updated_at, {candidate_id: votes_count})
+    """
+    voted_count, updated_at = db.session.query(Election.voted_count, Election.updated_at) \
+        .filter(Election.id == election_id) \
+        .one()
+    votes = dict(
+        db.session.query(Candidate.id, Candidate.votes_count)
+        .join(Office, Candidate.office_id == Office.id)
+        .filter(Office.election_id == election_id)
+        .all()
+    )
+    return voted_count, updated_at, votes
+
+
+def election_payload(catalogue, counters=None):
+    """
+    Election to_dict payload from a catalogue entry
+
+    Args:
+        catalogue: Entry returned by BallotCatalogueCache.get
+        counters: Optional result of load_live_counters to overlay
+
+    Returns:
+        New dictionary; the cached payload is never mutated
+    """
+    cached = catalogue['payload']
+    payload = dict(cached)
+    payload['status'] = Election.derive_status(catalogue['start_date'], catalogue['end_date'])
+
+    if counters is not None:
+        voted_count, updated_at, votes = counters
+        payload['votedCount'] = voted_count
+        payload['updatedAt'] = updated_at.isoformat()
+        payload['offices'] = [
+            dict(office, candidates=[
+                dict(candidate, votes=votes.get(candidate['id'], candidate['votes']))
+                for candidate in office['candidates']
+            ])
+            for office in cached['offices']
+        ]
+
+    return payload
+
+
+def _select(data, keys):
+    return dict(data) if keys is None else {key: value for key, value in data.items() if key in keys}
+
+
+def project_payload(payload, profile):
+    """
+    Trim a full election payload to a serialisation profile
+
+    Matches Election.to_dict(profile) without touching the database.
+    """
+    election = _select(payload, Election.PROFILES[profile])
+    if 'offices' in election:
+        offices = []
+        for office in payload['offices']:
+            projected = _select(office, Office.PROFILES[profile])
+            if 'candidates' in projected:
+                projected['candidates'] = [
+                    _select(candidate, Candidate.PROFILES[profile]) for candidate in office['candidates']
+                ]
+            offices.append(projected)
+        election['offices'] = offices
+    return election
+
+
+class BallotCatalogueCache:
+    """
+    Versioned election -> offices -> candidates cache
+
+    Configured from the Flask app via init_app:
+    - BALLOT_CATALOGUE_TTL: seconds an entry is trusted before reloading
+    """
+
+    def __init__(self, app=None, ttl=30):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._version = 0
+        self._stats = {'hits': 0, 'misses': 0}
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('BALLOT_CATALOGUE_TTL', self.ttl)
+
+    @property
+    def version(self):
+        return self._version
+
+    def bump(self):
+        """Invalidate every cached catalogue after an admin edit"""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def get(self, election_id):
+        """
+        Catalogue for an election, loading it on a miss
+
+        Returns:
+            Catalogue entry, or None if the election does not exist
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(election_id)
+            version = self._version
+            if entry is not None and entry['version'] == version and now - entry['loaded_at'] < self.ttl:
+                self._stats['hits'] += 1
+                return entry
+            self._stats['misses'] += 1
+
+        election = Election.query \
+            .options(selectinload(Election.offices).selectinload(Office.candidates)) \
+            .filter(Election.id == election_id) \
+            .first()
+        if election is None:
+            return None
+
+        entry = build_catalogue(election)
+        entry['version'] = version
+        entry['loaded_at'] = now
+
+        with self._lock:
+            # Don't store a catalogue loaded before a concurrent bump
+            if version == self._version:
+                self._entries[election_id] = entry
+
+        return entry
+
+    def stats(self):
+        """Version, cached election count and hit/miss counters"""
+        with self._lock:
+            return dict(self._stats, version=self._version, cached=len(self._entries))
+
+
+# Global instance
+ballot_catalogue = BallotCatalogueCache()
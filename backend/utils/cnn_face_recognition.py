@@ -2,22 +2,39 @@ import cv2
 import numpy as np
 import tensorflow as tf
 from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import Conv2D, MaxPooling2D, Flatten, Dense, Dropout, BatchNormalization
+from tensorflow.keras.layers import Input, Conv2D, SeparableConv2D, MaxPooling2D, GlobalAveragePooling2D
+from tensorflow.keras.layers import Flatten, Dense, Dropout, BatchNormalization
+from tensorflow.keras.layers import RandomRotation, RandomTranslation, RandomFlip, RandomZoom
 from tensorflow.keras.optimizers import Adam
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 import os
+import copy
 import pickle
+import json
 import base64
-from io import BytesIO
+import hashlib
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
 from PIL import Image
 import logging
 
+from utils import face_preprocessing
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines: thread locking only
+    fcntl = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Selectable CNN backbones
+ARCHITECTURES = ('standard', 'gap', 'separable')
+
 class CNNFaceRecognition:
     """
     CNN-based Face Recognition System for FUO Online Voting System
@@ -31,64 +48,139 @@ class CNNFaceRecognition:
     """
     
     def __init__(self, model_path='models/face_recognition_model.h5', 
-                 encoder_path='models/label_encoder.pkl'):
+                 encoder_path='models/label_encoder.pkl',
+                 metadata_path='models/model_metadata.json'):
         self.model_path = model_path
         self.encoder_path = encoder_path
+        self.metadata_path = metadata_path
         self.model = None
         self.label_encoder = None
+        self.metadata = {}
+        self.model_version = None
+        # Changes only when the layers below the head change (full training),
+        # so stored embeddings survive incremental enrolments
+        self.embedding_version = None
         self.img_size = (128, 128)
         self.confidence_threshold = 0.85
-        
+        self.architecture = 'standard'
+
+        # Incremental enrollment settings
+        self.incremental_steps = 20
+        self.incremental_learning_rate = 0.0005
+        self.replay_sample_size = 64
+
+        # Dataset preprocessing parallelism
+        self.preprocess_workers = os.cpu_count() or 1
+        self.preprocess_chunk_size = 32
+
+        # Model updates are copy-on-write: enrolment and training work on a
+        # private copy, publish it to disk and then swap the references under
+        # _lock, so readers always see a consistent (model, encoder) pair.
+        # _update_lock plus a lock file serialise updates across threads and
+        # worker processes.
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        self._metadata_mtime = None
+        self._embedding_cache = None
+
         # Create models directory if it doesn't exist
         os.makedirs(os.path.dirname(model_path), exist_ok=True)
         
-        # Load existing model and encoder if available
+        # Load existing model, encoder and metadata if available
         self.load_model()
         self.load_encoder()
+        self.load_metadata()
     
-    def create_cnn_model(self, num_classes):
+    def init_app(self, app):
+        """Apply configuration from the Flask app (CNN_ARCHITECTURE)"""
+        self.architecture = app.config.get('CNN_ARCHITECTURE', self.architecture)
+
+    def create_cnn_model(self, num_classes, architecture=None):
         """
         Create CNN architecture for face recognition
         
-        Architecture:
-        - 3 Convolutional blocks with BatchNormalization and MaxPooling
-        - Dropout layers for regularization
-        - Dense layers for classification
-        - Softmax activation for multi-class classification
-        """
-        model = Sequential([
-            # First Convolutional Block
-            Conv2D(32, (3, 3), activation='relu', input_shape=(128, 128, 3)),
-            BatchNormalization(),
-            MaxPooling2D(2, 2),
-            Dropout(0.25),
-            
-            # Second Convolutional Block
-            Conv2D(64, (3, 3), activation='relu'),
-            BatchNormalization(),
-            MaxPooling2D(2, 2),
-            Dropout(0.25),
-            
-            # Third Convolutional Block
-            Conv2D(128, (3, 3), activation='relu'),
-            BatchNormalization(),
-            MaxPooling2D(2, 2),
-            Dropout(0.25),
-            
-            # Fourth Convolutional Block
-            Conv2D(256, (3, 3), activation='relu'),
-            BatchNormalization(),
-            MaxPooling2D(2, 2),
-            Dropout(0.25),
+        Architectures (see ARCHITECTURES):
+        - standard: 4 Conv2D blocks with BatchNormalization and MaxPooling,
+          then Flatten and Dense(512) / Dense(256) layers
+        - gap: the same convolutional blocks with GlobalAveragePooling2D
+          instead of Flatten, removing the large flatten-to-dense matrix
+        - separable: MobileNet-style depthwise separable convolutions with
+          global average pooling, for fast CPU inference
+        
+        Every variant ends in Dense(256) -> Dropout -> softmax so the
+        embedding and incremental enrollment code work unchanged.
+        """
+        architecture = architecture or self.architecture
+        if architecture not in ARCHITECTURES:
+            raise ValueError(f"Unknown CNN architecture: {architecture}")
+        
+        if architecture == 'separable':
+            backbone = [
+                Conv2D(32, (3, 3), strides=2, padding='same', activation='relu'),
+                BatchNormalization(),
+                
+                SeparableConv2D(64, (3, 3), padding='same', activation='relu'),
+                BatchNormalization(),
+                MaxPooling2D(2, 2),
+                
+                SeparableConv2D(128, (3, 3), padding='same', activation='relu'),
+                BatchNormalization(),
+                MaxPooling2D(2, 2),
+                
+                SeparableConv2D(256, (3, 3), padding='same', activation='relu'),
+                BatchNormalization(),
+                MaxPooling2D(2, 2),
+                
+                GlobalAveragePooling2D(),
+                Dropout(0.25)
+            ]
+        else:
+            backbone = [
+                # First Convolutional Block
+                Conv2D(32, (3, 3), activation='relu'),
+                BatchNormalization(),
+                MaxPooling2D(2, 2),
+                Dropout(0.25),
+                
+                # Second Convolutional Block
+                Conv2D(64, (3, 3), activation='relu'),
+                BatchNormalization(),
+                MaxPooling2D(2, 2),
+                Dropout(0.25),
+                
+                # Third Convolutional Block
+                Conv2D(128, (3, 3), activation='relu'),
+                BatchNormalization(),
+                MaxPooling2D(2, 2),
+                Dropout(0.25),
+                
+                # Fourth Convolutional Block
+                Conv2D(256, (3, 3), activation='relu'),
+                BatchNormalization(),
+                MaxPooling2D(2, 2),
+                Dropout(0.25)
+            ]
             
-            # Flatten and Dense layers
-            Flatten(),
-            Dense(512, activation='relu'),
-            Dropout(0.5),
-            Dense(256, activation='relu'),
-            Dropout(0.5),
-            Dense(num_classes, activation='softmax')
-        ])
+            if architecture == 'gap':
+                backbone.append(GlobalAveragePooling2D())
+            else:
+                # Flatten and Dense layers
+                backbone.extend([
+                    Flatten(),
+                    Dense(512, activation='relu'),
+                    Dropout(0.5)
+                ])
+        
+        model = Sequential(
+            [Input(shape=(*self.img_size, 3))] +
+            backbone +
+            [
+                Dense(256, activation='relu'),
+                Dropout(0.5),
+                Dense(num_classes, activation='softmax')
+            ],
+            name=f"face_cnn_{architecture}"
+        )
         
         # Compile model
         model.compile(
@@ -99,6 +191,19 @@ class CNNFaceRecognition:
         
         return model
     
+    def decode_image(self, image_data):
+        """Decode base64, raw bytes or a PIL Image to an RGB numpy array"""
+        return face_preprocessing.decode_image(image_data)
+
+    def crop_face(self, img_array):
+        """
+        Detect and crop the face region, resized to the CNN input size
+
+        Returns:
+            Tuple of (uint8 face crop, whether a face was detected)
+        """
+        return face_preprocessing.crop_face(img_array, self.img_size)
+
     def preprocess_image(self, image_data):
         """
         Preprocess image for CNN input
@@ -106,55 +211,15 @@ class CNNFaceRecognition:
         Steps:
         1. Decode base64 image
         2. Convert to RGB
-        3. Resize to target size
-        4. Normalize pixel values
-        5. Detect and crop face region
+        3. Detect and crop face region
+        4. Resize to target size
+        5. Normalize pixel values
+
+        A numpy array is treated as a precomputed face crop (see
+        extract_face_artifacts) and only resized and normalized.
         """
         try:
-            # Decode base64 image
-            if isinstance(image_data, str):
-                if image_data.startswith('data:image'):
-                    image_data = image_data.split(',')[1]
-                image_bytes = base64.b64decode(image_data)
-                image = Image.open(BytesIO(image_bytes))
-            else:
-                image = image_data
-            
-            # Convert to RGB if necessary
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Convert to numpy array
-            img_array = np.array(image)
-            
-            # Detect face using OpenCV Haar Cascade
-            face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-            faces = face_cascade.detectMultiScale(gray, 1.1, 4)
-            
-            if len(faces) > 0:
-                # Use the largest detected face
-                (x, y, w, h) = max(faces, key=lambda face: face[2] * face[3])
-                
-                # Add padding around face
-                padding = 20
-                x = max(0, x - padding)
-                y = max(0, y - padding)
-                w = min(img_array.shape[1] - x, w + 2 * padding)
-                h = min(img_array.shape[0] - y, h + 2 * padding)
-                
-                # Crop face region
-                face_img = img_array[y:y+h, x:x+w]
-            else:
-                # If no face detected, use center crop
-                h, w = img_array.shape[:2]
-                size = min(h, w)
-                start_h = (h - size) // 2
-                start_w = (w - size) // 2
-                face_img = img_array[start_h:start_h+size, start_w:start_w+size]
-            
-            # Resize to target size
-            face_img = cv2.resize(face_img, self.img_size)
+            face_img = face_preprocessing.face_crop_uint8(image_data, self.img_size)
             
             # Normalize pixel values to [0, 1]
             face_img = face_img.astype(np.float32) / 255.0
@@ -164,32 +229,214 @@ class CNNFaceRecognition:
         except Exception as e:
             logger.error(f"Error preprocessing image: {str(e)}")
             return None
+
+    def preprocess_parallel(self, samples, workers=None, chunk_size=None):
+        """
+        Load and crop many faces across a process pool
+
+        Work is split into chunks of (image_path, image_data) samples;
+        workers read and decode the images themselves and return uint8
+        crops, which are reassembled in input order and normalized in one
+        vectorised step.
+
+        Args:
+            samples: List of (stored crop path, raw image) tuples; either
+                may be None
+            workers: Number of worker processes (defaults to preprocess_workers)
+            chunk_size: Samples per task (defaults to preprocess_chunk_size)
+
+        Returns:
+            List of float32 images in input order, None where preprocessing failed
+        """
+        workers = workers or self.preprocess_workers
+        chunk_size = chunk_size or self.preprocess_chunk_size
+        crops = face_preprocessing.crop_parallel(samples, self.img_size, workers, chunk_size)
+
+        valid = [i for i, crop in enumerate(crops) if crop is not None]
+        processed = [None] * len(crops)
+        if valid:
+            normalized = np.stack([crops[i] for i in valid]).astype(np.float32) / 255.0
+            for i, image in zip(valid, normalized):
+                processed[i] = image
+        return processed
+
+    def extract_face_artifacts(self, image_data, embed=True):
+        """
+        Compute every stored face artefact in a single pass
+
+        Decodes the image once and derives the cropped face, facial
+        landmarks, CNN embedding (with the embedding version that produced
+        it), quality score and SHA-256 image hash so later verification and
+        training never need to redo the work.
+
+        Args:
+            image_data: Base64 string or raw image bytes
+            embed: Compute the embedding now; pass False when the face is
+                about to be enrolled and embed it with embed_face afterwards
+
+        Returns:
+            Dictionary of artefacts, or None if the image cannot be processed
+        """
+        try:
+            if isinstance(image_data, str):
+                raw = image_data.split(',')[1] if image_data.startswith('data:image') else image_data
+                image_bytes = base64.b64decode(raw)
+            else:
+                image_bytes = bytes(image_data)
+
+            img_array = self.decode_image(image_bytes)
+            face_crop, face_detected = self.crop_face(img_array)
+
+            embedding, embedding_version = self.embed_face(face_crop) if embed else (None, None)
+
+            return {
+                'face_crop': face_crop,
+                'face_detected': face_detected,
+                'landmarks': self._detect_landmarks(face_crop),
+                'cnn_features': embedding,
+                'embedding_version': embedding_version,
+                'quality_score': self._quality_score(face_crop, face_detected),
+                'image_hash': hashlib.sha256(image_bytes).hexdigest()
+            }
+
+        except Exception as e:
+            logger.error(f"Error extracting face artefacts: {str(e)}")
+            return None
+
+    def embed_face(self, image_data):
+        """
+        CNN embedding of a face with the current model
+
+        Embeddings from different backbones live in different spaces, so the
+        embedding version is returned to be stored alongside the embedding.
+
+        Returns:
+            Tuple of (embedding, embedding_version), or (None, None) without
+            a model or when the image cannot be processed
+        """
+        self.refresh()
+        with self._lock:
+            model, version = self.model, self.embedding_version
+        if model is None:
+            return None, None
+
+        processed_img = self.preprocess_image(image_data)
+        if processed_img is None:
+            return None, None
+
+        features, _ = self._embedding_model(model).predict(
+            np.expand_dims(processed_img, axis=0), verbose=0
+        )
+        return features[0], version
+
+    def current_embedding_version(self):
+        """Embedding version of the model currently served, after picking up any newer one"""
+        self.refresh()
+        with self._lock:
+            return self.embedding_version
+
+    def _detect_landmarks(self, face_crop):
+        """Facial landmarks of the cropped face, or None if unavailable"""
+        try:
+            import face_recognition
+            h, w = face_crop.shape[:2]
+            landmarks = face_recognition.face_landmarks(face_crop, face_locations=[(0, w, h, 0)])
+            if not landmarks:
+                return None
+            return {feature: [list(map(int, point)) for point in points]
+                    for feature, points in landmarks[0].items()}
+        except Exception as e:
+            logger.warning(f"Landmark detection unavailable: {str(e)}")
+            return None
+
+    def _quality_score(self, face_crop, face_detected):
+        """
+        Score image quality in [0, 1]
+
+        Combines sharpness (variance of the Laplacian), exposure and whether
+        a face was actually detected.
+        """
+        gray = cv2.cvtColor(face_crop, cv2.COLOR_RGB2GRAY)
+        sharpness = min(cv2.Laplacian(gray, cv2.CV_64F).var() / 500.0, 1.0)
+        exposure = 1.0 - abs(float(gray.mean()) - 128.0) / 128.0
+        return round(0.5 * sharpness + 0.3 * exposure + 0.2 * float(face_detected), 4)
+
+    def save_face_crop(self, face_crop, path):
+        """Persist a face crop as a lossless PNG"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        Image.fromarray(face_crop).save(path, format='PNG')
+
+    def load_face_crop(self, path):
+        """Load a stored face crop as a uint8 RGB array, or None if missing"""
+        try:
+            return face_preprocessing.load_face_crop(path)
+        except Exception as e:
+            logger.error(f"Error loading face crop: {str(e)}")
+        return None
+
+    def load_face_input(self, image_path, image_data):
+        """
+        Preferred preprocessing input for a stored face
+
+        Returns the precomputed face crop when one exists, otherwise the raw
+        stored image for records created before crops were persisted.
+        """
+        face_crop = self.load_face_crop(image_path)
+        return face_crop if face_crop is not None else image_data
     
-    def prepare_dataset(self, face_data_list):
+    def sample_source(self, data):
+        """
+        (image_path, image_data) to hand a preprocessing worker for a sample
+
+        Only the path is sent when a stored crop exists, so the raw image
+        is not pickled to the worker for nothing.
+        """
+        image_path = data.get('image_path')
+        if image_path and os.path.exists(image_path):
+            return image_path, None
+        return None, data['face_data']
+
+    def prepare_dataset(self, face_data_list, workers=None, encoder=None):
         """
         Prepare dataset for training with 70-30 split
         
         Args:
-            face_data_list: List of dictionaries with 'user_id' and 'face_data'
+            face_data_list: List of dictionaries with 'user_id', 'face_data'
+                and optionally the stored crop's 'image_path'
+            workers: Preprocessing worker processes (defaults to
+                preprocess_workers); 1 preprocesses serially
+            encoder: LabelEncoder to fit on the dataset's user IDs (a new
+                one if omitted); the served encoder is never modified
         
         Returns:
-            X_train, X_test, y_train, y_test: Training and testing datasets
+            X_train, X_test, y_train, y_test: Training and testing datasets,
+            and test_indices: positions in face_data_list of the held-out
+            test samples
         """
         try:
             images = []
             labels = []
+            positions = []
             
-            logger.info("Preprocessing dataset...")
+            workers = workers or self.preprocess_workers
+            logger.info(f"Preprocessing dataset with {workers} worker(s)...")
             
-            for data in face_data_list:
-                user_id = data['user_id']
-                face_data = data['face_data']
-                
-                # Preprocess image
-                processed_img = self.preprocess_image(face_data)
+            # Parallelism only pays off once there is more than a chunk of work
+            if workers > 1 and len(face_data_list) > self.preprocess_chunk_size:
+                processed = self.preprocess_parallel(
+                    [self.sample_source(data) for data in face_data_list], workers=workers
+                )
+            else:
+                processed = [
+                    self.preprocess_image(self.load_face_input(data.get('image_path'), data['face_data']))
+                    for data in face_data_list
+                ]
+            
+            for position, (data, processed_img) in enumerate(zip(face_data_list, processed)):
                 if processed_img is not None:
                     images.append(processed_img)
-                    labels.append(user_id)
+                    labels.append(data['user_id'])
+                    positions.append(position)
             
             if len(images) == 0:
                 raise ValueError("No valid images found in dataset")
@@ -199,29 +446,51 @@ class CNNFaceRecognition:
             y = np.array(labels)
             
             # Encode labels
-            if self.label_encoder is None:
-                self.label_encoder = LabelEncoder()
-                y_encoded = self.label_encoder.fit_transform(y)
-            else:
-                y_encoded = self.label_encoder.transform(y)
+            encoder = encoder if encoder is not None else LabelEncoder()
+            y_encoded = encoder.fit_transform(y)
             
             # Convert to categorical
             y_categorical = tf.keras.utils.to_categorical(y_encoded)
             
             # Split dataset (70% training, 30% testing)
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y_categorical, test_size=0.3, random_state=42, stratify=y_encoded
+            X_train, X_test, y_train, y_test, _, test_positions = train_test_split(
+                X, y_categorical, np.array(positions), test_size=0.3, random_state=42, stratify=y_encoded
             )
             
             logger.info(f"Dataset prepared: {len(X_train)} training samples, {len(X_test)} testing samples")
             
-            return X_train, X_test, y_train, y_test
+            return X_train, X_test, y_train, y_test, sorted(test_positions.tolist())
             
         except Exception as e:
             logger.error(f"Error preparing dataset: {str(e)}")
-            return None, None, None, None
+            return None, None, None, None, None
     
-    def train_model(self, face_data_list, epochs=50, batch_size=32):
+    def create_augmentation_pipeline(self):
+        """
+        Batched data augmentation built from Keras preprocessing layers
+
+        10 degree rotation, 10% width/height shift, horizontal flip and 10%
+        zoom with nearest fill. Each layer transforms a whole batch in one
+        vectorised op.
+        """
+        return Sequential([
+            RandomRotation(10 / 360, fill_mode='nearest'),
+            RandomTranslation(0.1, 0.1, fill_mode='nearest'),
+            RandomFlip('horizontal'),
+            RandomZoom(0.1, fill_mode='nearest')
+        ], name='augmentation')
+
+    def augmented_dataset(self, X, y, batch_size):
+        """Shuffled, batched and augmented training dataset"""
+        augmentation = self.create_augmentation_pipeline()
+        return tf.data.Dataset.from_tensor_slices((X, y)) \
+            .shuffle(len(X)) \
+            .batch(batch_size) \
+            .map(lambda images, labels: (augmentation(images, training=True), labels),
+                 num_parallel_calls=tf.data.AUTOTUNE) \
+            .prefetch(tf.data.AUTOTUNE)
+
+    def train_model(self, face_data_list, epochs=50, batch_size=32, workers=None, architecture=None):
         """
         Train the CNN model on face data
         
@@ -229,68 +498,83 @@ class CNNFaceRecognition:
             face_data_list: List of face data for training
             epochs: Number of training epochs
             batch_size: Training batch size
+            workers: Preprocessing worker processes
+            architecture: CNN backbone (defaults to the configured one)
         
         Returns:
-            Training history
+            Tuple of (training history, positions in face_data_list of the
+            held-out test samples), or (None, None) if training failed
+
+        Enrolments wait while training runs; the trained model replaces the
+        served one only once it is complete.
         """
         try:
-            # Prepare dataset
-            X_train, X_test, y_train, y_test = self.prepare_dataset(face_data_list)
-            
-            if X_train is None:
-                raise ValueError("Failed to prepare dataset")
-            
-            # Create model
-            num_classes = len(np.unique(self.label_encoder.classes_))
-            self.model = self.create_cnn_model(num_classes)
-            
-            logger.info(f"Training CNN model with {num_classes} classes...")
-            
-            # Data augmentation for better generalization
-            datagen = ImageDataGenerator(
-                rotation_range=10,
-                width_shift_range=0.1,
-                height_shift_range=0.1,
-                horizontal_flip=True,
-                zoom_range=0.1,
-                fill_mode='nearest'
-            )
-            
-            # Train model
-            history = self.model.fit(
-                datagen.flow(X_train, y_train, batch_size=batch_size),
-                epochs=epochs,
-                validation_data=(X_test, y_test),
-                verbose=1
-            )
-            
-            # Evaluate model
-            test_loss, test_accuracy = self.model.evaluate(X_test, y_test, verbose=0)
-            logger.info(f"Test accuracy: {test_accuracy:.4f}")
-            
-            # Save model and encoder
-            self.save_model()
-            self.save_encoder()
+            with self._update():
+                # Prepare dataset
+                encoder = LabelEncoder()
+                X_train, X_test, y_train, y_test, test_indices = self.prepare_dataset(
+                    face_data_list, workers=workers, encoder=encoder
+                )
+                
+                if X_train is None:
+                    raise ValueError("Failed to prepare dataset")
+                
+                # Create model
+                num_classes = len(encoder.classes_)
+                architecture = architecture or self.architecture
+                model = self.create_cnn_model(num_classes, architecture)
+                
+                logger.info(f"Training {architecture} CNN model with {num_classes} classes "
+                            f"({model.count_params()} parameters)...")
+                
+                # Data augmentation for better generalization, applied to whole
+                # batches inside the tf.data pipeline
+                train_dataset = self.augmented_dataset(X_train, y_train, batch_size)
+                
+                # Train model
+                history = model.fit(
+                    train_dataset,
+                    epochs=epochs,
+                    validation_data=(X_test, y_test),
+                    verbose=1
+                )
+                
+                # Evaluate model
+                test_loss, test_accuracy = model.evaluate(X_test, y_test, verbose=0)
+                logger.info(f"Test accuracy: {test_accuracy:.4f}")
+                
+                # Save model, encoder and metadata, then start serving it
+                self._publish(
+                    model, encoder,
+                    embedding_version=uuid.uuid4().hex,
+                    architecture=architecture,
+                    parameters=int(model.count_params()),
+                    test_accuracy=float(test_accuracy),
+                    holdout_samples=len(test_indices)
+                )
             
-            return history
+            return history, test_indices
             
         except Exception as e:
             logger.error(f"Error training model: {str(e)}")
-            return None
+            return None, None
     
-    def verify_face(self, face_data, user_id):
+    def verify_face(self, face_data, user_id, reference_features=None):
         """
         Verify if the face belongs to the specified user
         
         Args:
             face_data: Base64 encoded face image
             user_id: User ID to verify against
+            reference_features: Optional CNN embedding stored at registration;
+                when given, the cosine similarity to it is also reported
         
         Returns:
             Dictionary with verification result and confidence
         """
         try:
-            if self.model is None or self.label_encoder is None:
+            model, encoder = self.snapshot()
+            if model is None or encoder is None:
                 return {
                     'success': False,
                     'error': 'Model not trained or loaded',
@@ -309,23 +593,37 @@ class CNNFaceRecognition:
             # Prepare for prediction
             img_batch = np.expand_dims(processed_img, axis=0)
             
-            # Make prediction
-            predictions = self.model.predict(img_batch, verbose=0)
+            # Make prediction, computing the embedding in the same pass when
+            # a stored reference is available
+            similarity = None
+            if reference_features is not None:
+                features, predictions = self._embedding_model(model).predict(img_batch, verbose=0)
+                similarity = self._cosine_similarity(features[0], reference_features)
+            else:
+                predictions = model.predict(img_batch, verbose=0)
             predicted_class_idx = np.argmax(predictions[0])
             confidence = float(predictions[0][predicted_class_idx])
             
             # Get predicted user ID
-            predicted_user_id = self.label_encoder.inverse_transform([predicted_class_idx])[0]
+            predicted_user_id = encoder.inverse_transform([predicted_class_idx])[0]
+            if hasattr(predicted_user_id, 'item'):
+                predicted_user_id = predicted_user_id.item()
             
-            # Check if prediction matches user ID and confidence is above threshold
-            is_match = (predicted_user_id == user_id) and (confidence >= self.confidence_threshold)
+            # Check if prediction matches user ID and confidence is above threshold.
+            # JWT identities are strings while the encoder holds integer labels.
+            is_match = (predicted_user_id == self._coerce_label(user_id, encoder)) and \
+                (confidence >= self.confidence_threshold)
             
-            return {
+            result = {
                 'success': is_match,
                 'confidence': confidence,
                 'predicted_user_id': predicted_user_id,
                 'threshold': self.confidence_threshold
             }
+            if similarity is not None:
+                result['similarity'] = similarity
+            
+            return result
             
         except Exception as e:
             logger.error(f"Error verifying face: {str(e)}")
@@ -335,14 +633,66 @@ class CNNFaceRecognition:
                 'confidence': 0.0
             }
     
-    def register_face(self, face_data, user_id):
+    def score_faces(self, images, user_ids, batch_size=64):
+        """
+        Score many preprocessed faces against their claimed users in batches
+
+        The confidence reported is the probability the model assigns to the
+        claimed user's own class, so with a threshold above 0.5 a sample
+        passes verification exactly when its confidence meets the threshold.
+
+        Args:
+            images: Array of preprocessed face images
+            user_ids: Claimed user ID for each image
+            batch_size: Inference batch size
+
+        Returns:
+            List of dictionaries with 'confidence', 'predicted_user_id' and
+            'success' per image
+        """
+        model, encoder = self.snapshot()
+        if model is None or encoder is None:
+            raise ValueError("Model not trained or loaded")
+
+        predictions = model.predict(np.asarray(images, dtype=np.float32),
+                                    batch_size=batch_size, verbose=0)
+        predicted_user_ids = encoder.inverse_transform(np.argmax(predictions, axis=1))
+        class_index = {label: index for index, label in enumerate(encoder.classes_.tolist())}
+
+        results = []
+        for row, user_id, predicted_user_id in zip(predictions, user_ids, predicted_user_ids):
+            index = class_index.get(self._coerce_label(user_id, encoder))
+            confidence = float(row[index]) if index is not None else 0.0
+            results.append({
+                'confidence': confidence,
+                'predicted_user_id': predicted_user_id.item() if hasattr(predicted_user_id, 'item') else predicted_user_id,
+                'success': index is not None and confidence >= self.confidence_threshold
+            })
+        return results
+
+    def _cosine_similarity(self, a, b):
+        """Cosine similarity between two embeddings"""
+        a = np.asarray(a, dtype=np.float32).ravel()
+        b = np.asarray(b, dtype=np.float32).ravel()
+        if a.shape != b.shape:
+            return None
+        return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b) + 1e-8))
+    
+    def register_face(self, face_data, user_id, replay_data=None):
         """
         Register a new face for a user
-        
+
+        When a trained model is loaded the user is enrolled incrementally
+        (see enroll_incremental), so they can be verified straight away
+        without a full retrain.
+
         Args:
-            face_data: Base64 encoded face image
+            face_data: Base64 encoded face image or precomputed face crop
             user_id: User ID to register
-        
+            replay_data: Optional list of dictionaries with 'user_id' and
+                'face_data' for already enrolled users, replayed during
+                fine-tuning so existing classes are not forgotten
+
         Returns:
             Dictionary with registration result
         """
@@ -354,28 +704,305 @@ class CNNFaceRecognition:
                     'success': False,
                     'error': 'Failed to process image'
                 }
-            
-            # For now, just validate that face can be detected and processed
-            # In a full implementation, you would retrain the model with new data
-            
+
+            # Without a trained model there is nothing to extend yet; the face
+            # is picked up by the next full training run
+            model, encoder = self.snapshot()
+            if model is None or encoder is None:
+                return {
+                    'success': True,
+                    'message': 'Face registered successfully',
+                    'user_id': user_id,
+                    'enrolled': False
+                }
+
+            enrollment = self.enroll_incremental([processed_img], user_id, replay_data)
+            if not enrollment['success']:
+                return enrollment
+
             return {
                 'success': True,
                 'message': 'Face registered successfully',
-                'user_id': user_id
+                'user_id': user_id,
+                'enrolled': True,
+                'num_classes': enrollment['num_classes']
             }
-            
+
         except Exception as e:
             logger.error(f"Error registering face: {str(e)}")
             return {
                 'success': False,
                 'error': str(e)
             }
+
+    def _coerce_label(self, user_id, encoder=None):
+        """Cast a user ID to the dtype of the label encoder classes"""
+        encoder = encoder or self.label_encoder
+        if encoder.classes_.dtype.kind in 'iu':
+            return int(user_id)
+        return str(user_id)
+
+    def snapshot(self):
+        """
+        Current (model, label encoder) pair
+
+        Picks up a model published by another worker process first. Callers
+        must use the returned pair rather than self.model, which an
+        enrolment may swap at any time.
+        """
+        self.refresh()
+        with self._lock:
+            return self.model, self.label_encoder
+
+    @contextmanager
+    def _update(self):
+        """Serialise model updates across threads and worker processes"""
+        with self._update_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.model_path + '.lock', 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _copy_model(self, model):
+        """Independent copy of a model, so it can be changed while the original serves requests"""
+        clone = tf.keras.models.clone_model(model)
+        clone.set_weights(model.get_weights())
+        clone.compile(
+            optimizer=Adam(learning_rate=0.001),
+            loss='categorical_crossentropy',
+            metrics=['accuracy']
+        )
+        return clone
+
+    def _publish(self, model, encoder, embedding_version=None, **metadata):
+        """
+        Persist a new model version and make it the current one
+
+        The model and encoder files are replaced first and the metadata,
+        which carries the version readers check, last. Must be called
+        inside _update().
+
+        Args:
+            embedding_version: New embedding version when the backbone was
+                retrained; by default the current one is kept, as a head-only
+                update leaves the penultimate embeddings unchanged
+        """
+        version = uuid.uuid4().hex
+        embedding_version = embedding_version or self.embedding_version or version
+        self._atomic_write(self.model_path, model.save)
+        self._atomic_write(self.encoder_path, lambda path: self._pickle(encoder, path))
+
+        with self._lock:
+            self.model = model
+            self.label_encoder = encoder
+            self.model_version = version
+            self.embedding_version = embedding_version
+
+        self.save_metadata(model_version=version, embedding_version=embedding_version, **metadata)
+        logger.info(f"Published model version {version}")
+        return version
+
+    def enroll_incremental(self, images, user_id, replay_data=None, steps=None):
+        """
+        Enroll a user into the trained model without a full retrain
+
+        Steps:
+        1. Extend the label encoder with the new user ID
+        2. Grow the final Dense(num_classes) layer, keeping learned weights and
+           imprinting the new class from the user's mean embedding
+        3. Fine-tune only the classification head on the user's images plus a
+           replay sample of existing users
+
+        The work is done on a copy of the latest published model while the
+        current one keeps serving verifications; the copy is then published.
+
+        Args:
+            images: List of preprocessed face images for the user
+            user_id: User ID to enroll
+            replay_data: Optional list of dictionaries with 'user_id' and
+                'face_data' for already enrolled users
+            steps: Number of fine-tuning steps (defaults to incremental_steps)
+
+        Returns:
+            Dictionary with enrollment result
+        """
+        try:
+            with self._update():
+                # Extend the newest model, including enrolments by other workers
+                model, encoder = self.snapshot()
+                if model is None or encoder is None:
+                    return {
+                        'success': False,
+                        'error': 'Model not trained or loaded'
+                    }
+
+                model = self._copy_model(model)
+                encoder = copy.deepcopy(encoder)
+
+                steps = steps or self.incremental_steps
+                label = self._coerce_label(user_id, encoder)
+
+                # Original and mirrored copies give the head a little more signal
+                X_new = np.array(images, dtype=np.float32)
+                X_new = np.concatenate([X_new, X_new[:, :, ::-1, :]])
+
+                if label not in encoder.classes_:
+                    model = self._grow_output_layer(model, encoder, label, X_new)
+
+                # Build the replay set from already enrolled users
+                replay_images = []
+                replay_labels = []
+                known = set(encoder.classes_.tolist())
+                for data in (replay_data or [])[:self.replay_sample_size]:
+                    replay_label = self._coerce_label(data['user_id'], encoder)
+                    if replay_label == label or replay_label not in known:
+                        continue
+                    processed_img = self.preprocess_image(
+                        self.load_face_input(data.get('image_path'), data['face_data'])
+                    )
+                    if processed_img is not None:
+                        replay_images.append(processed_img)
+                        replay_labels.append(replay_label)
+
+                X = X_new
+                y = [label] * len(X_new)
+                if replay_images:
+                    X = np.concatenate([X, np.array(replay_images, dtype=np.float32)])
+                    y.extend(replay_labels)
+
+                num_classes = len(encoder.classes_)
+                y_categorical = tf.keras.utils.to_categorical(
+                    encoder.transform(y), num_classes=num_classes
+                )
+
+                self._finetune_head(model, X, y_categorical, steps)
+                self._publish(model, encoder)
+
+            logger.info(f"Incrementally enrolled user {user_id} ({num_classes} classes, "
+                        f"{len(replay_images)} replay samples)")
+
+            return {
+                'success': True,
+                'user_id': user_id,
+                'num_classes': num_classes,
+                'replay_samples': len(replay_images)
+            }
+
+        except Exception as e:
+            logger.error(f"Error enrolling face incrementally: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def _grow_output_layer(self, model, encoder, label, images):
+        """
+        Add an output unit for a new label while keeping all learned weights
+
+        The label is inserted into the encoder at its sorted position so
+        LabelEncoder.transform stays valid, and the matching kernel column is
+        initialised from the normalised mean embedding of the new user's
+        images.
+
+        Returns:
+            The grown model
+        """
+        head = model.layers[-1]
+        kernel, bias = head.get_weights()
+
+        # Imprint the new class from the penultimate layer embedding
+        embeddings, _ = self._embedding_model(model).predict(images, verbose=0)
+        imprint = embeddings.mean(axis=0)
+        imprint /= (np.linalg.norm(imprint) + 1e-8)
+        imprint *= np.linalg.norm(kernel, axis=0).mean()
+
+        classes = encoder.classes_
+        index = int(np.searchsorted(classes, label))
+        kernel = np.insert(kernel, index, imprint, axis=1)
+        bias = np.insert(bias, index, bias.mean())
+
+        new_head = Dense(len(classes) + 1, activation='softmax')
+        grown = Sequential([Input(shape=(*self.img_size, 3))] + model.layers[:-1] + [new_head])
+        new_head.set_weights([kernel, bias])
+
+        encoder.classes_ = np.insert(classes, index, label)
+        return grown
+
+    def _embedding_model(self, model=None):
+        """
+        Model returning (penultimate embedding, class probabilities)
+
+        Cached for the most recently used model so a single forward pass
+        yields both outputs.
+        """
+        model = model or self.model
+        cached = self._embedding_cache
+        if cached is None or cached[0] is not model:
+            cached = (model, tf.keras.Model(
+                inputs=model.inputs,
+                outputs=[model.layers[-2].output, model.output]
+            ))
+            self._embedding_cache = cached
+        return cached[1]
+
+    def _finetune_head(self, model, X, y, steps, batch_size=32):
+        """Fine-tune only the final Dense layer for a fixed number of steps"""
+        for layer in model.layers[:-1]:
+            layer.trainable = False
+
+        try:
+            model.compile(
+                optimizer=Adam(learning_rate=self.incremental_learning_rate),
+                loss='categorical_crossentropy',
+                metrics=['accuracy']
+            )
+
+            batch_size = min(batch_size, len(X))
+            dataset = tf.data.Dataset.from_tensor_slices((X, y)) \
+                .shuffle(len(X)) \
+                .repeat() \
+                .batch(batch_size)
+            model.fit(dataset, steps_per_epoch=steps, epochs=1, verbose=0)
+        finally:
+            for layer in model.layers[:-1]:
+                layer.trainable = True
+            model.compile(
+                optimizer=Adam(learning_rate=0.001),
+                loss='categorical_crossentropy',
+                metrics=['accuracy']
+            )
+
+    def _atomic_write(self, path, write):
+        """
+        Write a file through a temporary sibling renamed into place, so
+        other processes never load a partially written file
+        """
+        directory, name = os.path.split(path)
+        root, ext = os.path.splitext(name)
+        fd, tmp_path = tempfile.mkstemp(prefix=f'.{root}.', suffix=ext, dir=directory or '.')
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _pickle(self, obj, path):
+        with open(path, 'wb') as f:
+            pickle.dump(obj, f)
     
     def save_model(self):
         """Save the trained model"""
         try:
             if self.model is not None:
-                self.model.save(self.model_path)
+                self._atomic_write(self.model_path, self.model.save)
                 logger.info(f"Model saved to {self.model_path}")
         except Exception as e:
             logger.error(f"Error saving model: {str(e)}")
@@ -393,8 +1020,7 @@ class CNNFaceRecognition:
         """Save the label encoder"""
         try:
             if self.label_encoder is not None:
-                with open(self.encoder_path, 'wb') as f:
-                    pickle.dump(self.label_encoder, f)
+                self._atomic_write(self.encoder_path, lambda path: self._pickle(self.label_encoder, path))
                 logger.info(f"Label encoder saved to {self.encoder_path}")
         except Exception as e:
             logger.error(f"Error saving encoder: {str(e)}")
@@ -409,5 +1035,107 @@ class CNNFaceRecognition:
         except Exception as e:
             logger.error(f"Error loading encoder: {str(e)}")
 
+    def _metadata_stat(self):
+        try:
+            return os.stat(self.metadata_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def save_metadata(self, **fields):
+        """Merge fields into the model metadata and persist it"""
+        try:
+            self.metadata.update(fields)
+
+            def write(path):
+                with open(path, 'w') as f:
+                    json.dump(self.metadata, f, indent=2)
+
+            self._atomic_write(self.metadata_path, write)
+            self._metadata_mtime = self._metadata_stat()
+            logger.info(f"Model metadata saved to {self.metadata_path}")
+        except Exception as e:
+            logger.error(f"Error saving metadata: {str(e)}")
+
+    def update_metadata(self, **fields):
+        """
+        Merge fields into the published metadata file
+
+        Re-reads the file rather than merging into this process's copy, so
+        a model version or settings published by another worker are kept,
+        then picks the result up through refresh(). Must be called inside
+        _update().
+        """
+        metadata = {}
+        if os.path.exists(self.metadata_path):
+            with open(self.metadata_path, 'r') as f:
+                metadata = json.load(f)
+        metadata.update(fields)
+
+        def write(path):
+            with open(path, 'w') as f:
+                json.dump(metadata, f, indent=2)
+
+        self._atomic_write(self.metadata_path, write)
+        self.refresh()
+
+    def _apply_metadata(self, metadata, mtime):
+        self.metadata = metadata
+        if 'confidence_threshold' in metadata:
+            self.confidence_threshold = float(metadata['confidence_threshold'])
+        self._metadata_mtime = mtime
+
+    def load_metadata(self):
+        """Load model metadata, applying a calibrated confidence threshold"""
+        try:
+            if os.path.exists(self.metadata_path):
+                mtime = self._metadata_stat()
+                with open(self.metadata_path, 'r') as f:
+                    metadata = json.load(f)
+                self._apply_metadata(metadata, mtime)
+                self.model_version = metadata.get('model_version')
+                self.embedding_version = metadata.get('embedding_version', self.model_version)
+                logger.info(f"Model metadata loaded from {self.metadata_path}")
+        except Exception as e:
+            logger.error(f"Error loading metadata: {str(e)}")
+
+    def refresh(self):
+        """
+        Reload the model if another worker process published a new version
+
+        Costs one stat() of the metadata file when nothing has changed.
+        """
+        mtime = self._metadata_stat()
+        if mtime is None or mtime == self._metadata_mtime:
+            return
+
+        try:
+            with open(self.metadata_path, 'r') as f:
+                metadata = json.load(f)
+
+            version = metadata.get('model_version')
+            if version == self.model_version:
+                # Only the threshold or other metadata changed
+                with self._lock:
+                    self._apply_metadata(metadata, mtime)
+                return
+
+            model = load_model(self.model_path)
+            with open(self.encoder_path, 'rb') as f:
+                encoder = pickle.load(f)
+            if model.output_shape[-1] != len(encoder.classes_):
+                # Caught between two publishes; retry on the next call
+                return
+
+            with self._lock:
+                self.model = model
+                self.label_encoder = encoder
+                self.model_version = version
+                self.embedding_version = metadata.get('embedding_version', version)
+                self._apply_metadata(metadata, mtime)
+            logger.info(f"Reloaded model version {version}")
+
+        except Exception as e:
+            logger.error(f"Error reloading model: {str(e)}")
+
 # Global instance
 face_recognition_system = CNNFaceRecognition()
@@ -0,0 +1,209 @@
+"""
+Election lifecycle scheduling
+
+Read endpoints derive an election's status from its start and end dates
+when serialising and never write. The stored Election.status column, used
+by status filters such as the admin dashboard, is moved through
+upcoming -> active -> completed by an in-process scheduler that sleeps until
+the next start_date or end_date and then runs three set-based UPDATEs that
+only touch elections whose status actually changed.
+
+Once an election has been closed for ELECTION_FINALIZE_DELAY seconds, the
+scheduler freezes its final results into an immutable snapshot. With group
+commit enabled, a ballot accepted just before close can still be committed
+up to VOTE_GROUP_RESULT_TIMEOUT plus one flush later, so the delay is never
+allowed to be shorter than that.
+
+The thread starts with the app, which may be before `db.create_all()` has
+run (or in a CLI command creating the schema), so passes are skipped until
+the tables it reads exist.
+"""
+
+from datetime import datetime, timezone, timedelta
+import threading
+import logging
+
+from sqlalchemy import func
+
+from extensions import db
+from models.election import Election
+from models.results_snapshot import ResultsSnapshot
+from utils.results_snapshot import finalize_completed_elections
+
+logger = logging.getLogger(__name__)
+
+# Seconds allowed for a group commit itself on top of the queue's wait bounds
+GROUP_COMMIT_MARGIN = 2.0
+
+
+def _utcnow():
+    # Dates are stored as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def sync_election_statuses(now=None):
+    """
+    Store the derived status on every election whose window has moved on
+
+    Boundaries match Election.derive_status.
+
+    Returns:
+        Number of elections updated
+    """
+    now = (now or datetime.now(timezone.utc)).astimezone(timezone.utc).replace(tzinfo=None)
+
+    transitions = (
+        ('upcoming', Election.start_date > now),
+        ('completed', Election.end_date < now),
+        ('active', db.and_(Election.start_date <= now, Election.end_date >= now)),
+    )
+
+    updated = 0
+    for status, window in transitions:
+        result = db.session.execute(
+            db.update(Election)
+            .where(window, db.or_(Election.status != status, Election.status.is_(None)))
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        )
+        updated += result.rowcount
+
+    if updated:
+        db.session.commit()
+    else:
+        db.session.rollback()
+
+    return updated
+
+
+def min_finalize_delay(config):
+    """
+    Shortest safe finalisation delay for the vote ingestion settings
+
+    A ballot can wait in the group-commit queue until its request times out
+    and is then committed with the next flush, so results may change until
+    then.
+    """
+    if not config.get('VOTE_GROUP_COMMIT', False):
+        return 0.0
+    return (config.get('VOTE_GROUP_RESULT_TIMEOUT', 10.0)
+            + config.get('VOTE_GROUP_MAX_WAIT_MS', 20) / 1000
+            + GROUP_COMMIT_MARGIN)
+
+
+def next_transition(finalize_delay=0):
+    """
+    When the scheduler next has work: the next election opening, closing or
+    becoming due for finalisation
+
+    Returns:
+        Naive UTC datetime, or None if nothing is scheduled
+    """
+    now = _utcnow()
+    delay = timedelta(seconds=finalize_delay)
+
+    next_start, next_end, next_unfinalized_end = db.session.query(
+        db.session.query(func.min(Election.start_date))
+        .filter(Election.start_date > now).scalar_subquery(),
+        db.session.query(func.min(Election.end_date))
+        .filter(Election.end_date >= now).scalar_subquery(),
+        db.session.query(func.min(Election.end_date))
+        .outerjoin(ResultsSnapshot, ResultsSnapshot.election_id == Election.id)
+        .filter(Election.end_date < now, ResultsSnapshot.election_id.is_(None)).scalar_subquery()
+    ).one()
+
+    candidates = [next_start, next_end]
+    if next_end is not None:
+        candidates.append(next_end + delay)
+    if next_unfinalized_end is not None:
+        candidates.append(next_unfinalized_end + delay)
+
+    candidates = [moment for moment in candidates if moment is not None]
+    return min(candidates) if candidates else None
+
+
+class ElectionScheduler:
+    """
+    Background thread applying election transitions at their exact times
+
+    Configured from the Flask app via init_app:
+    - ELECTION_STATUS_INTERVAL: longest sleep between passes, as a safety net
+      for elections edited through another worker (0 disables the scheduler)
+    - ELECTION_FINALIZE_DELAY: seconds after close before results are frozen,
+      raised to min_finalize_delay() when group commit could still be
+      writing ballots by then
+    """
+
+    def __init__(self, app=None):
+        self.interval = 60.0
+        self.finalize_delay = 15.0
+        self._thread = None
+        self._ready = False
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.interval = app.config.get('ELECTION_STATUS_INTERVAL', self.interval)
+        self.finalize_delay = app.config.get('ELECTION_FINALIZE_DELAY', self.finalize_delay)
+        floor = min_finalize_delay(app.config)
+        if self.finalize_delay < floor:
+            logger.warning(f"ELECTION_FINALIZE_DELAY of {self.finalize_delay}s is shorter than the "
+                           f"vote group commit timeout; using {floor}s")
+            self.finalize_delay = floor
+
+        if self.interval and self._thread is None:
+            self._thread = threading.Thread(target=self._run, args=(app,), daemon=True)
+            self._thread.start()
+
+    def reschedule(self):
+        """Wake the scheduler after an election's dates were created or edited"""
+        self._wake.set()
+
+    def _tables_exist(self):
+        """Whether the schema the scheduler reads has been created yet"""
+        inspector = db.inspect(db.engine)
+        return all(inspector.has_table(model.__tablename__) for model in (Election, ResultsSnapshot))
+
+    def _run(self, app):
+        timeout = 1.0
+        while True:
+            self._wake.wait(timeout)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+
+            timeout = self.interval
+            with app.app_context():
+                try:
+                    if not self._ready:
+                        self._ready = self._tables_exist()
+                        if not self._ready:
+                            timeout = 1.0
+                            continue
+
+                    updated = sync_election_statuses()
+                    if updated:
+                        logger.info(f"Updated status of {updated} elections")
+                    finalize_completed_elections(self.finalize_delay)
+
+                    next_at = next_transition(self.finalize_delay)
+                    if next_at is not None:
+                        # Wake just after the boundary so the new status applies
+                        seconds = (next_at - _utcnow()).total_seconds() + 0.001
+                        timeout = min(max(seconds, 0), self.interval)
+                except Exception as e:
+                    logger.error(f"Election scheduler error: {str(e)}")
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+# Global instance
+election_scheduler = ElectionScheduler()
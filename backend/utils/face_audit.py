@@ -0,0 +1,188 @@
+"""
+Batched re-verification audit over all registered faces
+
+After a model update, re-scores every stored face against the current CNN
+and writes the per-user confidence back to FaceData.confidence_score, so
+administrators can find voters who would now fail verification.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import threading
+import logging
+
+import numpy as np
+
+from extensions import db
+from models.face_data import FaceData
+from utils.cnn_face_recognition import face_recognition_system
+
+logger = logging.getLogger(__name__)
+
+
+class FaceAuditJob:
+    """
+    Background job re-scoring stored faces page by page
+
+    FaceData rows are streamed with keyset pagination, preprocessed across a
+    thread pool (OpenCV releases the GIL) and scored with one batched
+    forward pass per page. Only one audit runs at a time per process.
+    """
+
+    def __init__(self, page_size=256, workers=4, failing_limit=100):
+        self.page_size = page_size
+        self.workers = workers
+        self.failing_limit = failing_limit
+        self._lock = threading.Lock()
+        self._thread = None
+        self._state = {'status': 'idle'}
+
+    def start(self, app):
+        """
+        Start the audit in a background thread
+
+        Returns:
+            False if an audit is already running, True otherwise
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+
+            self._state = {
+                'status': 'running',
+                'started_at': datetime.now(timezone.utc).isoformat(),
+                'finished_at': None,
+                'total': 0,
+                'processed': 0,
+                'failed_preprocessing': 0,
+                'summary': None,
+                'error': None
+            }
+            self._thread = threading.Thread(target=self._run, args=(app,), daemon=True)
+            self._thread.start()
+            return True
+
+    def status(self):
+        """Snapshot of the current progress report"""
+        with self._lock:
+            state = dict(self._state)
+
+        if state.get('total'):
+            state['progress'] = round(state['processed'] / state['total'] * 100, 1)
+        return state
+
+    def _update(self, **fields):
+        with self._lock:
+            self._state.update(fields)
+
+    def _run(self, app):
+        with app.app_context():
+            try:
+                if face_recognition_system.model is None or face_recognition_system.label_encoder is None:
+                    raise ValueError("Model not trained or loaded")
+
+                self._update(total=FaceData.query.count())
+
+                confidences = []
+                failing = []
+                processed = 0
+                failed_preprocessing = 0
+                last_id = 0
+
+                with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                    while True:
+                        records = FaceData.query.filter(FaceData.id > last_id) \
+                            .order_by(FaceData.id) \
+                            .limit(self.page_size) \
+                            .all()
+                        if not records:
+                            break
+                        last_id = records[-1].id
+
+                        images = list(executor.map(self._preprocess, records))
+                        scored = [(record, image) for record, image in zip(records, images) if image is not None]
+                        failed_preprocessing += len(records) - len(scored)
+
+                        if scored:
+                            results = face_recognition_system.score_faces(
+                                np.stack([image for _, image in scored]),
+                                [record.user_id for record, _ in scored]
+                            )
+                            for (record, _), result in zip(scored, results):
+                                record.confidence_score = result['confidence']
+                                confidences.append(result['confidence'])
+                                if not result['success'] and len(failing) < self.failing_limit:
+                                    failing.append({
+                                        'user_id': record.user_id,
+                                        'confidence': result['confidence'],
+                                        'predicted_user_id': result['predicted_user_id']
+                                    })
+
+                        db.session.commit()
+                        # Release the page so memory stays bounded
+                        db.session.expunge_all()
+
+                        processed += len(records)
+                        self._update(processed=processed, failed_preprocessing=failed_preprocessing)
+
+                summary = self._summarize(np.array(confidences, dtype=np.float32), failing)
+                self._update(
+                    status='completed',
+                    summary=summary,
+                    finished_at=datetime.now(timezone.utc).isoformat()
+                )
+                logger.info(f"Face audit completed: {processed} faces, "
+                            f"{summary['failing_count']} below threshold")
+
+            except Exception as e:
+                logger.error(f"Face audit error: {str(e)}")
+                db.session.rollback()
+                self._update(
+                    status='failed',
+                    error=str(e),
+                    finished_at=datetime.now(timezone.utc).isoformat()
+                )
+
+    def _preprocess(self, record):
+        face_input = face_recognition_system.load_face_input(record.image_path, record.face_encoding)
+        return face_recognition_system.preprocess_image(face_input)
+
+    def _summarize(self, confidences, failing):
+        """Distribution of confidence scores against the current threshold"""
+        threshold = face_recognition_system.confidence_threshold
+
+        if len(confidences) == 0:
+            return {
+                'scored': 0,
+                'threshold': threshold,
+                'failing_count': 0,
+                'failing_users': []
+            }
+
+        counts, edges = np.histogram(confidences, bins=10, range=(0.0, 1.0))
+        p5, p25, p50, p75, p95 = np.percentile(confidences, [5, 25, 50, 75, 95])
+
+        return {
+            'scored': int(len(confidences)),
+            'threshold': threshold,
+            'mean': float(confidences.mean()),
+            'min': float(confidences.min()),
+            'max': float(confidences.max()),
+            'percentiles': {
+                'p5': float(p5),
+                'p25': float(p25),
+                'p50': float(p50),
+                'p75': float(p75),
+                'p95': float(p95)
+            },
+            'histogram': [
+                {'from': round(float(low), 1), 'to': round(float(high), 1), 'count': int(count)}
+                for low, high, count in zip(edges[:-1], edges[1:], counts)
+            ],
+            'failing_count': int((confidences < threshold).sum()),
+            'failing_users': failing
+        }
+
+
+# Global instance
+face_audit_job = FaceAuditJob()
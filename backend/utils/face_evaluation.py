@@ -0,0 +1,228 @@
+"""
+Threshold calibration and evaluation for the CNN face model
+
+Runs batched inference once over a held-out set of FaceData, caches the
+resulting score matrix, and sweeps verification thresholds with vectorised
+NumPy so thousands of candidate thresholds cost no extra inference.
+"""
+
+from datetime import datetime, timezone
+import os
+import logging
+
+import numpy as np
+
+from models.face_data import FaceData
+from utils.cnn_face_recognition import face_recognition_system
+
+logger = logging.getLogger(__name__)
+
+SCORE_CACHE_PATH = 'models/evaluation_scores_{subset}.npz'
+
+
+class CalibrationError(ValueError):
+    """Raised when a calibration cannot be run or applied safely"""
+
+
+def compute_score_matrix(records, batch_size=64):
+    """
+    Batched class probabilities for a set of FaceData records
+
+    Returns:
+        Tuple of (probabilities [N, C], true class indices [N]) for the
+        records whose user is known to the model and whose image processes
+    """
+    model, encoder = face_recognition_system.snapshot()
+    class_index = {label: index for index, label in enumerate(encoder.classes_.tolist())}
+
+    images = []
+    labels = []
+    for record in records:
+        index = class_index.get(face_recognition_system._coerce_label(record.user_id, encoder))
+        if index is None:
+            continue
+        face_input = face_recognition_system.load_face_input(record.image_path, record.face_encoding)
+        processed_img = face_recognition_system.preprocess_image(face_input)
+        if processed_img is not None:
+            images.append(processed_img)
+            labels.append(index)
+
+    if not images:
+        raise CalibrationError("No evaluable face data for the current model")
+
+    probabilities = model.predict(
+        np.stack(images), batch_size=batch_size, verbose=0
+    )
+    return probabilities.astype(np.float32), np.array(labels, dtype=np.int64)
+
+
+def published_model_mtime():
+    """Modification time of the published model file, or 0.0 if there is none"""
+    path = face_recognition_system.model_path
+    return os.path.getmtime(path) if os.path.exists(path) else 0.0
+
+
+def load_score_matrix(holdout_only=True, rescore=False):
+    """
+    Score matrix from the on-disk cache, recomputing it when asked or stale
+
+    Args:
+        holdout_only: Evaluate only FaceData not used for training, falling
+            back to all records when none are held out
+        rescore: Ignore the cached score matrix
+
+    The cache is tied to the model file's modification time so a retrained
+    model always gets rescored.
+
+    Returns:
+        Tuple of (probabilities, labels, subset, model_mtime), subset being
+        'holdout' or 'all' and model_mtime identifying the model scored
+    """
+    query = FaceData.query
+    if holdout_only and FaceData.query.filter_by(is_training_data=False).first() is not None:
+        query = query.filter_by(is_training_data=False)
+        subset = 'holdout'
+    else:
+        subset = 'all'
+    cache_path = SCORE_CACHE_PATH.format(subset=subset)
+
+    model_mtime = published_model_mtime()
+
+    if not rescore and os.path.exists(cache_path):
+        cached = np.load(cache_path)
+        if float(cached['model_mtime']) == model_mtime:
+            return cached['probabilities'], cached['labels'], subset, model_mtime
+
+    probabilities, labels = compute_score_matrix(query.all())
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    np.savez(cache_path, probabilities=probabilities, labels=labels, model_mtime=model_mtime)
+    return probabilities, labels, subset, model_mtime
+
+
+def sweep_thresholds(probabilities, labels, thresholds):
+    """
+    FAR and FRR at every threshold
+
+    Verification accepts a claim only when the claimed user is the top
+    prediction and its probability meets the threshold. Every sample is a
+    genuine attempt for its own user and an impostor attempt for every
+    other enrolled user; only the top-predicted wrong class can ever be
+    accepted, so impostor accepts reduce to one score per sample.
+
+    Returns:
+        Tuple of (far, frr) arrays aligned with thresholds
+    """
+    num_samples, num_classes = probabilities.shape
+    rows = np.arange(num_samples)
+    predicted = probabilities.argmax(axis=1)
+    top_scores = probabilities[rows, predicted]
+
+    correct = predicted == labels
+    genuine = np.sort(np.where(correct, top_scores, -1.0))
+    impostor = np.sort(top_scores[~correct])
+    impostor_attempts = max(num_samples * (num_classes - 1), 1)
+
+    genuine_accepts = num_samples - np.searchsorted(genuine, thresholds, side='left')
+    impostor_accepts = len(impostor) - np.searchsorted(impostor, thresholds, side='left')
+
+    far = impostor_accepts / impostor_attempts
+    frr = 1.0 - genuine_accepts / num_samples
+    return far, frr
+
+
+def recommend_threshold(thresholds, far, frr, target_far=0.001):
+    """
+    Operating point: the lowest threshold meeting the FAR target
+
+    Falls back to the equal error rate point when no threshold meets it.
+    """
+    eer_index = int(np.argmin(np.abs(far - frr)))
+    meets_target = np.nonzero(far <= target_far)[0]
+
+    if len(meets_target):
+        index = int(meets_target[0])
+        criterion = 'target_far'
+    else:
+        index = eer_index
+        criterion = 'eer'
+
+    return {
+        'threshold': float(thresholds[index]),
+        'far': float(far[index]),
+        'frr': float(frr[index]),
+        'criterion': criterion,
+        'target_far': target_far,
+        'eer': float((far[eer_index] + frr[eer_index]) / 2),
+        'eer_threshold': float(thresholds[eer_index])
+    }
+
+
+def calibrate(holdout_only=True, target_far=0.001, num_thresholds=10001, rescore=False,
+              apply=False, roc_points=101, min_threshold=0.5):
+    """
+    Evaluate the current model and recommend a confidence threshold
+
+    Args:
+        holdout_only: Evaluate only held-out FaceData when any exists
+        target_far: Maximum acceptable false accept rate
+        num_thresholds: Number of thresholds swept across [0, 1]
+        rescore: Ignore the cached score matrix
+        apply: Persist the recommended threshold in the model metadata and
+            use it for verification immediately; only allowed when the
+            held-out subset was evaluated
+        roc_points: Number of ROC points included in the report
+        min_threshold: Floor for an applied threshold
+
+    Returns:
+        Dictionary with the operating point, ROC curve and sample counts
+    """
+    if face_recognition_system.model is None or face_recognition_system.label_encoder is None:
+        raise CalibrationError("Model not trained or loaded")
+
+    probabilities, labels, subset, model_mtime = load_score_matrix(holdout_only, rescore=rescore)
+
+    thresholds = np.linspace(0.0, 1.0, num_thresholds)
+    far, frr = sweep_thresholds(probabilities, labels, thresholds)
+    operating_point = recommend_threshold(thresholds, far, frr, target_far)
+
+    roc_index = np.linspace(0, num_thresholds - 1, roc_points).astype(int)
+    report = {
+        'subset': subset,
+        'samples': int(len(labels)),
+        'classes': int(probabilities.shape[1]),
+        'operating_point': operating_point,
+        'current_threshold': face_recognition_system.confidence_threshold,
+        'roc': [
+            {'threshold': float(thresholds[i]), 'far': float(far[i]), 'tar': float(1.0 - frr[i])}
+            for i in roc_index
+        ]
+    }
+
+    if apply:
+        # Scores on faces the model trained on are optimistic and would
+        # recommend a threshold far too low
+        if subset != 'holdout':
+            raise CalibrationError("No held-out face data to calibrate on; retrain the model to create a held-out split")
+
+        threshold = max(operating_point['threshold'], min_threshold)
+
+        # Serialised with model publishes, and only for the model just scored
+        with face_recognition_system._update():
+            if published_model_mtime() != model_mtime:
+                raise CalibrationError("The model was replaced during calibration; run it again")
+            face_recognition_system.update_metadata(
+                confidence_threshold=threshold,
+                calibration={
+                    'far': operating_point['far'],
+                    'frr': operating_point['frr'],
+                    'criterion': operating_point['criterion'],
+                    'target_far': target_far,
+                    'samples': report['samples'],
+                    'calibrated_at': datetime.now(timezone.utc).isoformat()
+                }
+            )
+        report['applied_threshold'] = threshold
+        logger.info(f"Confidence threshold calibrated to {threshold:.4f}")
+
+    return report
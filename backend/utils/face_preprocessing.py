@@ -0,0 +1,163 @@
+"""
+Image decoding and face cropping shared by the CNN and its worker processes
+
+Kept free of TensorFlow so process pool workers stay lightweight.
+"""
+
+import base64
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from itertools import repeat
+
+import cv2
+import numpy as np
+from PIL import Image
+
+_face_cascade = None
+
+
+def get_face_cascade():
+    """Haar cascade face detector, loaded once per process"""
+    global _face_cascade
+    if _face_cascade is None:
+        _face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    return _face_cascade
+
+
+def decode_image(image_data):
+    """
+    Decode image input to an RGB numpy array
+
+    Accepts a base64 string (optionally a data URL), raw image bytes or
+    a PIL Image.
+    """
+    if isinstance(image_data, str):
+        if image_data.startswith('data:image'):
+            image_data = image_data.split(',')[1]
+        image_data = base64.b64decode(image_data)
+
+    if isinstance(image_data, (bytes, bytearray)):
+        image = Image.open(BytesIO(image_data))
+    else:
+        image = image_data
+
+    # Convert to RGB if necessary
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    return np.array(image)
+
+
+def crop_face(img_array, img_size):
+    """
+    Detect and crop the face region, resized to the CNN input size
+
+    Returns:
+        Tuple of (uint8 face crop, whether a face was detected)
+    """
+    # Detect face using OpenCV Haar Cascade
+    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+    faces = get_face_cascade().detectMultiScale(gray, 1.1, 4)
+
+    if len(faces) > 0:
+        # Use the largest detected face
+        (x, y, w, h) = max(faces, key=lambda face: face[2] * face[3])
+
+        # Add padding around face
+        padding = 20
+        x = max(0, x - padding)
+        y = max(0, y - padding)
+        w = min(img_array.shape[1] - x, w + 2 * padding)
+        h = min(img_array.shape[0] - y, h + 2 * padding)
+
+        # Crop face region
+        face_img = img_array[y:y+h, x:x+w]
+    else:
+        # If no face detected, use center crop
+        h, w = img_array.shape[:2]
+        size = min(h, w)
+        start_h = (h - size) // 2
+        start_w = (w - size) // 2
+        face_img = img_array[start_h:start_h+size, start_w:start_w+size]
+
+    # Resize to target size
+    face_img = cv2.resize(face_img, img_size)
+
+    return face_img, len(faces) > 0
+
+
+def face_crop_uint8(image_data, img_size):
+    """
+    Cropped uint8 face for any supported input
+
+    A numpy array is treated as a precomputed face crop and only resized.
+    """
+    if isinstance(image_data, np.ndarray):
+        if image_data.shape[:2] != img_size[::-1]:
+            return cv2.resize(image_data, img_size)
+        return image_data
+    face_img, _ = crop_face(decode_image(image_data), img_size)
+    return face_img
+
+
+def load_face_crop(path):
+    """Stored face crop as a uint8 RGB array, or None if there is none"""
+    if path and os.path.exists(path):
+        return np.array(Image.open(path).convert('RGB'))
+    return None
+
+
+def sample_crop_uint8(sample, img_size):
+    """
+    Cropped uint8 face for an (image_path, image_data) sample
+
+    The stored face crop is used when there is one; otherwise the raw image
+    is decoded and cropped.
+    """
+    image_path, image_data = sample
+    face_crop = load_face_crop(image_path)
+    return face_crop_uint8(face_crop if face_crop is not None else image_data, img_size)
+
+
+def init_worker():
+    """Process pool initializer: parallelism comes from the pool, not OpenCV"""
+    cv2.setNumThreads(1)
+
+
+def preprocess_chunk(chunk, img_size):
+    """
+    Load and crop a chunk of (image_path, image_data) samples in a worker
+
+    Returns compact uint8 crops (None for images that fail) so only a
+    quarter of the float32 payload is pickled back to the parent.
+    """
+    crops = []
+    for sample in chunk:
+        try:
+            crops.append(sample_crop_uint8(sample, img_size))
+        except Exception:
+            crops.append(None)
+    return crops
+
+
+def crop_parallel(samples, img_size, workers, chunk_size):
+    """
+    Crop (image_path, image_data) samples across a process pool
+
+    Workers read and decode the files themselves, so the parent only ships
+    paths, or raw bytes for faces without a stored crop. The pool uses the
+    spawn start method: forking a process that runs TensorFlow and
+    background threads can deadlock the children.
+
+    Returns:
+        List of uint8 crops in input order, None where cropping failed
+    """
+    chunks = [samples[i:i + chunk_size] for i in range(0, len(samples), chunk_size)]
+    context = multiprocessing.get_context('spawn')
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker) as executor:
+        return [crop
+                for chunk_crops in executor.map(preprocess_chunk, chunks, repeat(img_size))
+                for crop in chunk_crops]
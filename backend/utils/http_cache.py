@@ -0,0 +1,129 @@
+"""
+Conditional GET support for election endpoints
+
+ETags are derived from cheap aggregate reads (row counts, updated_at maxima
+and counter sums) instead of the serialised payload, so a client holding a
+current ETag gets 304 Not Modified without offices or candidates being
+loaded. Every cast, counter fold and admin edit moves at least one of the
+aggregates. Election status is derived from the clock, so the number of
+election windows that have opened and closed is part of the version too.
+"""
+
+from datetime import datetime, timezone
+import hashlib
+
+from flask import current_app, request
+from sqlalchemy import case, func
+
+from extensions import db
+from models.election import Election
+from models.office import Office
+from models.candidate import Candidate
+from models.vote_tally import VoteTally
+
+
+def make_etag(*parts):
+    """Opaque ETag value from version components"""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def _utcnow():
+    # Dates are stored as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def listing_etag(scope):
+    """
+    ETag covering every election, office and candidate
+
+    Args:
+        scope: Name of the listing, so different listings never share an ETag
+    """
+    now = _utcnow()
+    row = db.session.query(
+        func.count(Election.id),
+        func.max(Election.updated_at),
+        func.sum(Election.voted_count),
+        func.sum(case((Election.start_date <= now, 1), else_=0)),
+        func.sum(case((Election.end_date < now, 1), else_=0)),
+        db.session.query(func.count(Office.id)).scalar_subquery(),
+        db.session.query(func.max(Office.updated_at)).scalar_subquery(),
+        db.session.query(func.count(Candidate.id)).scalar_subquery(),
+        db.session.query(func.max(Candidate.updated_at)).scalar_subquery(),
+        db.session.query(func.sum(Candidate.votes_count)).scalar_subquery()
+    ).one()
+    return make_etag(scope, *row)
+
+
+def election_etag(scope, election_id):
+    """
+    ETag for one election with its offices, candidates and tally
+
+    Returns:
+        Tuple of (etag, status), or (None, None) if the election does not exist
+    """
+    office_ids = db.session.query(Office.id).filter(Office.election_id == election_id)
+    row = db.session.query(
+        Election.start_date,
+        Election.end_date,
+        Election.updated_at,
+        Election.voted_count,
+        Election.tally_initialized,
+        db.session.query(func.count(Office.id))
+        .filter(Office.election_id == election_id).scalar_subquery(),
+        db.session.query(func.max(Office.updated_at))
+        .filter(Office.election_id == election_id).scalar_subquery(),
+        db.session.query(func.count(Candidate.id))
+        .filter(Candidate.office_id.in_(office_ids)).scalar_subquery(),
+        db.session.query(func.max(Candidate.updated_at))
+        .filter(Candidate.office_id.in_(office_ids)).scalar_subquery(),
+        db.session.query(func.sum(VoteTally.votes))
+        .filter(VoteTally.election_id == election_id).scalar_subquery()
+    ).filter(Election.id == election_id).first()
+
+    if row is None:
+        return None, None
+
+    status = Election.derive_status(row[0], row[1])
+    return make_etag(scope, election_id, status, *row), status
+
+
+def _set_cache_control(response, max_age):
+    response.cache_control.private = True
+    if max_age:
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.no_cache = True
+
+
+def completed_max_age(status):
+    """Cache lifetime for an election's data: only completed elections are immutable"""
+    return current_app.config.get('COMPLETED_ELECTION_MAX_AGE', 3600) if status == 'completed' else None
+
+
+def not_modified(etag, max_age=None):
+    """
+    304 response when the request's If-None-Match matches etag
+
+    Returns:
+        Response, or None when the full response must be sent
+    """
+    if not request.if_none_match.contains(etag):
+        return None
+
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    _set_cache_control(response, max_age)
+    return response
+
+
+def with_etag(response, etag, max_age=None):
+    """
+    Attach ETag and Cache-Control to a full response
+
+    Without max_age clients must revalidate every time (cheap with the ETag);
+    with it they may reuse the response for that many seconds.
+    """
+    response.set_etag(etag)
+    _set_cache_control(response, max_age)
+    return response
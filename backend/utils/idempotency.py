@@ -0,0 +1,284 @@
+"""
+Idempotency keys for retry-safe POST/PUT endpoints
+
+A client whose response was lost resends the request with the same
+Idempotency-Key header. The first successful response is kept keyed by
+(user, endpoint, key), and retries get that response back without running
+the view again or touching the database. Keys live in a small SQLite file
+rather than process memory, so a retry that lands on another gunicorn
+worker is still recognised.
+"""
+
+from functools import wraps
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import logging
+
+from flask import request, jsonify, make_response
+from flask_jwt_extended import get_jwt_identity
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS idempotency_key ('
+    ' user TEXT NOT NULL, endpoint TEXT NOT NULL, key TEXT NOT NULL,'
+    ' fingerprint TEXT NOT NULL, created REAL NOT NULL,'
+    ' status INTEGER, body BLOB, mimetype TEXT, replayed INTEGER NOT NULL DEFAULT 0,'
+    ' PRIMARY KEY (user, endpoint, key))',
+    'CREATE INDEX IF NOT EXISTS ix_idempotency_key_created ON idempotency_key (created)',
+)
+
+
+def request_fingerprint():
+    """
+    Hash of the request payload
+
+    Multipart and form bodies are hashed by field and file content rather
+    than raw bytes, since a client resending a form picks a new boundary.
+    """
+    digest = hashlib.sha256()
+
+    if request.mimetype in ('multipart/form-data', 'application/x-www-form-urlencoded'):
+        for name, value in sorted(request.form.items(multi=True)):
+            digest.update(f'{name}={value}\n'.encode())
+        for name, storage in sorted(request.files.items(multi=True), key=lambda item: item[0]):
+            digest.update(f'{name}:{storage.filename}\n'.encode())
+            digest.update(storage.read())
+            storage.seek(0)
+    else:
+        digest.update(request.get_data(cache=True))
+
+    return digest.hexdigest()
+
+
+class SQLiteResponseStore:
+    """
+    Idempotency keys and their stored responses in a SQLite file
+
+    A key is claimed with a NULL status while its request runs, inside one
+    IMMEDIATE transaction, so two workers racing on the same key cannot
+    both run the view.
+    """
+
+    def __init__(self, path, timeout=2.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._created = False
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            with self._lock:
+                if not self._created:
+                    for statement in SCHEMA:
+                        connection.execute(statement)
+                    self._created = True
+            self._local.connection = connection
+        return connection
+
+    def claim(self, store_key, fingerprint, now, ttl, stale_after, max_keys):
+        """
+        Claim a key for a new request, or return what is already stored
+
+        Expired responses and in-progress claims older than stale_after
+        (left by a worker that died mid-request) are dropped first.
+
+        Returns:
+            None if the key was claimed, otherwise a tuple of
+            (fingerprint, status, body, mimetype); status is None while the
+            original request is still running
+        """
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute(
+                'DELETE FROM idempotency_key WHERE created < ? '
+                'OR (status IS NULL AND created < ?)',
+                (now - ttl, now - stale_after)
+            )
+            row = connection.execute(
+                'SELECT fingerprint, status, body, mimetype FROM idempotency_key '
+                'WHERE user = ? AND endpoint = ? AND key = ?',
+                store_key
+            ).fetchone()
+
+            if row is not None:
+                if row[0] == fingerprint and row[1] is not None:
+                    connection.execute(
+                        'UPDATE idempotency_key SET replayed = replayed + 1 '
+                        'WHERE user = ? AND endpoint = ? AND key = ?',
+                        store_key
+                    )
+                connection.execute('COMMIT')
+                return row
+
+            # Stay under the bound by evicting the oldest stored responses
+            (count,) = connection.execute('SELECT COUNT(*) FROM idempotency_key').fetchone()
+            if count >= max_keys:
+                connection.execute(
+                    'DELETE FROM idempotency_key WHERE rowid IN ('
+                    ' SELECT rowid FROM idempotency_key WHERE status IS NOT NULL'
+                    ' ORDER BY created LIMIT ?)',
+                    (count - max_keys + 1,)
+                )
+            connection.execute(
+                'INSERT INTO idempotency_key (user, endpoint, key, fingerprint, created) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (*store_key, fingerprint, now)
+            )
+            connection.execute('COMMIT')
+            return None
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def complete(self, store_key, status, body, mimetype):
+        """Store the response for a claimed key"""
+        self._connection().execute(
+            'UPDATE idempotency_key SET status = ?, body = ?, mimetype = ? '
+            'WHERE user = ? AND endpoint = ? AND key = ?',
+            (status, body, mimetype, *store_key)
+        )
+
+    def release(self, store_key):
+        """Drop a claim whose response is not kept, so a retry runs again"""
+        self._connection().execute(
+            'DELETE FROM idempotency_key WHERE user = ? AND endpoint = ? AND key = ?',
+            store_key
+        )
+
+    def counts(self):
+        """Tuple of (stored keys, replayed responses) across all workers"""
+        stored, replayed = self._connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(replayed), 0) FROM idempotency_key'
+        ).fetchone()
+        return stored, replayed
+
+
+class IdempotencyStore:
+    """
+    Bounded TTL store of key -> completed response
+
+    Configured from the Flask app via init_app:
+    - IDEMPOTENCY_MAX_KEYS: responses kept, oldest evicted first
+    - IDEMPOTENCY_TTL: seconds a response is kept after it was stored
+    - IDEMPOTENCY_STORAGE: SQLite file shared by the workers on this host
+
+    Only final 2xx responses are stored, so a retry after a failure, a shed
+    request or a 202 (still pending) runs the view again. A key reused with
+    a different request body is rejected with 422, and a retry arriving
+    while the original is still running gets 409.
+
+    If the store is unavailable the view runs without idempotency and the
+    error is counted, so a broken key file never takes writes down.
+    """
+
+    # Seconds before an unfinished claim is treated as abandoned
+    stale_after = 300
+
+    def __init__(self, app=None, max_keys=10000, ttl=86400):
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self.store = None
+        self._stats_lock = threading.Lock()
+        self._errors = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_keys = app.config.get('IDEMPOTENCY_MAX_KEYS', self.max_keys)
+        self.ttl = app.config.get('IDEMPOTENCY_TTL', self.ttl)
+        path = app.config.get('IDEMPOTENCY_STORAGE') or \
+            os.path.join(tempfile.gettempdir(), 'fuo_idempotency.db')
+        self.store = SQLiteResponseStore(path)
+
+    def _store_error(self, e):
+        logger.error(f"Idempotency store error: {str(e)}")
+        with self._stats_lock:
+            self._errors += 1
+
+    def idempotent(self, endpoint):
+        """Decorator replaying the stored response for a repeated Idempotency-Key"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                key = request.headers.get(IDEMPOTENCY_HEADER)
+                if not key or self.store is None:
+                    return view(*args, **kwargs)
+
+                if len(key) > MAX_KEY_LENGTH:
+                    return jsonify({'success': False, 'error': 'Idempotency key too long'}), 400
+
+                store_key = (str(get_jwt_identity()), endpoint, key)
+                fingerprint = request_fingerprint()
+
+                try:
+                    entry = self.store.claim(store_key, fingerprint, time.time(),
+                                             self.ttl, self.stale_after, self.max_keys)
+                except sqlite3.Error as e:
+                    self._store_error(e)
+                    return view(*args, **kwargs)
+
+                if entry is not None:
+                    stored_fingerprint, status, body, mimetype = entry
+                    if stored_fingerprint != fingerprint:
+                        return jsonify({
+                            'success': False,
+                            'error': 'Idempotency key was already used with a different request'
+                        }), 422
+                    if status is None:
+                        return jsonify({
+                            'success': False,
+                            'error': 'A request with this idempotency key is still in progress'
+                        }), 409
+
+                    response = make_response(body, status)
+                    response.mimetype = mimetype
+                    response.headers['Idempotent-Replayed'] = 'true'
+                    return response
+
+                response = None
+                try:
+                    response = make_response(view(*args, **kwargs))
+                    return response
+                finally:
+                    try:
+                        if response is not None and 200 <= response.status_code < 300 \
+                                and response.status_code != 202:
+                            self.store.complete(store_key, response.status_code,
+                                                response.get_data(), response.mimetype)
+                        else:
+                            self.store.release(store_key)
+                    except sqlite3.Error as e:
+                        self._store_error(e)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        """Stored key and replay counts"""
+        stored = replayed = 0
+        if self.store is not None:
+            try:
+                stored, replayed = self.store.counts()
+            except sqlite3.Error as e:
+                logger.error(f"Idempotency store error: {str(e)}")
+        with self._stats_lock:
+            errors = self._errors
+        return {'stored': stored, 'replayed': replayed, 'storeErrors': errors}
+
+
+# Global instance
+idempotency = IdempotencyStore()
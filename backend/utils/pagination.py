@@ -0,0 +1,63 @@
+"""
+Keyset pagination helpers
+
+Cursors are opaque to clients: a URL-safe encoding of the last ID served.
+Pagination is opt-in; without ?limit= or ?cursor= endpoints return
+everything as before.
+"""
+
+import base64
+import binascii
+
+from flask import request
+
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(last_id):
+    """Opaque pagination cursor for the item after `last_id`"""
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise ValueError('Invalid cursor')
+
+
+def page_params():
+    """
+    Page size and position from ?limit= and ?cursor=
+
+    Returns:
+        Tuple of (limit, after); limit is None when the request is not
+        paginated, after is None on the first page
+
+    Raises:
+        ValueError: for an out-of-range limit or malformed cursor
+    """
+    limit = request.args.get('limit', type=int)
+    cursor = request.args.get('cursor')
+
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f'Limit must be between 1 and {MAX_PAGE_SIZE}')
+
+    after = decode_cursor(cursor) if cursor else None
+    if after is not None and limit is None:
+        limit = MAX_PAGE_SIZE
+
+    return limit, after
+
+
+def split_page(items, limit, key):
+    """
+    Trim a page fetched with limit + 1 rows
+
+    Returns:
+        Tuple of (items, next cursor or None)
+    """
+    if limit is None or len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_cursor(key(items[-1]))
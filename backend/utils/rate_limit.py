@@ -0,0 +1,300 @@
+"""
+Sliding-window rate limiting for login and face endpoints
+
+Credential-stuffing bursts against login cost a password hash each, and face
+requests cost CNN inference, so both are throttled per client IP and per
+account before any of that work starts. Counters live in a small SQLite file
+rather than process memory, so every gunicorn worker on the box shares the
+same windows.
+
+Each (rule, scope, value) key keeps two fixed buckets, the current and the
+previous window. The request rate is estimated as
+
+    previous * (1 - elapsed fraction of current window) + current
+
+which approximates a true sliding window with O(1) storage per key. Buckets
+of keys that stop sending requests are swept periodically, so one-off IPs
+and mistyped emails do not accumulate in the file.
+"""
+
+from functools import wraps
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import logging
+
+from flask import request, jsonify
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS rate_limit_window ('
+    ' key TEXT NOT NULL, bucket INTEGER NOT NULL, hits INTEGER NOT NULL,'
+    ' PRIMARY KEY (key, bucket))',
+    'CREATE TABLE IF NOT EXISTS rate_limit_rejection ('
+    ' rule TEXT NOT NULL, scope TEXT NOT NULL, rejected INTEGER NOT NULL,'
+    ' PRIMARY KEY (rule, scope))',
+)
+
+
+def client_ip():
+    """Address the request came from; run behind ProxyFix when proxied"""
+    return request.remote_addr or 'unknown'
+
+
+def parse_rate(rate):
+    """
+    Parse a 'hits/seconds' rate such as '5/300'
+
+    Returns:
+        Tuple of (limit, window_seconds)
+    """
+    limit, window = str(rate).split('/', 1)
+    return int(limit), float(window)
+
+
+def window_estimate(previous, current, elapsed):
+    """Sliding-window request count from two fixed buckets"""
+    return previous * (1.0 - elapsed) + current
+
+
+def retry_after(previous, current, elapsed, limit, window):
+    """Seconds until the estimate drops below limit again"""
+    if current >= limit:
+        # Blocked for the rest of this bucket, then previous = current
+        remaining = (1.0 - elapsed) * window
+        wait = remaining + (1.0 - (limit - 1) / current) * window
+    elif previous:
+        # Wait until the previous bucket's weight has decayed enough
+        needed = 1.0 - (limit - 1 - current) / previous
+        wait = (needed - elapsed) * window
+    else:
+        wait = 1
+    # Rounded first so float error cannot add a whole second
+    return max(1, math.ceil(round(wait, 6)))
+
+
+class SQLiteWindowStore:
+    """
+    Two-bucket window counters in a SQLite file shared between processes
+
+    Every check runs in one IMMEDIATE transaction, so concurrent workers
+    serialise on the file lock and a burst cannot slip past the limit.
+    At most every sweep_interval seconds a check also deletes the expired
+    buckets of every key with the same rule and scope.
+    """
+
+    def __init__(self, path, timeout=2.0, sweep_interval=60.0):
+        self.path = path
+        self.timeout = timeout
+        self.sweep_interval = sweep_interval
+        self._local = threading.local()
+        self._created = False
+        self._lock = threading.Lock()
+        self._windows = {}
+        self._next_sweep = 0.0
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            with self._lock:
+                if not self._created:
+                    for statement in SCHEMA:
+                        connection.execute(statement)
+                    self._created = True
+            self._local.connection = connection
+        return connection
+
+    def hit(self, rule, checks, now=None):
+        """
+        Count one request against every check, unless any of them is full
+
+        Args:
+            rule: Rule name, used for rejection counters
+            checks: List of (scope, key, limit, window) tuples
+            now: Current time in seconds since the epoch
+
+        Returns:
+            Tuple of (allowed, retry_after, rejected scope)
+        """
+        now = time.time() if now is None else now
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            buckets = []
+            for scope, key, limit, window in checks:
+                bucket = int(now // window)
+                elapsed = (now % window) / window
+                counts = dict(connection.execute(
+                    'SELECT bucket, hits FROM rate_limit_window WHERE key = ? AND bucket IN (?, ?)',
+                    (key, bucket - 1, bucket)
+                ).fetchall())
+                previous, current = counts.get(bucket - 1, 0), counts.get(bucket, 0)
+
+                if window_estimate(previous, current, elapsed) >= limit:
+                    connection.execute(
+                        'INSERT INTO rate_limit_rejection (rule, scope, rejected) VALUES (?, ?, 1) '
+                        'ON CONFLICT (rule, scope) DO UPDATE SET rejected = rejected + 1',
+                        (rule, scope)
+                    )
+                    connection.execute('COMMIT')
+                    return False, retry_after(previous, current, elapsed, limit, window), scope
+
+                buckets.append((key, bucket))
+                self._windows[f'{rule}:{scope}:'] = window
+
+            for key, bucket in buckets:
+                connection.execute(
+                    'INSERT INTO rate_limit_window (key, bucket, hits) VALUES (?, ?, 1) '
+                    'ON CONFLICT (key, bucket) DO UPDATE SET hits = hits + 1',
+                    (key, bucket)
+                )
+                # Buckets older than the previous window no longer count
+                connection.execute(
+                    'DELETE FROM rate_limit_window WHERE key = ? AND bucket < ?',
+                    (key, bucket - 1)
+                )
+            if now >= self._next_sweep:
+                self._next_sweep = now + self.sweep_interval
+                self._sweep(connection, now)
+            connection.execute('COMMIT')
+            return True, 0, None
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def _sweep(self, connection, now):
+        """Delete buckets older than the previous window, per rule and scope"""
+        for prefix, window in list(self._windows.items()):
+            connection.execute(
+                'DELETE FROM rate_limit_window WHERE substr(key, 1, ?) = ? AND bucket < ?',
+                (len(prefix), prefix, int(now // window) - 1)
+            )
+
+    def rejections(self):
+        """Rejected request counts as {rule: {scope: count}} across all workers"""
+        counts = {}
+        for rule, scope, rejected in self._connection().execute(
+                'SELECT rule, scope, rejected FROM rate_limit_rejection'):
+            counts.setdefault(rule, {})[scope] = rejected
+        return counts
+
+
+class RateLimiter:
+    """
+    Per-IP and per-account sliding-window limits
+
+    Configured from the Flask app via init_app:
+    - RATE_LIMIT_ENABLED: turn throttling on or off
+    - RATE_LIMIT_STORAGE: SQLite file shared by the workers on this host
+    - RATE_LIMITS: {rule: {'ip': 'hits/seconds', 'account': 'hits/seconds'}}
+
+    If the store is unavailable requests are let through and counted as
+    errors, so a broken counter file never takes login down.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.rules = {}
+        self.store = None
+        self._stats_lock = threading.Lock()
+        self._errors = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RATE_LIMIT_ENABLED', self.enabled)
+        path = app.config.get('RATE_LIMIT_STORAGE') or \
+            os.path.join(tempfile.gettempdir(), 'fuo_rate_limit.db')
+        self.store = SQLiteWindowStore(path)
+        self.rules = {
+            rule: {scope: parse_rate(rate) for scope, rate in scopes.items()}
+            for rule, scopes in app.config.get('RATE_LIMITS', {}).items()
+        }
+
+    def check(self, rule, account=None):
+        """
+        Count a request for rule from the current client
+
+        Args:
+            rule: Name of a configured rule
+            account: Account identifier (email or user ID) for per-account limits
+
+        Returns:
+            Tuple of (allowed, retry_after, rejected scope)
+        """
+        limits = self.rules.get(rule)
+        if not self.enabled or not limits:
+            return True, 0, None
+
+        checks = []
+        if 'ip' in limits:
+            checks.append(('ip', f'{rule}:ip:{client_ip()}', *limits['ip']))
+        if 'account' in limits and account is not None:
+            checks.append(('account', f'{rule}:account:{str(account).strip().lower()}', *limits['account']))
+
+        try:
+            return self.store.hit(rule, checks)
+        except sqlite3.Error as e:
+            logger.error(f"Rate limit store error: {str(e)}")
+            with self._stats_lock:
+                self._errors += 1
+            return True, 0, None
+
+    def limit(self, rule, account=None):
+        """
+        Decorator rejecting a view with 429 once a window is full
+
+        Args:
+            rule: Name of a configured rule
+            account: Optional callable returning the account identifier for
+                the current request
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                allowed, wait, scope = self.check(rule, account() if account else None)
+                if not allowed:
+                    logger.warning(f"Rate limited {rule} request from {client_ip()} ({scope} limit)")
+                    response = jsonify({
+                        'success': False,
+                        'error': 'Too many requests, please retry later',
+                        'retryAfter': wait
+                    })
+                    response.status_code = 429
+                    response.headers['Retry-After'] = str(wait)
+                    return response
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        """Configured limits and rejected request counters"""
+        rejected = {}
+        if self.store is not None:
+            try:
+                rejected = self.store.rejections()
+            except sqlite3.Error as e:
+                logger.error(f"Rate limit store error: {str(e)}")
+        with self._stats_lock:
+            errors = self._errors
+        return {
+            'enabled': self.enabled,
+            'limits': {
+                rule: {scope: f'{limit}/{window:g}' for scope, (limit, window) in scopes.items()}
+                for rule, scopes in self.rules.items()
+            },
+            'rejected': rejected,
+            'storeErrors': errors
+        }
+
+
+# Global instance
+rate_limiter = RateLimiter()
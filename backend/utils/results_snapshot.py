@@ -0,0 +1,182 @@
+"""
+Immutable final results snapshots
+
+When an election completes, its results are counted once from Vote and the
+serialised response body is stored in ResultsSnapshot. Later results
+requests are served from the snapshot, kept in memory after the first read,
+with no aggregation work at all.
+"""
+
+from datetime import datetime, timezone, timedelta
+import json
+import threading
+import time
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models.election import Election
+from models.vote import Vote
+from models.results_snapshot import ResultsSnapshot
+from utils.ballot_catalogue import ballot_catalogue, election_payload
+from utils.http_cache import make_etag
+from utils.tally import build_results, count_votes
+
+logger = logging.getLogger(__name__)
+
+
+def final_counters(election_id, catalogue, tally):
+    """
+    Election and candidate counters derived from a Vote count
+
+    The stored counters may lag behind Vote while sharded increments are
+    waiting to be folded, so the snapshot takes them from the count instead.
+
+    Returns:
+        Tuple of (voted_count, updated_at, {candidate_id: votes}) as
+        returned by load_live_counters
+    """
+    voted_count, updated_at = db.session.query(
+        db.session.query(func.count(func.distinct(Vote.user_id)))
+        .filter(Vote.election_id == election_id).scalar_subquery(),
+        Election.updated_at
+    ).filter(Election.id == election_id).one()
+
+    votes = {
+        candidate['id']: 0
+        for office in catalogue['payload']['offices'] for candidate in office['candidates']
+    }
+    for (_, candidate_id), count in tally.items():
+        votes[candidate_id] = votes.get(candidate_id, 0) + count
+    return voted_count, updated_at, votes
+
+
+def finalize_election(election_id):
+    """
+    Freeze an election's final results into a snapshot
+
+    Counts from Vote rather than the materialised tally or the stored
+    counters, so the snapshot is authoritative. Does nothing if a snapshot
+    already exists.
+
+    Returns:
+        The snapshot, or None if the election does not exist
+    """
+    snapshot = db.session.get(ResultsSnapshot, election_id)
+    if snapshot is not None:
+        return snapshot
+
+    catalogue = ballot_catalogue.get(election_id)
+    if not catalogue:
+        return None
+
+    tally = count_votes(election_id)
+    election = election_payload(catalogue, final_counters(election_id, catalogue, tally))
+    created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    snapshot = ResultsSnapshot(
+        election_id=election_id,
+        payload=json.dumps({
+            'success': True,
+            'results': build_results(election, tally),
+            'election': election,
+            'final': True
+        }),
+        etag=make_etag('snapshot', election_id, created_at),
+        total_votes=sum(tally.values()),
+        created_at=created_at
+    )
+    db.session.add(snapshot)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker finalised it first
+        db.session.rollback()
+        snapshot = db.session.get(ResultsSnapshot, election_id)
+
+    logger.info(f"Froze final results of election {election_id}")
+    return snapshot
+
+
+def finalize_completed_elections(delay=0):
+    """
+    Snapshot every election that ended more than `delay` seconds ago
+
+    The delay lets ballots accepted just before the close finish committing.
+
+    Returns:
+        Number of elections finalised
+    """
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=delay)
+    pending = db.session.query(Election.id) \
+        .outerjoin(ResultsSnapshot, ResultsSnapshot.election_id == Election.id) \
+        .filter(Election.end_date < cutoff, ResultsSnapshot.election_id.is_(None)) \
+        .all()
+
+    for (election_id,) in pending:
+        finalize_election(election_id)
+
+    return len(pending)
+
+
+class ResultsSnapshotStore:
+    """
+    In-memory cache of snapshot bodies
+
+    Snapshots never change once written, but an admin may drop one through
+    another worker process, so cached entries are re-checked after the
+    ballot catalogue TTL.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots = {}
+
+    def cached(self, election_id):
+        """Snapshot already in memory, without touching the database"""
+        with self._lock:
+            snapshot = self._snapshots.get(election_id)
+        if snapshot is not None and time.monotonic() - snapshot['loaded_at'] < ballot_catalogue.ttl:
+            return snapshot
+        return None
+
+    def get(self, election_id):
+        """
+        Snapshot for an election, loading it on first use
+
+        Returns:
+            Dictionary with 'body' and 'etag', or None if not finalised
+        """
+        snapshot = self.cached(election_id)
+        if snapshot is not None:
+            return snapshot
+
+        row = db.session.get(ResultsSnapshot, election_id)
+        if row is None:
+            with self._lock:
+                self._snapshots.pop(election_id, None)
+            return None
+
+        snapshot = {'body': row.payload, 'etag': row.etag, 'loaded_at': time.monotonic()}
+        with self._lock:
+            self._snapshots[election_id] = snapshot
+        return snapshot
+
+    def drop(self, election_id):
+        """
+        Discard an election's snapshot, e.g. when an admin reopens or deletes
+        it. Runs in the current transaction; the caller commits.
+        """
+        with self._lock:
+            self._snapshots.pop(election_id, None)
+        db.session.execute(
+            db.delete(ResultsSnapshot)
+            .where(ResultsSnapshot.election_id == election_id)
+            .execution_options(synchronize_session=False)
+        )
+
+
+# Global instance
+results_snapshots = ResultsSnapshotStore()
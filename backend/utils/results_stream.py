@@ -0,0 +1,243 @@
+"""
+Live election results over Server-Sent Events
+
+The vote path marks an election dirty after each commit. A single publisher
+thread wakes every RESULTS_STREAM_INTERVAL seconds, reads the tally once for
+each dirty election that has watchers, and pushes only the changed
+(office, candidate) totals to every subscriber. However many clients are
+watching, an election costs at most one tally query per interval.
+
+Votes committed by other worker processes never mark this process's
+elections dirty, so every watched election is also re-read every
+RESULTS_STREAM_SYNC_INTERVAL seconds.
+"""
+
+import json
+import queue
+import threading
+import time
+import logging
+
+from extensions import db
+from utils.tally import get_tally
+
+logger = logging.getLogger(__name__)
+
+
+class StreamFull(Exception):
+    """Raised when the subscriber limit has been reached"""
+
+
+def format_event(event, data, event_id=None):
+    """Serialise one SSE message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def tally_entries(tally, previous=None):
+    """
+    Tally rows as JSON-ready entries
+
+    Args:
+        tally: Dictionary mapping (office_id, candidate_id) to vote count
+        previous: Earlier tally; when given only changed rows are returned,
+            each with its 'delta'
+    """
+    entries = []
+    for (office_id, candidate_id), votes in tally.items():
+        entry = {'officeId': office_id, 'candidateId': candidate_id, 'votes': votes}
+        if previous is not None:
+            delta = votes - previous.get((office_id, candidate_id), 0)
+            if not delta:
+                continue
+            entry['delta'] = delta
+        entries.append(entry)
+    return entries
+
+
+class ResultsPublisher:
+    """
+    Coalescing fan-out of tally deltas to SSE subscribers
+
+    Configured from the Flask app via init_app:
+    - RESULTS_STREAM_INTERVAL: seconds between delta messages at most
+    - RESULTS_STREAM_SYNC_INTERVAL: seconds between full re-reads of watched elections
+    - RESULTS_STREAM_MAX_SUBSCRIBERS: open streams allowed per process
+    - RESULTS_STREAM_KEEPALIVE: seconds between keepalive comments
+    """
+
+    def __init__(self, app=None, interval=1.0, sync_interval=10.0, max_subscribers=500, keepalive=15.0):
+        self.interval = interval
+        self.sync_interval = sync_interval
+        self.max_subscribers = max_subscribers
+        self.keepalive = keepalive
+        self.queue_size = 64
+        self._app = None
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._tallies = {}
+        self._sequence = {}
+        self._dirty = set()
+        self._thread = None
+        self._stop = threading.Event()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.interval = app.config.get('RESULTS_STREAM_INTERVAL', self.interval)
+        self.sync_interval = app.config.get('RESULTS_STREAM_SYNC_INTERVAL', self.sync_interval)
+        self.max_subscribers = app.config.get('RESULTS_STREAM_MAX_SUBSCRIBERS', self.max_subscribers)
+        self.keepalive = app.config.get('RESULTS_STREAM_KEEPALIVE', self.keepalive)
+        self._app = app
+
+    def notify(self, election_id):
+        """Mark an election's results as changed; called after a vote commit"""
+        with self._lock:
+            if election_id in self._subscribers:
+                self._dirty.add(election_id)
+
+    def subscribe(self, election_id):
+        """
+        Register a stream for an election
+
+        Must be called inside an app context; the first watcher of an
+        election loads its tally.
+
+        Returns:
+            Tuple of (subscriber queue, snapshot message)
+
+        Raises:
+            StreamFull: if max_subscribers streams are already open
+        """
+        with self._lock:
+            if sum(len(queues) for queues in self._subscribers.values()) >= self.max_subscribers:
+                raise StreamFull()
+            tally = self._tallies.get(election_id)
+
+        if tally is None:
+            tally = get_tally(election_id)
+
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            if election_id not in self._subscribers:
+                self._subscribers[election_id] = set()
+                self._tallies[election_id] = tally
+                self._sequence.setdefault(election_id, 0)
+            self._subscribers[election_id].add(subscriber)
+            snapshot = {
+                'electionId': election_id,
+                'seq': self._sequence[election_id],
+                'tally': tally_entries(self._tallies[election_id])
+            }
+
+        self._ensure_publisher()
+        return subscriber, snapshot
+
+    def unsubscribe(self, election_id, subscriber):
+        with self._lock:
+            queues = self._subscribers.get(election_id)
+            if queues is None:
+                return
+            queues.discard(subscriber)
+            if not queues:
+                del self._subscribers[election_id]
+                self._tallies.pop(election_id, None)
+                self._dirty.discard(election_id)
+
+    def stream(self, election_id, subscriber, snapshot):
+        """
+        SSE body generator for one subscriber
+
+        Sends the snapshot, then deltas as they are published, with keepalive
+        comments in between. A subscriber that falls too far behind is
+        dropped and should reconnect for a fresh snapshot.
+        """
+        try:
+            yield format_event('snapshot', snapshot, snapshot['seq'])
+            while True:
+                try:
+                    message = subscriber.get(timeout=self.keepalive)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                if message is None:
+                    break
+                yield format_event('delta', message, message['seq'])
+        finally:
+            self.unsubscribe(election_id, subscriber)
+
+    def _ensure_publisher(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True, name='results-publisher')
+                self._thread.start()
+
+    def _run(self):
+        next_sync = time.monotonic() + self.sync_interval
+        while not self._stop.wait(self.interval):
+            now = time.monotonic()
+            with self._lock:
+                if now >= next_sync:
+                    elections = set(self._subscribers)
+                    next_sync = now + self.sync_interval
+                else:
+                    elections = self._dirty & set(self._subscribers)
+                self._dirty.clear()
+
+            if not elections:
+                continue
+
+            with self._app.app_context():
+                try:
+                    for election_id in elections:
+                        self._publish(election_id, get_tally(election_id))
+                except Exception as e:
+                    logger.error(f"Results publisher error: {str(e)}")
+                finally:
+                    db.session.remove()
+
+    def _publish(self, election_id, tally):
+        """Fan the change since the last published tally out to subscribers"""
+        with self._lock:
+            previous = self._tallies.get(election_id)
+            if previous is None:
+                return
+            changes = tally_entries(tally, previous)
+            if not changes:
+                return
+
+            self._tallies[election_id] = tally
+            self._sequence[election_id] += 1
+            message = {'electionId': election_id, 'seq': self._sequence[election_id], 'changes': changes}
+
+            for subscriber in list(self._subscribers[election_id]):
+                try:
+                    subscriber.put_nowait(message)
+                except queue.Full:
+                    # Too far behind: end the stream so the client resyncs
+                    self._subscribers[election_id].discard(subscriber)
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        pass
+                    subscriber.put_nowait(None)
+
+    def stats(self):
+        """Watched elections and open streams"""
+        with self._lock:
+            return {
+                'elections': len(self._subscribers),
+                'subscribers': sum(len(queues) for queues in self._subscribers.values())
+            }
+
+    def stop(self):
+        self._stop.set()
+
+
+# Global instance
+results_publisher = ResultsPublisher()
@@ -0,0 +1,206 @@
+"""
+Election tallies
+
+Results used to be computed with one COUNT per office and per candidate.
+Casts now increment a materialised VoteTally table in the same transaction
+as the votes themselves, and results are served from it with one query.
+count_votes recomputes the same totals from Vote with a single GROUP BY,
+for elections whose votes predate the tally table and for rebuilds.
+
+Elections created before the tally table have Election.tally_initialized
+unset; the first read backfills their tally from Vote (see ensure_tally).
+"""
+
+from collections import Counter
+import threading
+import logging
+
+from sqlalchemy import func
+
+from extensions import db
+from models.election import Election
+from models.vote import Vote
+from models.vote_tally import VoteTally
+from utils.vote_counters import upsert_insert
+
+logger = logging.getLogger(__name__)
+
+# Elections this process has seen with a complete tally
+_initialized = set()
+_initialized_lock = threading.Lock()
+
+
+def count_votes(election_id):
+    """
+    Totals for an election counted from Vote with one GROUP BY query
+
+    Returns:
+        Dictionary mapping (office_id, candidate_id) to vote count
+    """
+    rows = db.session.query(Vote.office_id, Vote.candidate_id, func.count(Vote.id)) \
+        .filter(Vote.election_id == election_id) \
+        .group_by(Vote.office_id, Vote.candidate_id) \
+        .all()
+    return {(office_id, candidate_id): count for office_id, candidate_id, count in rows}
+
+
+def load_tally(election_id):
+    """
+    Totals for an election from the materialised tally
+
+    Returns:
+        Dictionary mapping (office_id, candidate_id) to vote count
+    """
+    rows = db.session.query(VoteTally.office_id, VoteTally.candidate_id, VoteTally.votes) \
+        .filter(VoteTally.election_id == election_id) \
+        .all()
+    return {(office_id, candidate_id): votes for office_id, candidate_id, votes in rows}
+
+
+def increment_tally(election_id, ballot):
+    """
+    Add a ballot's votes to the tally in the current transaction
+
+    Args:
+        election_id: Election the ballot belongs to
+        ballot: (office_id, candidate_id) pairs; repeats add more votes
+    """
+    counts = Counter(ballot)
+    if not counts:
+        return
+
+    insert = upsert_insert(db.session.get_bind().dialect.name)
+    if insert is not None:
+        stmt = insert(VoteTally).values([
+            {'office_id': office_id, 'candidate_id': candidate_id, 'election_id': election_id, 'votes': n}
+            for (office_id, candidate_id), n in counts.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['office_id', 'candidate_id'],
+            set_={'votes': VoteTally.votes + stmt.excluded.votes}
+        )
+        db.session.execute(stmt)
+        return
+
+    for (office_id, candidate_id), n in counts.items():
+        updated = db.session.execute(
+            db.update(VoteTally)
+            .where(VoteTally.office_id == office_id, VoteTally.candidate_id == candidate_id)
+            .values(votes=VoteTally.votes + n)
+            .execution_options(synchronize_session=False)
+        )
+        if updated.rowcount == 0:
+            db.session.execute(db.insert(VoteTally).values(
+                office_id=office_id, candidate_id=candidate_id, election_id=election_id, votes=n
+            ))
+
+
+def rebuild_tally(election_id):
+    """
+    Replace an election's tally with totals counted from Vote
+
+    Runs in the current transaction; the caller commits. Only safe while no
+    ballots are being cast for the election, or after the election row has
+    been locked as ensure_tally does.
+
+    Returns:
+        Number of votes in the rebuilt tally
+    """
+    db.session.execute(
+        db.update(Election)
+        .where(Election.id == election_id)
+        .values(tally_initialized=True, updated_at=Election.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    counts = count_votes(election_id)
+
+    db.session.execute(
+        db.delete(VoteTally)
+        .where(VoteTally.election_id == election_id)
+        .execution_options(synchronize_session=False)
+    )
+    if counts:
+        db.session.execute(db.insert(VoteTally), [
+            {'office_id': office_id, 'candidate_id': candidate_id, 'election_id': election_id, 'votes': n}
+            for (office_id, candidate_id), n in counts.items()
+        ])
+
+    return sum(counts.values())
+
+
+def ensure_tally(election_id):
+    """
+    Backfill an election's tally from Vote if it was never initialised
+
+    The election row is claimed with an UPDATE first. Casts update the same
+    row (voted_count) before touching the tally, so a cast either committed
+    before the claim and is counted by the rebuild, or waits for it and then
+    increments the rebuilt tally; no vote is lost or counted twice. Only one
+    worker wins the claim. Commits when it backfills.
+    """
+    with _initialized_lock:
+        if election_id in _initialized:
+            return
+
+    row = db.session.query(Election.tally_initialized).filter(Election.id == election_id).first()
+    if row is None:
+        return
+    if row[0]:
+        with _initialized_lock:
+            _initialized.add(election_id)
+        return
+
+    claimed = db.session.execute(
+        db.update(Election)
+        .where(Election.id == election_id,
+               db.or_(Election.tally_initialized.is_(None), Election.tally_initialized.is_(False)))
+        .values(tally_initialized=True, updated_at=Election.updated_at)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    if claimed:
+        votes = rebuild_tally(election_id)
+        db.session.commit()
+        logger.info(f"Backfilled tally of election {election_id} with {votes} votes")
+    else:
+        db.session.rollback()
+
+    with _initialized_lock:
+        _initialized.add(election_id)
+
+
+def get_tally(election_id):
+    """Totals for an election from the tally table, backfilling it on first use"""
+    ensure_tally(election_id)
+    return load_tally(election_id)
+
+
+def build_results(election, tally):
+    """
+    Per-office results from an election payload and its tally
+
+    Args:
+        election: Election to_dict payload with offices and candidates
+        tally: Dictionary mapping (office_id, candidate_id) to vote count
+
+    Returns:
+        Dictionary mapping office title to its total and candidates sorted
+        by votes
+    """
+    results = {}
+    for office in election['offices']:
+        votes = [tally.get((office['id'], candidate['id']), 0) for candidate in office['candidates']]
+        total_votes = sum(votes)
+
+        candidates = []
+        for candidate, vote_count in zip(office['candidates'], votes):
+            candidate_result = dict(candidate)
+            candidate_result['votes'] = vote_count
+            candidate_result['percentage'] = (vote_count / total_votes * 100) if total_votes > 0 else 0
+            candidates.append(candidate_result)
+
+        # Sort candidates by vote count
+        candidates.sort(key=lambda x: x['votes'], reverse=True)
+        results[office['title']] = {'totalVotes': total_votes, 'candidates': candidates}
+
+    return results
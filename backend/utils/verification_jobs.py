@@ -0,0 +1,149 @@
+"""
+Asynchronous face verification jobs
+
+Verification frames are handed to a small background executor and the
+request returns a job id straight away. Results are kept in a bounded TTL
+store that clients poll (or long-poll), so request threads never block on
+CNN inference however slow the kiosk or server is.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """Raised when too many verification jobs are already pending"""
+
+
+class VerificationJobs:
+    """
+    Background executor with a bounded TTL result store
+
+    Configured from the Flask app via init_app:
+    - FACE_ASYNC_WORKERS: background inference threads
+    - FACE_ASYNC_MAX_PENDING: queued or running jobs before submissions are refused
+    - FACE_ASYNC_MAX_RESULTS: jobs kept in the store, oldest evicted first
+    - FACE_ASYNC_RESULT_TTL: seconds a job is kept after it was submitted
+    """
+
+    def __init__(self, app=None, workers=2, max_pending=32, max_results=1000, result_ttl=300):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_results = max_results
+        self.result_ttl = result_ttl
+        self._executor = None
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._pending = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.workers = app.config.get('FACE_ASYNC_WORKERS', self.workers)
+        self.max_pending = app.config.get('FACE_ASYNC_MAX_PENDING', self.max_pending)
+        self.max_results = app.config.get('FACE_ASYNC_MAX_RESULTS', self.max_results)
+        self.result_ttl = app.config.get('FACE_ASYNC_RESULT_TTL', self.result_ttl)
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix='face-verify')
+        return self._executor
+
+    def _evict(self, now):
+        """Drop expired jobs, then the oldest finished ones beyond the bound"""
+        while self._jobs:
+            job = next(iter(self._jobs.values()))
+            if now - job['created'] < self.result_ttl:
+                break
+            self._jobs.popitem(last=False)
+
+        if len(self._jobs) >= self.max_results:
+            for job_id in [job_id for job_id, job in self._jobs.items() if job['status'] != 'pending']:
+                del self._jobs[job_id]
+                if len(self._jobs) < self.max_results:
+                    break
+
+    def submit(self, owner, fn, *args, **kwargs):
+        """
+        Enqueue fn(*args, **kwargs) for the given owner
+
+        Returns:
+            The new job id
+
+        Raises:
+            JobQueueFull: if max_pending jobs are already queued or running
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull()
+
+            now = time.monotonic()
+            self._evict(now)
+
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                'owner': str(owner),
+                'status': 'pending',
+                'result': None,
+                'created': now,
+                'done': threading.Event()
+            }
+            self._pending += 1
+
+        self._get_executor().submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job_id, fn, args, kwargs):
+        try:
+            result = fn(*args, **kwargs)
+            status = 'completed'
+        except Exception as e:
+            logger.error(f"Verification job {job_id} failed: {str(e)}")
+            result = {'success': False, 'error': str(e), 'confidence': 0.0}
+            status = 'failed'
+
+        with self._lock:
+            self._pending -= 1
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job['result'] = result
+            job['status'] = status
+        job['done'].set()
+
+    def get(self, job_id, owner, wait=0):
+        """
+        Look up a job, optionally waiting up to `wait` seconds for it to finish
+
+        Returns:
+            Tuple of (status, result); status is None for unknown, expired or
+            foreign jobs
+        """
+        with self._lock:
+            self._evict(time.monotonic())
+            job = self._jobs.get(job_id)
+            if job is None or job['owner'] != str(owner):
+                return None, None
+
+        if wait > 0:
+            job['done'].wait(wait)
+
+        with self._lock:
+            return job['status'], job['result']
+
+    def stats(self):
+        """Pending and stored job counts"""
+        with self._lock:
+            return {'pending': self._pending, 'stored': len(self._jobs)}
+
+
+# Global instance for asynchronous face verification
+verification_jobs = VerificationJobs()
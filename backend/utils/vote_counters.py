@@ -0,0 +1,170 @@
+"""
+Atomic SQL-side vote counter updates
+
+Candidate and election counters are incremented with single
+`UPDATE ... SET votes_count = votes_count + n` statements inside the
+caller's transaction, so concurrent voters never lose updates and no row
+has to be read first. With VOTE_COUNTER_SHARDS > 1, candidate increments go
+to one of several shard rows per candidate instead, and a background
+folder periodically merges the shards back into Candidate.votes_count.
+"""
+
+from collections import Counter
+import random
+import threading
+import logging
+
+from extensions import db
+from models.candidate import Candidate
+from models.election import Election
+from models.counter_shard import CandidateCounterShard
+
+logger = logging.getLogger(__name__)
+
+
+def upsert_insert(dialect):
+    """Dialect insert construct supporting ON CONFLICT, or None"""
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def increment_vote_counters(election_id, candidate_ids, shards=1, voters=1):
+    """
+    Add one vote per listed candidate and `voters` voters to the election
+
+    All candidate increments are batched into one UPDATE with a CASE
+    expression (or one multi-row shard upsert), plus one UPDATE for the
+    election. Runs in the current transaction; the caller commits.
+
+    Args:
+        election_id: Election whose voted_count is incremented
+        candidate_ids: Candidate IDs on the ballot (repeats add more votes)
+        shards: Number of counter shards per candidate; 1 disables sharding
+        voters: Number of ballots being counted (more than one when a group
+            of ballots is committed together)
+    """
+    counts = Counter(candidate_ids)
+
+    if counts:
+        insert = upsert_insert(db.session.get_bind().dialect.name) if shards > 1 else None
+
+        if insert is not None:
+            stmt = insert(CandidateCounterShard).values([
+                {'candidate_id': candidate_id, 'shard': random.randrange(shards), 'count': n}
+                for candidate_id, n in counts.items()
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['candidate_id', 'shard'],
+                set_={'count': CandidateCounterShard.count + stmt.excluded.count}
+            )
+            db.session.execute(stmt)
+        else:
+            db.session.execute(
+                db.update(Candidate)
+                .where(Candidate.id.in_(list(counts)))
+                .values(votes_count=Candidate.votes_count + db.case(counts, value=Candidate.id, else_=0))
+                .execution_options(synchronize_session=False)
+            )
+
+    db.session.execute(
+        db.update(Election)
+        .where(Election.id == election_id)
+        .values(voted_count=Election.voted_count + voters)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def fold_counter_shards():
+    """
+    Merge shard counts into Candidate.votes_count in one transaction
+
+    Each shard is decremented by exactly the amount read rather than reset
+    to zero, so increments racing with the fold are never lost.
+
+    Returns:
+        Number of votes folded
+    """
+    rows = db.session.query(
+        CandidateCounterShard.candidate_id,
+        CandidateCounterShard.shard,
+        CandidateCounterShard.count
+    ).filter(CandidateCounterShard.count != 0).all()
+
+    if not rows:
+        db.session.rollback()
+        return 0
+
+    shards = CandidateCounterShard.__table__
+    db.session.execute(
+        shards.update()
+        .where(shards.c.candidate_id == db.bindparam('b_candidate_id'))
+        .where(shards.c.shard == db.bindparam('b_shard'))
+        .values(count=shards.c.count - db.bindparam('b_count')),
+        [{'b_candidate_id': candidate_id, 'b_shard': shard, 'b_count': count}
+         for candidate_id, shard, count in rows]
+    )
+
+    totals = Counter()
+    for candidate_id, _, count in rows:
+        totals[candidate_id] += count
+
+    db.session.execute(
+        db.update(Candidate)
+        .where(Candidate.id.in_(list(totals)))
+        .values(votes_count=Candidate.votes_count + db.case(totals, value=Candidate.id, else_=0))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    return sum(totals.values())
+
+
+class CounterShardFolder:
+    """
+    Background thread folding counter shards every few seconds
+
+    Only started when VOTE_COUNTER_SHARDS > 1; the fold interval is
+    VOTE_COUNTER_FOLD_INTERVAL seconds.
+    """
+
+    def __init__(self, app=None):
+        self.shards = 1
+        self.interval = 5.0
+        self._thread = None
+        self._stop = threading.Event()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.shards = app.config.get('VOTE_COUNTER_SHARDS', 1)
+        self.interval = app.config.get('VOTE_COUNTER_FOLD_INTERVAL', self.interval)
+
+        if self.shards > 1 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, args=(app,), daemon=True)
+            self._thread.start()
+
+    def _run(self, app):
+        while not self._stop.wait(self.interval):
+            with app.app_context():
+                try:
+                    folded = fold_counter_shards()
+                    if folded:
+                        logger.info(f"Folded {folded} sharded votes into candidate counters")
+                except Exception as e:
+                    logger.error(f"Counter shard fold error: {str(e)}")
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+
+    def stop(self):
+        self._stop.set()
+
+
+# Global instance
+counter_folder = CounterShardFolder()
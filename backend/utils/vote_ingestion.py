@@ -0,0 +1,239 @@
+"""
+Group-commit vote ingestion
+
+When an election opens, thousands of ballots arrive within minutes and a
+commit per ballot makes SQLite or small PostgreSQL instances fsync-bound.
+In group-commit mode, validated ballots are handed to a single writer thread
+that commits them in groups of up to VOTE_GROUP_MAX_BALLOTS ballots or every
+VOTE_GROUP_MAX_WAIT_MS milliseconds; each request receives its result once
+the group containing its ballot is durable.
+
+A request that times out withdraws its ballot if the writer has not picked
+it up yet; once the writer holds it, the request reports it as pending
+instead, since it may still be committed.
+"""
+
+from collections import Counter, defaultdict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+import queue
+import threading
+import time
+import logging
+
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models.vote import Vote
+from utils.vote_counters import increment_vote_counters
+from utils.tally import increment_tally
+from utils.results_stream import results_publisher
+
+logger = logging.getLogger(__name__)
+
+ALREADY_VOTED = 'You have already voted in this election'
+WITHDRAWN = 'Voting is busy right now, please try again'
+
+
+class VoteIngestionQueue:
+    """
+    Single writer committing validated ballots in groups
+
+    Configured from the Flask app via init_app:
+    - VOTE_GROUP_COMMIT: enable group-commit mode
+    - VOTE_GROUP_MAX_BALLOTS: most ballots per commit
+    - VOTE_GROUP_MAX_WAIT_MS: longest a ballot waits for its group to fill
+    - VOTE_GROUP_RESULT_TIMEOUT: seconds a request waits for its result
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.max_ballots = 64
+        self.max_wait = 0.02
+        self.result_timeout = 10.0
+        self.shards = 1
+        self._queue = queue.Queue()
+        self._thread = None
+        self._app = None
+        self._stats = {'groups': 0, 'ballots': 0, 'rejected': 0, 'withdrawn': 0}
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('VOTE_GROUP_COMMIT', False)
+        self.max_ballots = app.config.get('VOTE_GROUP_MAX_BALLOTS', self.max_ballots)
+        self.max_wait = app.config.get('VOTE_GROUP_MAX_WAIT_MS', self.max_wait * 1000) / 1000.0
+        self.result_timeout = app.config.get('VOTE_GROUP_RESULT_TIMEOUT', self.result_timeout)
+        self.shards = app.config.get('VOTE_COUNTER_SHARDS', self.shards)
+        self._app = app
+
+    def _ensure_writer(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, daemon=True, name='vote-writer')
+            self._thread.start()
+
+    def submit(self, user_id, election_id, ballot):
+        """
+        Queue a validated ballot for the writer
+
+        Args:
+            user_id: Voter ID
+            election_id: Election ID
+            ballot: List of (office_id, candidate_id) pairs
+
+        Returns:
+            Future resolving to {'success': bool, 'error': str or None}
+        """
+        self._ensure_writer()
+        future = Future()
+        self._queue.put((int(user_id), int(election_id), ballot, future))
+        return future
+
+    def cast(self, user_id, election_id, ballot):
+        """
+        Queue a ballot and block until its group has been committed
+
+        Returns:
+            {'success': bool, 'error': str or None, 'pending': bool}; pending
+            is True when the result timeout passed while the writer was
+            already committing the ballot
+        """
+        future = self.submit(user_id, election_id, ballot)
+        try:
+            return {'pending': False, **future.result(timeout=self.result_timeout)}
+        except FutureTimeout:
+            # Still queued: take it back so it is never written
+            if future.cancel():
+                self._stats['withdrawn'] += 1
+                return {'success': False, 'error': WITHDRAWN, 'pending': False}
+            logger.warning(f"Ballot from user {user_id} still committing after {self.result_timeout}s")
+            return {'success': False, 'error': None, 'pending': True}
+
+    def _run(self):
+        while True:
+            group = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(group) < self.max_ballots:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    group.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            with self._app.app_context():
+                try:
+                    self._commit_group(group)
+                except Exception as e:
+                    logger.error(f"Vote group commit error: {str(e)}")
+                    db.session.rollback()
+                    # Ballots committed before the failure were resolved already
+                    for *_, future in group:
+                        if not future.done():
+                            future.set_exception(e)
+                finally:
+                    db.session.remove()
+
+    def _commit_group(self, group):
+        """
+        Write a group of ballots in one transaction
+
+        Duplicates are filtered up front (against the database and within
+        the group). If another process wins a race and the unique constraint
+        still fires, the group is retried one ballot per transaction so only
+        the offending ballot fails. Each future is resolved as soon as the
+        transaction holding its ballot has committed.
+        """
+        # Claim every ballot; ones withdrawn by a timed-out request are dropped
+        group = [item for item in group if item[3].set_running_or_notify_cancel()]
+        if not group:
+            return
+
+        pairs = {(user_id, election_id) for user_id, election_id, _, _ in group}
+        voted = set(
+            db.session.query(Vote.user_id, Vote.election_id)
+            .filter(tuple_(Vote.user_id, Vote.election_id).in_(list(pairs)))
+            .distinct()
+            .all()
+        )
+
+        accepted = []
+        for user_id, election_id, ballot, future in group:
+            if (user_id, election_id) in voted:
+                future.set_result({'success': False, 'error': ALREADY_VOTED})
+                self._stats['rejected'] += 1
+                continue
+            voted.add((user_id, election_id))
+            accepted.append((user_id, election_id, ballot, future))
+
+        if not accepted:
+            db.session.rollback()
+            return
+
+        try:
+            self._write(accepted)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            logger.warning("Vote group hit a unique constraint; retrying ballots individually")
+            for item in accepted:
+                try:
+                    self._write([item])
+                    db.session.commit()
+                except IntegrityError:
+                    db.session.rollback()
+                    item[3].set_result({'success': False, 'error': ALREADY_VOTED})
+                    self._stats['rejected'] += 1
+                    continue
+                self._committed([item])
+            self._stats['groups'] += 1
+            return
+
+        self._committed(accepted)
+        self._stats['groups'] += 1
+
+    def _committed(self, ballots):
+        """Resolve the futures of durably committed ballots, then notify"""
+        self._stats['ballots'] += len(ballots)
+        for *_, future in ballots:
+            future.set_result({'success': True, 'error': None})
+        for election_id in {election_id for _, election_id, _, _ in ballots}:
+            results_publisher.notify(election_id)
+
+    def _write(self, ballots):
+        """Bulk insert votes and apply counter and tally increments per election"""
+        db.session.execute(db.insert(Vote), [
+            {
+                'user_id': user_id,
+                'election_id': election_id,
+                'office_id': office_id,
+                'candidate_id': candidate_id
+            }
+            for user_id, election_id, ballot, _ in ballots
+            for office_id, candidate_id in ballot
+        ])
+
+        selections = defaultdict(list)
+        voters = Counter()
+        for _, election_id, ballot, _ in ballots:
+            selections[election_id].extend(ballot)
+            voters[election_id] += 1
+
+        for election_id, pairs in selections.items():
+            increment_vote_counters(election_id, [candidate_id for _, candidate_id in pairs],
+                                    shards=self.shards, voters=voters[election_id])
+            increment_tally(election_id, pairs)
+
+    def stats(self):
+        """Committed group, ballot and rejection counts plus queue depth"""
+        stats = dict(self._stats)
+        stats['queued'] = self._queue.qsize()
+        if stats['groups']:
+            stats['avgGroupSize'] = round(stats['ballots'] / stats['groups'], 2)
+        return stats
+
+
+# Global instance
+vote_ingestion = VoteIngestionQueue()